@@ -1,8 +1,10 @@
 import { DarkTheme, NavigationContainer } from '@react-navigation/native';
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
+import { useEffect } from 'react';
 import { SafeAreaProvider } from 'react-native-safe-area-context';
 
 import { AppNavigator } from './navigation/AppNavigator';
+import { syncDeviceBundle } from './services/bundleService';
 
 const navigationTheme = {
   ...DarkTheme,
@@ -19,6 +21,11 @@ const navigationTheme = {
 const queryClient = new QueryClient();
 
 export default function RootApp() {
+  useEffect(() => {
+    // Refresh the offline bundle in the background; scans work without it.
+    void syncDeviceBundle();
+  }, []);
+
   return (
     <QueryClientProvider client={queryClient}>
       <SafeAreaProvider>
@@ -1,10 +1,56 @@
-import { useMemo } from 'react';
+import { useCallback, useEffect, useMemo, useState } from 'react';
 
-import { halalGuidanceService } from '../services/halalGuidanceService';
+import { halalGuidanceService, ScanRecord } from '../services/halalGuidanceService';
+import { historyService, StatusCounts } from '../services/historyService';
+
+function countStatuses(records: ScanRecord[]): StatusCounts {
+  return records.reduce<StatusCounts>(
+    (acc, record) => {
+      acc[record.status] += 1;
+      return acc;
+    },
+    { Halal: 0, Haram: 0, Doubtful: 0 },
+  );
+}
 
 export function useHalalInsights() {
   const snapshot = useMemo(() => halalGuidanceService.getDashboardSnapshot(), []);
-  const history = useMemo(() => halalGuidanceService.getScanHistory(), []);
+  const [history, setHistory] = useState<ScanRecord[]>(() => halalGuidanceService.getScanHistory());
+  const [statusCounts, setStatusCounts] = useState<StatusCounts>(() => countStatuses(history));
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+
+    // Fall back to the bundled sample history when the backend is unreachable.
+    Promise.all([historyService.fetchScanHistory(), historyService.fetchStatusCounts()])
+      .then(([page, counts]) => {
+        if (cancelled) {
+          return;
+        }
+        setHistory(page.items);
+        setNextCursor(page.nextCursor);
+        setStatusCounts(counts);
+      })
+      .catch((error) => console.warn('Failed to load scan history', error));
+
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
+  const loadMoreHistory = useCallback(async () => {
+    if (!nextCursor) {
+      return;
+    }
+    try {
+      const page = await historyService.fetchScanHistory(nextCursor);
+      setHistory((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.warn('Failed to load more scan history', error);
+    }
+  }, [nextCursor]);
 
   const safeRatio = useMemo(() => {
     const total = snapshot.verifiedCount + snapshot.flaggedCount;
@@ -17,8 +63,8 @@ export function useHalalInsights() {
   return {
     snapshot,
     history,
+    statusCounts,
+    loadMoreHistory,
     safeRatio,
   };
 }
-
-
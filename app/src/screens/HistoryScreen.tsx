@@ -11,20 +11,16 @@ import { useHalalInsights } from '../hooks/useHalalInsights';
 import { colors } from '../theme/colors';
 
 export function HistoryScreen() {
-  const { history } = useHalalInsights();
+  const { history, statusCounts, loadMoreHistory } = useHalalInsights();
 
-  const metrics = useMemo(() => {
-    const grouped = history.reduce<Record<string, number>>((acc, record) => {
-      acc[record.status] = (acc[record.status] ?? 0) + 1;
-      return acc;
-    }, {});
-
-    return [
-      { id: 'halal', label: 'Halal', value: grouped.Halal ?? 0 },
-      { id: 'haram', label: 'Haram', value: grouped.Haram ?? 0 },
-      { id: 'doubtful', label: 'Doubtful', value: grouped.Doubtful ?? 0 },
-    ];
-  }, [history]);
+  const metrics = useMemo(
+    () => [
+      { id: 'halal', label: 'Halal', value: statusCounts.Halal },
+      { id: 'haram', label: 'Haram', value: statusCounts.Haram },
+      { id: 'doubtful', label: 'Doubtful', value: statusCounts.Doubtful },
+    ],
+    [statusCounts],
+  );
 
   return (
     <ScreenContainer>
@@ -60,6 +56,8 @@ export function HistoryScreen() {
         ItemSeparatorComponent={() => <View style={{ height: 12 }} />}
         contentContainerStyle={{ paddingBottom: 120 }}
         showsVerticalScrollIndicator={false}
+        onEndReached={loadMoreHistory}
+        onEndReachedThreshold={0.5}
         ListEmptyComponent={
           <View style={styles.emptyState}>
             <StatusPill status="Halal" />
@@ -1,5 +1,6 @@
 import AsyncStorage from '@react-native-async-storage/async-storage';
 import axios from 'axios';
+import { randomUUID } from 'expo-crypto';
 const API_BASE_URL = 'http://172.28.3.122:8000';
 console.log('API base URL:', API_BASE_URL);
 export const apiClient = axios.create({
@@ -10,9 +11,25 @@ export const apiClient = axios.create({
   maxBodyLength: Infinity,
 });
 
+const DEVICE_ID_KEY = 'halal.deviceId';
+
+// Anonymous per-install identifier used to key server-side scan history. It is the only
+// credential for that history, so it is a bearer secret: generated with a CSPRNG, kept in
+// app storage and never shown or logged.
+async function getDeviceId(): Promise<string> {
+  const existing = await AsyncStorage.getItem(DEVICE_ID_KEY);
+  if (existing) {
+    return existing;
+  }
+  const generated = randomUUID();
+  await AsyncStorage.setItem(DEVICE_ID_KEY, generated);
+  return generated;
+}
+
 apiClient.interceptors.request.use(async (config) => {
   const token = await AsyncStorage.getItem('bms.auth.user');
   const buildingId = await AsyncStorage.getItem('bms.currentBuildingId');
+  const deviceId = await getDeviceId();
 
   if (token) {
     config.headers.Authorization = token;
@@ -22,6 +39,8 @@ apiClient.interceptors.request.use(async (config) => {
     config.headers['X-Building-Id'] = buildingId;
   }
 
+  config.headers['X-Device-Id'] = deviceId;
+
   return config;
 });
 
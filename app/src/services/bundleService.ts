@@ -0,0 +1,143 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+import { apiClient } from './apiClient';
+import type { HalalStatus } from './halalGuidanceService';
+
+const BUNDLE_STORAGE_KEY = 'halal.deviceBundle';
+// Re-check the manifest at most this often; a sync is one small request when nothing changed.
+const SYNC_INTERVAL_MS = 6 * 60 * 60 * 1000;
+
+type EcodeRecord = [HalalStatus, string];
+
+export type FastIngredientModel = {
+  version: string;
+  labels: HalalStatus[];
+  temperature: number;
+  bias: number[];
+  weights: Record<string, number[]>;
+};
+
+export type RiskIndexPayload = {
+  version: string;
+  entries: Record<string, { status: HalalStatus; weight: number; evidence: string }>;
+};
+
+export type DeviceBundle = {
+  version: string;
+  model_version: string;
+  ecode_version: string;
+  assets_version: string;
+  ecodes: Record<string, EcodeRecord>;
+  ingredient_model: FastIngredientModel | null;
+  cascade_threshold: number;
+  risk_index: RiskIndexPayload | null;
+  syncedAt?: number;
+};
+
+type BundleManifestResponse = {
+  version: string;
+  model_version: string;
+  ecode_version: string;
+  assets_version: string;
+};
+
+type EcodeDeltaResponse = {
+  since: string | null;
+  version: string;
+  full: boolean;
+  upserts: Record<string, EcodeRecord>;
+  removed: string[];
+};
+
+let cachedBundle: DeviceBundle | null = null;
+let pendingSync: Promise<DeviceBundle | null> | null = null;
+
+async function loadStoredBundle(): Promise<DeviceBundle | null> {
+  if (cachedBundle) {
+    return cachedBundle;
+  }
+  const stored = await AsyncStorage.getItem(BUNDLE_STORAGE_KEY);
+  if (!stored) {
+    return null;
+  }
+  try {
+    cachedBundle = JSON.parse(stored) as DeviceBundle;
+  } catch (error) {
+    console.warn('Discarding unreadable offline bundle', error);
+    await AsyncStorage.removeItem(BUNDLE_STORAGE_KEY);
+  }
+  return cachedBundle;
+}
+
+async function storeBundle(bundle: DeviceBundle): Promise<DeviceBundle> {
+  const stamped = { ...bundle, syncedAt: Date.now() };
+  cachedBundle = stamped;
+  await AsyncStorage.setItem(BUNDLE_STORAGE_KEY, JSON.stringify(stamped));
+  return stamped;
+}
+
+async function applyEcodeDelta(bundle: DeviceBundle): Promise<DeviceBundle> {
+  const response = await apiClient.get<EcodeDeltaResponse>('/api/v1/bundle/ecodes', {
+    params: { since: bundle.ecode_version },
+  });
+  const delta = response.data;
+  const ecodes = delta.full ? {} : { ...bundle.ecodes };
+  for (const code of delta.removed) {
+    delete ecodes[code];
+  }
+  Object.assign(ecodes, delta.upserts);
+  return { ...bundle, ecodes, ecode_version: delta.version };
+}
+
+async function downloadBundle(current: DeviceBundle | null): Promise<DeviceBundle | null> {
+  const response = await apiClient.get<DeviceBundle>('/api/v1/bundle', {
+    headers: current ? { 'If-None-Match': `"${current.version}"` } : undefined,
+    validateStatus: (status) => status === 200 || status === 304,
+  });
+  return response.status === 304 ? current : response.data;
+}
+
+async function runSync(force: boolean): Promise<DeviceBundle | null> {
+  const current = await loadStoredBundle();
+  if (!force && current?.syncedAt && Date.now() - current.syncedAt < SYNC_INTERVAL_MS) {
+    return current;
+  }
+
+  const { data: manifest } = await apiClient.get<BundleManifestResponse>('/api/v1/bundle/manifest');
+  if (current && current.version === manifest.version) {
+    return storeBundle(current);
+  }
+
+  // Only the E-code table moved: fetch the changed codes instead of the whole bundle.
+  if (current && current.assets_version === manifest.assets_version) {
+    const patched = await applyEcodeDelta(current);
+    return storeBundle({ ...patched, version: manifest.version, model_version: manifest.model_version });
+  }
+
+  const downloaded = await downloadBundle(current);
+  return downloaded ? storeBundle(downloaded) : null;
+}
+
+/** Refresh the offline bundle; resolves to the cached copy when the server is unreachable. */
+export function syncDeviceBundle(force = false): Promise<DeviceBundle | null> {
+  if (!pendingSync) {
+    pendingSync = runSync(force)
+      .catch(async (error) => {
+        console.warn('Offline bundle sync failed', error);
+        return loadStoredBundle();
+      })
+      .finally(() => {
+        pendingSync = null;
+      });
+  }
+  return pendingSync;
+}
+
+export function getDeviceBundle(): Promise<DeviceBundle | null> {
+  return loadStoredBundle();
+}
+
+export const bundleService = {
+  syncDeviceBundle,
+  getDeviceBundle,
+};
@@ -0,0 +1,164 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+import { apiClient } from './apiClient';
+import type { HalalStatus, ScanRecord } from './halalGuidanceService';
+import type { ProductClassificationResponse } from './productService';
+
+const PENDING_SCANS_KEY = 'halal.pendingScans';
+// Matches the server's per-request cap on POST /api/v1/history.
+const UPLOAD_BATCH_SIZE = 100;
+// A device that stays offline keeps only its newest on-device scans.
+const MAX_PENDING_SCANS = 500;
+
+type ScanHistoryItemResponse = {
+  id: number;
+  scanned_at: number;
+  product_name: string;
+  barcode: string | null;
+  halal_status: HalalStatus;
+  confidence: number;
+  summary: string;
+  model_version?: string | null;
+};
+
+type ScanHistoryPageResponse = {
+  items: ScanHistoryItemResponse[];
+  next_cursor: string | null;
+};
+
+type ScanHistoryAggregatesResponse = {
+  total: number;
+  counts: Partial<Record<HalalStatus, number>>;
+  last_scanned_at: number | null;
+};
+
+// A verdict made on the device from the offline bundle, waiting to be added to server-side history.
+type PendingScan = {
+  localId: string;
+  scanned_at: number;
+  product_name: string;
+  barcode: string | null;
+  halal_status: HalalStatus;
+  confidence: number;
+  summary: string;
+  model_version: string | null;
+};
+
+export type ScanHistoryPage = {
+  items: ScanRecord[];
+  nextCursor: string | null;
+};
+
+export type StatusCounts = Record<HalalStatus, number>;
+
+function toScanRecord(item: ScanHistoryItemResponse): ScanRecord {
+  return {
+    id: `scan-${item.id}`,
+    productName: item.product_name,
+    brand: item.barcode ?? '',
+    scannedAt: new Date(item.scanned_at * 1000).toLocaleString(),
+    status: item.halal_status,
+    summary: item.summary,
+  };
+}
+
+let pendingScansLock: Promise<unknown> = Promise.resolve();
+let pendingUpload: Promise<void> | null = null;
+
+async function loadPendingScans(): Promise<PendingScan[]> {
+  const stored = await AsyncStorage.getItem(PENDING_SCANS_KEY);
+  if (!stored) {
+    return [];
+  }
+  try {
+    return JSON.parse(stored) as PendingScan[];
+  } catch (error) {
+    console.warn('Discarding unreadable on-device scan queue', error);
+    return [];
+  }
+}
+
+// Read-modify-write of the queue, serialized so queueing and uploading never overwrite each other.
+function updatePendingScans(update: (scans: PendingScan[]) => PendingScan[]): Promise<PendingScan[]> {
+  const next = pendingScansLock.then(async () => {
+    const updated = update(await loadPendingScans());
+    await AsyncStorage.setItem(PENDING_SCANS_KEY, JSON.stringify(updated));
+    return updated;
+  });
+  pendingScansLock = next.catch(() => undefined);
+  return next;
+}
+
+/** Queue a verdict made on the device so it is added to the server-side history on the next upload. */
+async function queueOfflineScan(result: ProductClassificationResponse, modelVersion: string | null): Promise<void> {
+  const scan: PendingScan = {
+    localId: `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`,
+    scanned_at: Date.now() / 1000,
+    product_name: result.product_name,
+    barcode: result.barcode,
+    halal_status: result.halal_status,
+    confidence: result.confidence,
+    summary: result.evidence.join('; '),
+    model_version: modelVersion,
+  };
+  try {
+    await updatePendingScans((scans) => [...scans, scan].slice(-MAX_PENDING_SCANS));
+  } catch (error) {
+    console.warn('Queueing an on-device scan for history failed', error);
+  }
+}
+
+/** Upload queued on-device scans; failures leave them queued for the next attempt. */
+function uploadPendingScans(): Promise<void> {
+  if (!pendingUpload) {
+    pendingUpload = (async () => {
+      for (;;) {
+        const batch = (await loadPendingScans()).slice(0, UPLOAD_BATCH_SIZE);
+        if (!batch.length) {
+          return;
+        }
+        await apiClient.post('/api/v1/history', { items: batch.map(({ localId, ...item }) => item) });
+        const uploaded = new Set(batch.map((scan) => scan.localId));
+        await updatePendingScans((scans) => scans.filter((scan) => !uploaded.has(scan.localId)));
+      }
+    })()
+      .catch((error) => {
+        console.warn('Uploading on-device scans failed', error);
+      })
+      .finally(() => {
+        pendingUpload = null;
+      });
+  }
+  return pendingUpload;
+}
+
+async function fetchScanHistory(cursor?: string | null, limit = 20): Promise<ScanHistoryPage> {
+  if (!cursor) {
+    await uploadPendingScans();
+  }
+  const response = await apiClient.get<ScanHistoryPageResponse>('/api/v1/history', {
+    params: { limit, cursor: cursor ?? undefined },
+  });
+  return {
+    items: response.data.items.map(toScanRecord),
+    nextCursor: response.data.next_cursor,
+  };
+}
+
+async function fetchStatusCounts(): Promise<StatusCounts> {
+  await uploadPendingScans();
+  const response = await apiClient.get<ScanHistoryAggregatesResponse>('/api/v1/history/aggregates');
+  const { counts } = response.data;
+  return {
+    Halal: counts.Halal ?? 0,
+    Haram: counts.Haram ?? 0,
+    Doubtful: counts.Doubtful ?? 0,
+  };
+}
+
+export const historyService = {
+  fetchScanHistory,
+  fetchStatusCounts,
+  queueOfflineScan,
+  uploadPendingScans,
+};
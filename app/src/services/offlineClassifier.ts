@@ -0,0 +1,90 @@
+import type { DeviceBundle } from './bundleService';
+import type { HalalStatus } from './halalGuidanceService';
+import type { ProductClassificationRequest, ProductClassificationResponse } from './productService';
+
+const STATUS_RANK: Record<HalalStatus, number> = { Halal: 1, Doubtful: 2, Haram: 3 };
+const ECODE_PATTERN = /\be\d{1,4}[a-z]?\b/gi;
+
+// Mirrors HalalClassifierService._normalize_ingredients_text so tokens match the model's vocabulary.
+export function normalizeIngredientsText(text: string): string {
+  let normalized = text.normalize('NFKD').toLowerCase().replace('ingredients:', ' ');
+  normalized = normalized.replace(/[^a-z0-9\s,.;:/%()\-&]/g, ' ').replace(/\s+/g, ' ').trim();
+  return normalized.length > 1000 ? normalized.slice(0, 1000).trimEnd() : normalized;
+}
+
+function predictIngredients(bundle: DeviceBundle, text: string) {
+  const model = bundle.ingredient_model;
+  if (!model) {
+    return null;
+  }
+  const logits = [...model.bias];
+  for (const token of new Set(text.split(' '))) {
+    const row = model.weights[token];
+    if (row) {
+      row.forEach((weight, index) => {
+        logits[index] += weight;
+      });
+    }
+  }
+  const scaled = logits.map((logit) => logit / model.temperature);
+  const max = Math.max(...scaled);
+  const exps = scaled.map((value) => Math.exp(value - max));
+  const total = exps.reduce((sum, value) => sum + value, 0);
+  const probabilities = exps.map((value) => value / total);
+  const best = probabilities.indexOf(Math.max(...probabilities));
+  return {
+    status: model.labels[best],
+    confidence: probabilities[best],
+    raw_scores: Object.fromEntries(model.labels.map((label, index) => [label, probabilities[index]])),
+  };
+}
+
+/**
+ * Answer text-only ingredient scans from the offline bundle, using the same fast
+ * tier and E-code rules as the server. Returns null when the fast model is not
+ * confident enough, so the caller falls back to the API.
+ */
+export function classifyOffline(
+  payload: ProductClassificationRequest,
+  bundle: DeviceBundle,
+): ProductClassificationResponse | null {
+  if (!payload.ingredientsText || payload.imageBase64) {
+    return null;
+  }
+  const text = normalizeIngredientsText(payload.ingredientsText);
+  const prediction = text ? predictIngredients(bundle, text) : null;
+  if (!prediction || prediction.confidence < bundle.cascade_threshold) {
+    return null;
+  }
+
+  let status: HalalStatus = prediction.status;
+  let confidence = prediction.confidence;
+  const evidence = [
+    `Fast ingredient classifier suggests ${status} (confidence ${confidence.toFixed(2)}, on device)`,
+  ];
+
+  const codes = [...new Set((text.match(ECODE_PATTERN) ?? []).map((code) => code.toUpperCase()))].sort();
+  for (const code of codes) {
+    const record = bundle.ecodes[code];
+    if (!record) {
+      continue;
+    }
+    const [ecodeStatus, description] = record;
+    evidence.push(`${code} labeled ${ecodeStatus} – ${description || 'No description provided'}`);
+    if (STATUS_RANK[ecodeStatus] > STATUS_RANK[status]) {
+      status = ecodeStatus;
+      confidence = Math.max(confidence, 0.85);
+    }
+  }
+
+  return {
+    product_name: payload.productName ?? 'Unnamed product',
+    barcode: payload.barcode ?? null,
+    halal_status: status,
+    confidence: Math.min(1, Math.max(0, confidence)),
+    evidence,
+    capture_mode: payload.captureMode,
+    recognized_ingredients_text: null,
+    feature_breakdown: { ingredients: prediction },
+  };
+}
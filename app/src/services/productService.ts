@@ -1,4 +1,8 @@
 import { apiClient } from './apiClient';
+import { getDeviceBundle } from './bundleService';
+import type { HalalStatus } from './halalGuidanceService';
+import { historyService } from './historyService';
+import { classifyOffline } from './offlineClassifier';
 
 export type ProductClassificationRequest = {
   productName?: string;
@@ -45,14 +49,34 @@ export type ProductClassificationResponse = {
 export async function classifyProduct(
   payload: ProductClassificationRequest,
 ): Promise<ProductClassificationResponse> {
-  const response = await apiClient.post<ProductClassificationResponse>('/api/v1/products/classify', {
-    product_name: payload.productName,
-    barcode: payload.barcode,
-    ingredients_text: payload.ingredientsText,
-    image_base64: payload.imageBase64,
-    capture_mode: payload.captureMode,
-  });
-
-  return response.data;
+  const bundle = await getDeviceBundle();
+  // Barcode and photo scans need server-side models; confident text-only scans are answered on device.
+  const local = bundle && !payload.barcode ? classifyOffline(payload, bundle) : null;
+  if (bundle && local) {
+    // The server never sees this scan, so queue it for the history it would otherwise record.
+    void historyService.queueOfflineScan(local, bundle.model_version);
+    return local;
+  }
+
+  try {
+    const response = await apiClient.post<ProductClassificationResponse>('/api/v1/products/classify', {
+      product_name: payload.productName,
+      barcode: payload.barcode,
+      ingredients_text: payload.ingredientsText,
+      image_base64: payload.imageBase64,
+      capture_mode: payload.captureMode,
+    });
+    // Online again: send any scans that were answered on the device meanwhile.
+    void historyService.uploadPendingScans();
+    return response.data;
+  } catch (error) {
+    // Offline or unreachable: a confident on-device verdict beats an error.
+    const fallback = bundle ? classifyOffline(payload, bundle) : null;
+    if (bundle && fallback) {
+      void historyService.queueOfflineScan(fallback, bundle.model_version);
+      return fallback;
+    }
+    throw error;
+  }
 }
 
@@ -1,16 +1,91 @@
+import secrets
+
 from functools import lru_cache
 
+from fastapi import Header, HTTPException, status
+
 from ..core.config import settings
+from ..services.device_bundle import DeviceBundleCache, EcodeHistory
 from ..services.halal_classifier import HalalClassifierService
+from ..services.model_registry import ModelRegistry
+from ..services.ocr_pool import OcrWorkerPool
+from ..services.scan_history import ScanHistoryStore
+from ..services.thread_topology import ThreadTopology
+
+
+@lru_cache
+def get_ocr_pool() -> OcrWorkerPool | None:
+    if settings.ocr_workers <= 0:
+        return None
+    pool = OcrWorkerPool(
+        settings.ocr_workers,
+        timeout=settings.ocr_timeout_seconds,
+        torch_threads=settings.torch_num_threads,
+    )
+    pool.start()
+    return pool
+
+
+def close_ocr_pool() -> None:
+    """Terminate the OCR workers on shutdown, without starting a pool that was never used."""
+    if get_ocr_pool.cache_info().currsize:
+        pool = get_ocr_pool()
+        if pool is not None:
+            pool.close()
 
 
 @lru_cache
-def _get_classifier() -> HalalClassifierService:
-    service = HalalClassifierService(model_dir=settings.model_registry_path)
-    service.load()
-    return service
+def get_model_registry() -> ModelRegistry:
+    registry = ModelRegistry(
+        settings.model_registry_path,
+        poll_interval=settings.model_reload_poll_seconds,
+        service_options={
+            "image_cache_size": settings.image_cache_size,
+            "image_cache_max_distance": settings.image_cache_max_distance,
+            "image_cache_max_pixel_difference": settings.image_cache_max_pixel_difference,
+            "ingredient_cascade_threshold": settings.ingredient_cascade_threshold,
+            "verdict_reuse_similarity": settings.verdict_reuse_similarity,
+            "verdict_index_dir": settings.verdict_index_dir,
+            "verdict_index_max_entries": settings.verdict_index_max_entries,
+            "verdict_index_keep_versions": settings.verdict_index_keep_versions,
+            "threads": ThreadTopology.from_settings(settings),
+            "ocr_pool": get_ocr_pool(),
+        },
+    )
+    registry.start()
+    return registry
 
 
 def get_halal_classifier_service() -> HalalClassifierService:
-    return _get_classifier()
+    return get_model_registry().active
+
+
+@lru_cache
+def get_device_bundle_cache() -> DeviceBundleCache:
+    return DeviceBundleCache(get_model_registry(), EcodeHistory(settings.ecode_history_dir))
+
+
+@lru_cache
+def get_scan_history_store() -> ScanHistoryStore:
+    store = ScanHistoryStore(settings.scan_history_path)
+    store.start()
+    return store
+
+
+def close_scan_history_store() -> None:
+    """Write out scans still queued for the history writer on shutdown."""
+    if get_scan_history_store.cache_info().currsize:
+        get_scan_history_store().close()
+
 
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled. Please set ADMIN_API_KEY.",
+        )
+    if not secrets.compare_digest(x_admin_token or "", settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing X-Admin-Token header.",
+        )
@@ -1,10 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from .endpoints import chat, health, products
+from ..deps import require_admin
+from .endpoints import admin, bundle, chat, health, history, models, products
 
 
 router = APIRouter()
 router.include_router(health.router, tags=["Health"])
 router.include_router(products.router, prefix="/products", tags=["Products"])
+router.include_router(history.router, prefix="/history", tags=["History"])
 router.include_router(chat.router, prefix="/chat", tags=["Chat"])
+router.include_router(models.router, prefix="/models", tags=["Models"])
+router.include_router(bundle.router, prefix="/bundle", tags=["Bundle"])
+router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
 
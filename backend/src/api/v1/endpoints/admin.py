@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from src.api.deps import get_ocr_pool
+from src.schemas.admin import AllocationReport, AllocationSiteReport, OcrPoolStatus
+from src.services.ocr_pool import OcrWorkerPool
+from src.services.profiler import DiagnosticBusyError, SamplingProfiler, capture_allocations
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Sample every worker thread for N seconds and return collapsed stacks",
+)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Sampling interval"),
+) -> PlainTextResponse:
+    profiler = SamplingProfiler(interval=interval_ms / 1000)
+    try:
+        profiler.start()
+    except DiagnosticBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        collapsed = profiler.stop()
+    return PlainTextResponse(
+        collapsed,
+        headers={
+            "Content-Disposition": 'attachment; filename="profile.collapsed"',
+            "X-Profile-Samples": str(profiler.samples),
+        },
+    )
+
+
+@router.get(
+    "/tracemalloc",
+    response_model=AllocationReport,
+    summary="Top allocation sites inside the classifier services over N seconds",
+)
+async def trace_allocations(
+    seconds: float = Query(10.0, gt=0, le=120),
+    limit: int = Query(25, ge=1, le=200),
+) -> AllocationReport:
+    try:
+        sites = await run_in_threadpool(capture_allocations, seconds, limit=limit)
+    except DiagnosticBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    return AllocationReport(
+        seconds=seconds,
+        sites=[
+            AllocationSiteReport(
+                service_frame=site.service_frame,
+                allocation_frame=site.allocation_frame,
+                size_bytes=site.size_bytes,
+                count=site.count,
+            )
+            for site in sites
+        ],
+    )
+
+
+@router.get("/ocr-pool", response_model=OcrPoolStatus, summary="OCR worker pool counters")
+async def ocr_pool_status(pool: OcrWorkerPool | None = Depends(get_ocr_pool)) -> OcrPoolStatus:
+    if pool is None:
+        return OcrPoolStatus(enabled=False)
+    return OcrPoolStatus(enabled=True, **pool.stats())
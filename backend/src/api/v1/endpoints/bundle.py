@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.api.deps import get_device_bundle_cache
+from src.schemas.bundle import DeviceBundleManifest, EcodeDeltaResponse
+from src.services.device_bundle import DeviceBundleCache
+
+
+router = APIRouter()
+
+BUNDLE_MEDIA_TYPE = "application/json"
+# Devices revalidate with If-None-Match on every sync; unchanged bundles cost a 304.
+REVALIDATE_HEADERS = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires: `W/` prefixes are ignored on both sides."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """True when Accept-Encoding allows gzip, honouring `q=0` exclusions and `*`."""
+    qualities: dict[str, float] = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            qualities[coding.strip()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0.0
+
+
+@router.get(
+    "/manifest",
+    response_model=DeviceBundleManifest,
+    summary="Current offline bundle version, for cheap polling",
+)
+async def bundle_manifest(cache: DeviceBundleCache = Depends(get_device_bundle_cache)) -> DeviceBundleManifest:
+    bundle = await run_in_threadpool(cache.current)
+    return DeviceBundleManifest(
+        version=bundle.version,
+        model_version=bundle.model_version,
+        ecode_version=bundle.ecode_version,
+        assets_version=bundle.assets_version,
+        fast_model_version=bundle.fast_model_version,
+        created_at=bundle.created_at,
+        size_bytes=len(bundle.body),
+        gzip_size_bytes=len(bundle.gzip_body),
+    )
+
+
+@router.get(
+    "",
+    summary="Download the offline bundle (E-codes, fast ingredient model, risk index)",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "The device already has this version"}},
+)
+async def download_bundle(
+    cache: DeviceBundleCache = Depends(get_device_bundle_cache),
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+) -> Response:
+    bundle = await run_in_threadpool(cache.current)
+    headers = {"ETag": bundle.etag, **REVALIDATE_HEADERS}
+    if _etag_matches(if_none_match, bundle.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if _accepts_gzip(accept_encoding):
+        return Response(
+            bundle.gzip_body,
+            media_type=BUNDLE_MEDIA_TYPE,
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+    return Response(bundle.body, media_type=BUNDLE_MEDIA_TYPE, headers=headers)
+
+
+@router.get(
+    "/ecodes",
+    response_model=EcodeDeltaResponse,
+    summary="E-code changes since a previously downloaded version",
+)
+async def ecode_delta(
+    since: str | None = Query(None, description="ecode_version the device currently holds"),
+    cache: DeviceBundleCache = Depends(get_device_bundle_cache),
+) -> EcodeDeltaResponse:
+    delta = await run_in_threadpool(cache.ecode_delta, since)
+    return EcodeDeltaResponse(
+        since=delta.since,
+        version=delta.version,
+        full=delta.full,
+        upserts=delta.upserts,
+        removed=delta.removed,
+    )
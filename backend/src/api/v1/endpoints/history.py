@@ -0,0 +1,106 @@
+import time
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.api.deps import get_scan_history_store
+from src.schemas.history import (
+    ScanHistoryAggregates,
+    ScanHistoryItem,
+    ScanHistoryPage,
+    ScanHistoryUpload,
+    ScanHistoryUploadResult,
+)
+from src.services.scan_history import ScanHistoryStore, UploadedScan
+
+
+router = APIRouter()
+
+
+def _require_device_id(x_device_id: str | None = Header(None)) -> str:
+    if not x_device_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide an X-Device-Id header to use scan history.",
+        )
+    return x_device_id
+
+
+@router.get("", response_model=ScanHistoryPage, summary="Most recent scans for the device")
+async def list_scan_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    device_id: str = Depends(_require_device_id),
+    store: ScanHistoryStore = Depends(get_scan_history_store),
+) -> ScanHistoryPage:
+    try:
+        entries, next_cursor = await run_in_threadpool(
+            store.list_scans, device_id, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return ScanHistoryPage(
+        items=[
+            ScanHistoryItem(
+                id=entry.id,
+                scanned_at=entry.scanned_at,
+                product_name=entry.product_name,
+                barcode=entry.barcode,
+                halal_status=entry.halal_status,
+                confidence=entry.confidence,
+                summary=entry.summary,
+                model_version=entry.model_version,
+            )
+            for entry in entries
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/aggregates",
+    response_model=ScanHistoryAggregates,
+    summary="Precomputed per-status scan counts for the device",
+)
+async def scan_history_aggregates(
+    device_id: str = Depends(_require_device_id),
+    store: ScanHistoryStore = Depends(get_scan_history_store),
+) -> ScanHistoryAggregates:
+    counts, last_scanned_at = await run_in_threadpool(store.aggregates, device_id)
+    return ScanHistoryAggregates(
+        total=sum(counts.values()),
+        counts=counts,
+        last_scanned_at=last_scanned_at,
+    )
+
+
+@router.post(
+    "",
+    response_model=ScanHistoryUploadResult,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Add scans the app classified on the device",
+)
+async def upload_scan_history(
+    upload: ScanHistoryUpload,
+    device_id: str = Depends(_require_device_id),
+    store: ScanHistoryStore = Depends(get_scan_history_store),
+) -> ScanHistoryUploadResult:
+    # Only enqueues, like `classify`; device clocks may run ahead, so future timestamps are clamped.
+    now = time.time()
+    accepted = sum(
+        store.record(
+            device_id,
+            UploadedScan(
+                product_name=item.product_name,
+                barcode=item.barcode,
+                halal_status=item.halal_status,
+                confidence=item.confidence,
+                summary=item.summary,
+                model_version=item.model_version,
+            ),
+            scanned_at=min(item.scanned_at, now),
+        )
+        for item in upload.items
+    )
+    return ScanHistoryUploadResult(accepted=accepted, dropped=len(upload.items) - accepted)
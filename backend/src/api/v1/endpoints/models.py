@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query, status
+
+from src.api.deps import get_model_registry, require_admin
+from src.schemas.models import IngredientCascadeStatus, ModelRegistryStatus
+from src.services.model_registry import ModelRegistry
+
+
+router = APIRouter()
+
+
+@router.get("/active", response_model=ModelRegistryStatus, summary="Active model version")
+async def active_model(
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> ModelRegistryStatus:
+    return ModelRegistryStatus(**registry.status())
+
+
+@router.get(
+    "/cascade",
+    response_model=IngredientCascadeStatus,
+    summary="Per-tier hit rates and latency of the ingredient model cascade",
+)
+async def ingredient_cascade(
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> IngredientCascadeStatus:
+    return IngredientCascadeStatus(**registry.active.cascade_status())
+
+
+@router.post(
+    "/reload",
+    response_model=ModelRegistryStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Load changed model artifacts in the background and swap them in",
+    dependencies=[Depends(require_admin)],
+)
+async def reload_models(
+    force: bool = Query(False, description="Reload even if the artifact version is unchanged"),
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> ModelRegistryStatus:
+    registry.reload_in_background(force=force)
+    return ModelRegistryStatus(**registry.status())
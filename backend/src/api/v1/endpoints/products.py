@@ -1,8 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import tempfile
 
-from src.api.deps import get_halal_classifier_service
-from src.schemas.product import HalalClassificationResponse, ProductClassificationRequest
-from src.services.halal_classifier import HalalClassifierService
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from src.api.deps import get_halal_classifier_service, get_model_registry, get_scan_history_store
+from src.schemas.bulk import BulkInputFormat
+from src.schemas.product import (
+    COMPACT_MEDIA_TYPE,
+    HalalClassificationResponse,
+    ProductClassificationRequest,
+)
+from src.services.bulk_classifier import (
+    BODY_SPOOL_MEMORY_BYTES,
+    DEFAULT_CHUNK_SIZE,
+    BulkClassificationJob,
+    BulkRow,
+    iter_body_lines,
+    iter_bulk_rows,
+)
+from src.services.classification_serializer import build_compact_response, build_full_response
+from src.services.halal_classifier import ClassifierClosedError, HalalClassifierService
+from src.services.model_registry import ModelRegistry
+from src.services.scan_history import ScanHistoryStore
 
 
 router = APIRouter()
@@ -31,14 +53,110 @@ async def sample_product() -> HalalClassificationResponse:
 )
 async def classify_product(
     request: ProductClassificationRequest,
+    compact: bool = Query(
+        False,
+        description="Return status codes, confidences and evidence IDs without prose "
+        f"(same as `Accept: {COMPACT_MEDIA_TYPE}`)",
+    ),
+    accept: str | None = Header(None),
+    x_device_id: str | None = Header(None),
     classifier: HalalClassifierService = Depends(get_halal_classifier_service),
-) -> HalalClassificationResponse:
+    history: ScanHistoryStore = Depends(get_scan_history_store),
+) -> Response:
     if not any([request.ingredients_text, request.image_base64, request.barcode]):
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Provide at least one of ingredients_text, image_base64, or barcode for classification.",
         )
 
-    prediction = classifier.predict(request.model_dump())
-    return HalalClassificationResponse(**prediction)
+    try:
+        if classifier.offloads_ocr:
+            # Pooled OCR can serve several photos at once, but only if the event loop keeps
+            # accepting requests while this one waits on a worker.
+            result = await run_in_threadpool(classifier.predict_result, request.model_dump())
+        else:
+            result = classifier.predict_result(request.model_dump())
+    except ClassifierClosedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The model version serving this request was replaced; retry.",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if x_device_id:
+        # Only enqueues; the history writer thread persists the scan.
+        history.record(x_device_id, result)
+    # Models are built pre-validated and serialized here so FastAPI skips re-validation.
+    if compact or (accept is not None and COMPACT_MEDIA_TYPE in accept):
+        return Response(
+            content=build_compact_response(result).model_dump_json(),
+            media_type=COMPACT_MEDIA_TYPE,
+        )
+    return Response(
+        content=build_full_response(result).model_dump_json(),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/classify/bulk",
+    summary="Stream NDJSON/CSV product rows through the classifier in bounded chunks",
+    response_class=StreamingResponse,
+)
+async def classify_products_bulk(
+    request: Request,
+    input_format: BulkInputFormat | None = Query(
+        None,
+        alias="format",
+        description="Input format; inferred from Content-Type (text/csv vs NDJSON) when omitted",
+    ),
+    offset: int = Query(0, ge=0, description="Skip rows before this index to resume a previous job"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=1024),
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> StreamingResponse:
+    if input_format is None:
+        content_type = request.headers.get("content-type", "")
+        input_format = "csv" if "csv" in content_type else "ndjson"
+
+    job = BulkClassificationJob(registry.active, offset=offset)
+
+    # The body is read in full before responding: StreamingResponse listens for client
+    # disconnects on the same receive channel, and any upload chunk that listener takes
+    # would be dropped from the rows.
+    spool = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_MEMORY_BYTES)
+    try:
+        async for body_chunk in request.stream():
+            await run_in_threadpool(spool.write, body_chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+
+    async def run_chunk(chunk: list[BulkRow]) -> AsyncIterator[str]:
+        # Long jobs outlive hot reloads; a replaced version is closed once it drains.
+        job.classifier = registry.active
+        records = await run_in_threadpool(job.classify_chunk, chunk)
+        for record in records:
+            yield record.model_dump_json() + "\n"
+
+    async def stream_records() -> AsyncIterator[str]:
+        chunk: list[BulkRow] = []
+        try:
+            rows = iter_bulk_rows(iter_body_lines(spool), input_format)
+            async for row in iterate_in_threadpool(rows):
+                if job.should_skip(row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    async for encoded in run_chunk(chunk):
+                        yield encoded
+                    yield job.progress().model_dump_json() + "\n"
+                    chunk = []
+
+            if chunk:
+                async for encoded in run_chunk(chunk):
+                    yield encoded
+            yield job.progress(final=True).model_dump_json() + "\n"
+        finally:
+            spool.close()
 
+    return StreamingResponse(stream_records(), media_type="application/x-ndjson")
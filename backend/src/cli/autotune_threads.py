@@ -0,0 +1,294 @@
+"""Sweep inference thread-pool sizes at a target concurrency and keep the fastest.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.autotune_threads --concurrency 8
+    python -m src.cli.autotune_threads --concurrency 16 --images scans/ --duration 30 --report tune.json
+
+TensorFlow fixes its pool sizes when its runtime starts, so every trial runs in a
+freshly spawned process that loads ``HalalClassifierService`` with the candidate
+topology and drives ``predict`` from ``--concurrency`` threads for ``--duration``
+seconds. The search is greedy per knob (TF intra-op, TF inter-op, torch, TFLite),
+starting from the library defaults; a value is kept only if it raises throughput
+by at least ``--min-gain``. Knobs the workload never exercises are left unset:
+the TFLite logo detector needs image payloads, torch (easyocr) needs images sent
+without ingredient text, and the TensorFlow pools need a warm-up pass in which
+some payload actually reaches a Keras model (a text the fast ingredient tier
+cannot answer, a barcode, or a logo scan without the TFLite detector). The winner
+is written to ``.env.threads``, which ``Settings`` reads before ``.env``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from ..core.config import BASE_DIR, settings
+from ..core.traffic_capture import iter_corpus
+from ..services.thread_topology import ThreadTopology
+
+LOGGER = logging.getLogger(__name__)
+
+KNOB_ORDER = ("tf_intra_op", "tf_inter_op", "torch", "tflite")
+TF_KNOBS = ("tf_intra_op", "tf_inter_op")
+# The warm-up pass that decides whether TensorFlow runs at all covers at most this many payloads.
+WARMUP_PAYLOADS = 200
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+DEFAULT_INGREDIENT_TEXTS = (
+    "sugar, wheat flour, palm oil, salt, soy lecithin, natural flavor",
+    "water, sugar, citric acid, sodium benzoate, natural flavors, red 40",
+    "pork, water, salt, sugar, sodium nitrite",
+    "milk chocolate (sugar, cocoa butter, milk, chocolate, soy lecithin), peanuts, corn syrup, gelatin",
+    "enriched flour, high fructose corn syrup, vegetable shortening, mono and diglycerides, e471, e120",
+    "tomatoes, water, salt, garlic, basil, olive oil",
+)
+
+
+def candidate_values(knob: str, cores: int, concurrency: int) -> list[int]:
+    share = max(1, cores // max(1, concurrency))
+    if knob == "tf_inter_op":
+        values = {1, 2, 4}
+    else:
+        values = {1, 2, share, max(1, cores // 2), cores}
+    return sorted(value for value in values if value <= cores)
+
+
+def exercised_knobs(payloads: list[dict[str, Any]], *, tensorflow_payloads: int) -> list[str]:
+    """Knobs whose thread pool the workload actually runs; others would be tuned on noise.
+
+    `tensorflow_payloads` comes from `probe_workload`: when the fast tier answers
+    every text and nothing else reaches Keras, the TF pools never run.
+    """
+
+    images = [payload for payload in payloads if payload.get("image_base64")]
+    exercised = set(TF_KNOBS) if tensorflow_payloads else set()
+    if images:
+        exercised.add("tflite")
+    if any(not payload.get("ingredients_text") for payload in images):
+        exercised.add("torch")
+    return [knob for knob in KNOB_ORDER if knob in exercised]
+
+
+def load_payloads(args: argparse.Namespace) -> list[dict[str, Any]]:
+    payloads: list[dict[str, Any]] = []
+    for directory in args.traffic_corpus:
+        payloads.extend(
+            record["body"] for record in iter_corpus(directory) if record["path"].endswith("/products/classify")
+        )
+    if args.images is not None:
+        for path in sorted(args.images.rglob("*")):
+            if path.suffix.lower() in IMAGE_SUFFIXES:
+                encoded = base64.b64encode(path.read_bytes()).decode("ascii")
+                payloads.append({"image_base64": encoded, "capture_mode": "ingredients"})
+    if not payloads:
+        payloads = [{"ingredients_text": text} for text in DEFAULT_INGREDIENT_TEXTS]
+    return payloads[: args.limit] if args.limit else payloads
+
+
+def _nearest_rank(sorted_values: list[float], percentile: int) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = -(-percentile * len(sorted_values) // 100) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def probe_workload(model_dir: str, payloads: list[dict[str, Any]]) -> dict[str, int]:
+    """Runs in a spawned child: classify each payload once and count those that reach a Keras model."""
+
+    from ..services.fast_ingredient_model import TIER_FULL
+    from ..services.halal_classifier import EVIDENCE_INGREDIENT_MODEL, HalalClassifierService
+
+    logging.basicConfig(level=logging.WARNING)
+    service = HalalClassifierService(model_dir=Path(model_dir), image_cache_size=0)
+    service.load()
+    keras_logo = service._logo_interpreter is None
+    tensorflow_payloads = 0
+    for payload in payloads:
+        result = service.predict_result(payload)
+        if (
+            (result.ingredients is not None and result.ingredients.source == EVIDENCE_INGREDIENT_MODEL)
+            or result.barcode_model is not None
+            or (keras_logo and result.logo is not None)
+        ):
+            tensorflow_payloads += 1
+    return {
+        "payloads": len(payloads),
+        "tensorflow_payloads": tensorflow_payloads,
+        "escalated_texts": service.cascade_stats.snapshot()["tiers"][TIER_FULL]["count"],
+    }
+
+
+def run_trial(
+    topology: dict[str, Optional[int]],
+    model_dir: str,
+    payloads: list[dict[str, Any]],
+    concurrency: int,
+    duration: float,
+) -> dict[str, Any]:
+    """Runs in a spawned child: load, warm up, then drive `predict` until the deadline."""
+
+    from ..services.halal_classifier import HalalClassifierService
+
+    logging.basicConfig(level=logging.WARNING)
+    service = HalalClassifierService(
+        model_dir=Path(model_dir),
+        threads=ThreadTopology(**topology),
+        # Repeated images would otherwise be served from the cache instead of measured.
+        image_cache_size=0,
+    )
+    service.load()
+    for payload in payloads[:concurrency]:
+        service.predict(payload)
+
+    latencies: list[float] = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    def drive() -> None:
+        while time.perf_counter() < deadline:
+            payload = payloads[next(counter) % len(payloads)]
+            started = time.perf_counter()
+            service.predict(payload)
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(drive) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "topology": topology,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(_nearest_rank(latencies, 50), 2),
+        "p99_ms": round(_nearest_rank(latencies, 99), 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per worker process")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per trial")
+    parser.add_argument("--images", type=Path, help="Directory of product photos to include in the workload")
+    parser.add_argument("--traffic-corpus", type=Path, action="append", default=[])
+    parser.add_argument("--limit", type=int, help="Cap on distinct workload payloads")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="Cores available to one worker")
+    parser.add_argument("--min-gain", type=float, default=0.02, help="Relative throughput gain to keep a value")
+    parser.add_argument("--output", "-o", type=Path, default=BASE_DIR / ".env.threads")
+    parser.add_argument("--report", type=Path, help="Write every trial's results here as JSON")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    payloads = load_payloads(args)
+
+    # Spawn rather than fork: TensorFlow and easyocr are not fork-safe.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        warmup = pool.apply(probe_workload, (str(args.model_dir), payloads[:WARMUP_PAYLOADS]))
+    LOGGER.info(
+        "Warm-up: %s of %s payloads reached a Keras model (%s texts escalated past the fast tier)",
+        warmup["tensorflow_payloads"],
+        warmup["payloads"],
+        warmup["escalated_texts"],
+    )
+    knobs = exercised_knobs(payloads, tensorflow_payloads=warmup["tensorflow_payloads"])
+    LOGGER.info(
+        "Tuning %s on %s payloads at concurrency %s over %s cores",
+        ", ".join(knobs),
+        len(payloads),
+        args.concurrency,
+        args.cores,
+    )
+    if not warmup["tensorflow_payloads"]:
+        LOGGER.warning(
+            "Leaving %s at library defaults; the fast ingredient tier answered every text "
+            "and no payload reached a Keras model.",
+            ", ".join(TF_KNOBS),
+        )
+    skipped = [knob for knob in KNOB_ORDER if knob not in knobs and knob not in TF_KNOBS]
+    if skipped:
+        LOGGER.warning(
+            "Leaving %s at library defaults; pass --images or a corpus with photo scans to tune them.",
+            ", ".join(skipped),
+        )
+
+    trials: list[dict[str, Any]] = []
+
+    def measure(topology: ThreadTopology) -> dict[str, Any]:
+        with context.Pool(1) as pool:
+            result = pool.apply(
+                run_trial,
+                (topology.as_dict(), str(args.model_dir), payloads, args.concurrency, args.duration),
+            )
+        trials.append(result)
+        LOGGER.info(
+            "%s -> %.2f req/s (p50 %.1f ms, p99 %.1f ms)",
+            topology.describe(),
+            result["throughput_rps"],
+            result["p50_ms"],
+            result["p99_ms"],
+        )
+        return result
+
+    best = ThreadTopology()
+    baseline = best_result = measure(best)
+    for knob in knobs:
+        for value in candidate_values(knob, args.cores, args.concurrency):
+            candidate = best.replace(**{knob: value})
+            result = measure(candidate)
+            if result["throughput_rps"] > best_result["throughput_rps"] * (1 + args.min_gain):
+                best, best_result = candidate, result
+
+    gain = (
+        best_result["throughput_rps"] / baseline["throughput_rps"] - 1 if baseline["throughput_rps"] else 0.0
+    )
+    LOGGER.info(
+        "Best: %s at %.2f req/s (%+.0f%% vs defaults)", best.describe(), best_result["throughput_rps"], gain * 100
+    )
+
+    lines = [
+        f"# Written by src.cli.autotune_threads for {args.cores} cores at concurrency {args.concurrency}.",
+        *(f"{name}={value}" for name, value in best.as_env().items()),
+    ]
+    args.output.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    LOGGER.info("Wrote %s", args.output)
+
+    if args.report:
+        report = {
+            "cores": args.cores,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "tuned_knobs": knobs,
+            "warmup": warmup,
+            "baseline": baseline,
+            "best": best_result,
+            "trials": trials,
+        }
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Classify product images and ingredient texts offline across a process pool.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.batch_classify --images scans/ --output results.parquet
+    python -m src.cli.batch_classify --ingredients catalog.csv --workers 8 --output results.csv
+
+Each worker process loads ``HalalClassifierService`` once and then pulls work items
+from the pool, so OCR-heavy backfills can use every core without HTTP overhead.
+Throughput is logged periodically while the batch runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import csv
+import importlib.util
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    from ..services.halal_classifier import HalalClassifierService
+
+LOGGER = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+OUTPUT_COLUMNS = [
+    "source",
+    "product_name",
+    "barcode",
+    "halal_status",
+    "confidence",
+    "evidence",
+    "recognized_ingredients_text",
+    "model_version",
+    "error",
+]
+
+# Populated once per worker process by `_init_worker`.
+_WORKER_CLASSIFIER: Optional["HalalClassifierService"] = None
+# Set instead when the models fail to load; an initializer that raises would make
+# the pool respawn workers forever.
+_WORKER_INIT_ERROR: Optional[str] = None
+
+
+def _init_worker(model_dir: str) -> None:
+    # Imported here so the parent process never initializes TensorFlow.
+    from ..services.halal_classifier import HalalClassifierService
+    from ..services.thread_topology import ThreadTopology
+
+    global _WORKER_CLASSIFIER, _WORKER_INIT_ERROR
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        # Every image is a different product, so the near-duplicate cache only risks false hits.
+        service = HalalClassifierService(
+            model_dir=Path(model_dir), image_cache_size=0, threads=ThreadTopology.from_settings(settings)
+        )
+        service.load()
+    except Exception as exc:
+        _WORKER_INIT_ERROR = f"Worker failed to load models: {exc}"
+        return
+    _WORKER_CLASSIFIER = service
+
+
+def _classify_item(item: dict[str, Any]) -> dict[str, Any]:
+    row: dict[str, Any] = {column: None for column in OUTPUT_COLUMNS}
+    row["source"] = item["source"]
+    row["product_name"] = item.get("product_name")
+    row["barcode"] = item.get("barcode")
+
+    if _WORKER_CLASSIFIER is None:
+        row["error"] = _WORKER_INIT_ERROR or "Worker classifier is not initialized."
+        row["fatal"] = True
+        return row
+
+    payload = {key: item.get(key) for key in ("product_name", "barcode", "ingredients_text", "capture_mode")}
+    try:
+        image_path = item.get("image_path")
+        if image_path:
+            payload["image_base64"] = base64.b64encode(Path(image_path).read_bytes()).decode("ascii")
+        prediction = _WORKER_CLASSIFIER.predict(payload)
+    except Exception as exc:  # pragma: no cover - runtime safety
+        row["error"] = str(exc)
+        return row
+
+    row.update(
+        product_name=prediction["product_name"],
+        halal_status=prediction["halal_status"],
+        confidence=prediction["confidence"],
+        evidence="; ".join(prediction["evidence"]),
+        recognized_ingredients_text=prediction["recognized_ingredients_text"],
+        model_version=prediction["model_version"],
+    )
+    return row
+
+
+def iter_image_items(directory: Path) -> Iterator[dict[str, Any]]:
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES:
+            yield {"source": str(path), "product_name": path.stem, "image_path": str(path)}
+
+
+def iter_ingredient_items(csv_path: Path) -> Iterator[dict[str, Any]]:
+    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
+        for line_number, record in enumerate(csv.DictReader(handle), start=2):
+            if not (record.get("ingredients_text") or record.get("barcode")):
+                continue
+            yield {
+                "source": f"{csv_path}:{line_number}",
+                "product_name": record.get("product_name") or None,
+                "barcode": record.get("barcode") or None,
+                "ingredients_text": record.get("ingredients_text") or None,
+                "capture_mode": "ingredients",
+            }
+
+
+def source_sort_key(source: str) -> tuple[str, int]:
+    """Order `catalog.csv:10` after `catalog.csv:2`; image paths sort by name."""
+    path, _, line = source.rpartition(":")
+    if path and line.isdigit():
+        return path, int(line)
+    return source, 0
+
+
+class ThroughputReporter:
+    def __init__(self, interval: float = 5.0) -> None:
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self.completed = 0
+        self.failed = 0
+
+    def record(self, row: dict[str, Any]) -> None:
+        self.completed += 1
+        if row.get("error"):
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self) -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        LOGGER.info(
+            "%s items classified (%s failed) in %.1fs – %.2f items/s",
+            self.completed,
+            self.failed,
+            elapsed,
+            self.completed / elapsed,
+        )
+
+
+def write_rows(rows: list[dict[str, Any]], output: Path) -> None:
+    if output.suffix.lower() == ".parquet":
+        import pandas as pd
+
+        pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_parquet(output, index=False)
+        return
+    with open(output, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, help="Directory of product images (searched recursively)")
+    parser.add_argument(
+        "--ingredients",
+        type=Path,
+        help="CSV with product_name, barcode and/or ingredients_text columns",
+    )
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Destination .csv or .parquet file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=4, help="Items handed to a worker per dispatch")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Seconds between throughput logs")
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.images is None and args.ingredients is None:
+        parser.error("Provide --images and/or --ingredients.")
+    if args.output.suffix.lower() == ".parquet" and not (
+        importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet")
+    ):
+        parser.error("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead.")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    items: list[dict[str, Any]] = []
+    if args.images is not None:
+        items.extend(iter_image_items(args.images))
+    if args.ingredients is not None:
+        items.extend(iter_ingredient_items(args.ingredients))
+    if not items:
+        LOGGER.warning("No images or ingredient rows found; nothing to classify.")
+        return 0
+
+    workers = max(1, min(args.workers, len(items)))
+    LOGGER.info("Classifying %s items across %s worker processes", len(items), workers)
+
+    reporter = ThroughputReporter(interval=args.report_interval)
+    rows: list[dict[str, Any]] = []
+    # Spawn rather than fork: TensorFlow and easyocr are not fork-safe.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=(str(args.model_dir),)) as pool:
+        for row in pool.imap_unordered(_classify_item, items, chunksize=max(1, args.chunksize)):
+            if row.pop("fatal", False):
+                LOGGER.error("%s", row["error"])
+                pool.terminate()
+                return 1
+            rows.append(row)
+            reporter.record(row)
+    reporter.report()
+
+    rows.sort(key=lambda row: source_sort_key(row["source"]))
+    write_rows(rows, args.output)
+    LOGGER.info("Wrote %s rows to %s", len(rows), args.output)
+    return 1 if reporter.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Benchmark logo-model image preprocessing: fused lookup-table path vs the previous float path.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.benchmark_preprocessing
+    python -m src.cli.benchmark_preprocessing --images scans/ --size 320 --iterations 200
+
+For each input layout (float32, uint8 at scale 1/255, int8, and a generic uint8
+quantization) the report gives per-image latency, peak traced allocation per
+call, and the largest output difference between the two paths. Differences come
+from the reducing resize; with identical resized pixels the fused table matches
+the old arithmetic up to float rounding.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+from ..services.image_preprocessing import ImagePreprocessor
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+LAYOUTS: dict[str, tuple[Any, Optional[tuple[float, float]]]] = {
+    "float32": (np.float32, None),
+    "uint8_raw": (np.uint8, (1 / 255, 0.0)),
+    "int8": (np.int8, (1 / 255, -128.0)),
+    "uint8_quantized": (np.uint8, (0.0078125, 128.0)),
+}
+
+
+def legacy_preprocess(
+    image: Image.Image, height: int, width: int, dtype: Any, quant: Optional[tuple[float, float]]
+) -> np.ndarray:
+    """The float32 normalize-then-quantize path `HalalClassifierService` used before."""
+
+    resized = image.resize((width, height))
+    array = np.expand_dims(np.asarray(resized, dtype=np.float32) / 255.0, axis=0)
+    if quant is None:
+        return array.astype(dtype, copy=False)
+    scale, zero_point = quant
+    converted = array / scale + zero_point
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        converted = np.clip(np.round(converted), info.min, info.max)
+    return converted.astype(dtype)
+
+
+def load_images(directory: Optional[Path], count: int, seed: int) -> list[Image.Image]:
+    if directory is not None:
+        paths = [path for path in sorted(directory.rglob("*")) if path.suffix.lower() in IMAGE_SUFFIXES]
+        return [Image.open(path).convert("RGB") for path in paths[:count]]
+    # Phone-camera sized frames with smooth gradients plus noise, so resizing does real work.
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        gradient = np.linspace(0, 255, 1600, dtype=np.float32)[None, :, None]
+        noise = rng.normal(0, 25, size=(1200, 1600, 3))
+        frame = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        images.append(Image.fromarray(frame, "RGB"))
+    return images
+
+
+def time_per_image(function: Callable[[Image.Image], Any], images: list[Image.Image], iterations: int) -> float:
+    for image in images[:2]:
+        function(image)
+    started = time.perf_counter()
+    for index in range(iterations):
+        function(images[index % len(images)])
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def peak_allocation(function: Callable[[Image.Image], Any], image: Image.Image) -> int:
+    function(image)
+    tracemalloc.start()
+    try:
+        function(image)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(images: list[Image.Image], size: int, iterations: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name, (dtype, quant) in LAYOUTS.items():
+        preprocessor = ImagePreprocessor(size, size, dtype, quant)
+
+        def legacy(image: Image.Image, dtype: Any = dtype, quant: Any = quant) -> np.ndarray:
+            return legacy_preprocess(image, size, size, dtype, quant)
+
+        legacy_ms = time_per_image(legacy, images, iterations)
+        fused_ms = time_per_image(preprocessor, images, iterations)
+
+        sample = images[0]
+        end_to_end = np.abs(legacy(sample).astype(np.float64) - preprocessor(sample).astype(np.float64)).max()
+        # Same resized pixels through both conversions isolates the fused arithmetic.
+        resized = sample.resize((size, size), Image.Resampling.BICUBIC)
+        fused_only = np.abs(
+            legacy(resized).astype(np.float64) - preprocessor(resized).astype(np.float64)
+        ).max()
+
+        results[name] = {
+            "raw_input": preprocessor.raw_input,
+            "legacy_ms": round(legacy_ms, 3),
+            "fused_ms": round(fused_ms, 3),
+            "speedup": round(legacy_ms / fused_ms, 2) if fused_ms else None,
+            "legacy_peak_bytes": peak_allocation(legacy, sample),
+            "fused_peak_bytes": peak_allocation(preprocessor, sample),
+            "max_abs_diff": float(end_to_end),
+            "max_abs_diff_same_resize": float(fused_only),
+        }
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, help="Directory of sample photos; synthetic frames otherwise")
+    parser.add_argument("--count", type=int, default=8, help="Distinct images to cycle through")
+    parser.add_argument("--size", type=int, default=224, help="Square model input size")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    images = load_images(args.images, args.count, args.seed)
+    if not images:
+        print("No images found.", file=sys.stderr)
+        return 1
+    report = {
+        "images": len(images),
+        "source_size": list(images[0].size),
+        "input_size": args.size,
+        "layouts": benchmark(images, args.size, args.iterations),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
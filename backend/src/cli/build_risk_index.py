@@ -0,0 +1,213 @@
+"""Build the per-token halal risk index used for cheap, explainable ingredient triage.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.build_risk_index
+    python -m src.cli.build_risk_index --with-model-attributions --attribution-threshold 0.7
+
+Entries come from three sources, keeping the highest weight per term:
+
+1. A curated list of well-known haram and doubtful ingredients.
+2. E-code names from ``ecode_database.csv`` (Haram/Mushbooh rows).
+3. Optionally, single-token attributions from ``ingredient_text_classifier.h5``.
+
+Only terms whose tokens all appear in ``ingredient_text_vocab.json`` are kept, so
+the index stays aligned with what the ingredient model can see.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import sys
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..core.config import settings
+from ..services.risk_index import RISK_INDEX_FILENAME, IngredientRiskIndex, RiskEntry, tokenize
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_NGRAM = 3
+ECODE_STATUS_WEIGHTS = {"haram": ("Haram", 0.9), "mushbooh": ("Doubtful", 0.6), "doubtful": ("Doubtful", 0.6)}
+
+CURATED_TERMS: dict[str, tuple[str, float, str]] = {
+    "pork": ("Haram", 1.0, "Pork and pork derivatives are haram"),
+    "pig": ("Haram", 1.0, "Pig-derived ingredient"),
+    "porcine": ("Haram", 1.0, "Porcine (pig) source"),
+    "lard": ("Haram", 1.0, "Lard is rendered pig fat"),
+    "bacon": ("Haram", 1.0, "Bacon is a pork product"),
+    "ham": ("Haram", 0.95, "Ham is a pork product"),
+    "pork fat": ("Haram", 1.0, "Pork fat"),
+    "alcohol": ("Haram", 0.9, "Contains alcohol"),
+    "ethanol": ("Haram", 0.85, "Contains ethanol"),
+    "wine": ("Haram", 0.9, "Contains wine"),
+    "beer": ("Haram", 0.9, "Contains beer"),
+    "rum": ("Haram", 0.9, "Contains rum"),
+    "brandy": ("Haram", 0.9, "Contains brandy"),
+    "whiskey": ("Haram", 0.9, "Contains whiskey"),
+    "bourbon": ("Haram", 0.9, "Contains bourbon"),
+    "liquor": ("Haram", 0.9, "Contains liquor"),
+    "mirin": ("Haram", 0.85, "Mirin is a rice wine"),
+    "sake": ("Haram", 0.85, "Sake is a rice wine"),
+    "gelatin": ("Doubtful", 0.8, "Gelatin is often pork- or non-zabiha-derived unless certified"),
+    "gelatine": ("Doubtful", 0.8, "Gelatine is often pork- or non-zabiha-derived unless certified"),
+    "collagen": ("Doubtful", 0.7, "Collagen source animal and slaughter are usually undisclosed"),
+    "carmine": ("Doubtful", 0.7, "Carmine (E120) is insect-derived; rulings differ"),
+    "cochineal": ("Doubtful", 0.7, "Cochineal (E120) is insect-derived; rulings differ"),
+    "shellac": ("Doubtful", 0.5, "Shellac (E904) is insect-derived"),
+    "rennet": ("Doubtful", 0.6, "Rennet may come from non-zabiha calves"),
+    "pepsin": ("Doubtful", 0.7, "Pepsin is commonly extracted from pig stomachs"),
+    "lipase": ("Doubtful", 0.5, "Lipase enzymes may be animal-derived"),
+    "enzymes": ("Doubtful", 0.4, "Enzyme source is undisclosed"),
+    "tallow": ("Doubtful", 0.7, "Tallow is animal fat of unknown slaughter"),
+    "animal fat": ("Doubtful", 0.7, "Animal fat of unknown source"),
+    "shortening": ("Doubtful", 0.4, "Shortening may contain animal fat"),
+    "mono and diglycerides": ("Doubtful", 0.5, "Mono- and diglycerides (E471) may be animal-derived"),
+    "monoglycerides": ("Doubtful", 0.5, "Monoglycerides (E471) may be animal-derived"),
+    "diglycerides": ("Doubtful", 0.5, "Diglycerides (E471) may be animal-derived"),
+    "glycerin": ("Doubtful", 0.4, "Glycerin may be animal-derived"),
+    "glycerine": ("Doubtful", 0.4, "Glycerine may be animal-derived"),
+    "cysteine": ("Doubtful", 0.6, "L-cysteine (E920) may come from hair or feathers"),
+    "lcysteine": ("Doubtful", 0.6, "L-cysteine (E920) may come from hair or feathers"),
+    "vanilla extract": ("Doubtful", 0.3, "Vanilla extract is usually alcohol-based"),
+    "chicken": ("Doubtful", 0.4, "Poultry requires halal slaughter certification"),
+    "beef": ("Doubtful", 0.4, "Beef requires halal slaughter certification"),
+}
+
+
+def load_vocab_tokens(model_dir: Path) -> set[str]:
+    with open(model_dir / "ingredient_text_vocab.json", "r", encoding="utf-8") as handle:
+        vocabulary = json.load(handle)
+    tokens: set[str] = set()
+    for item in vocabulary:
+        tokens.update(tokenize(str(item)))
+    return tokens
+
+
+def _normalize_term(term: str, vocab_tokens: set[str]) -> Optional[str]:
+    tokens = tokenize(term)
+    if not tokens or len(tokens) > MAX_NGRAM:
+        return None
+    if any(token not in vocab_tokens for token in tokens):
+        return None
+    return " ".join(tokens)
+
+
+def _merge(entries: dict[str, RiskEntry], term: str, entry: RiskEntry) -> None:
+    existing = entries.get(term)
+    if existing is None or entry.weight > existing.weight:
+        entries[term] = entry
+
+
+def curated_entries(vocab_tokens: set[str]) -> Iterable[tuple[str, RiskEntry]]:
+    for raw_term, (status, weight, evidence) in CURATED_TERMS.items():
+        term = _normalize_term(raw_term, vocab_tokens)
+        if term is None:
+            LOGGER.info("Skipping curated term %r: not covered by the vocabulary", raw_term)
+            continue
+        yield term, RiskEntry(status=status, weight=weight, evidence=evidence)
+
+
+def ecode_entries(csv_path: Path, vocab_tokens: set[str]) -> Iterable[tuple[str, RiskEntry]]:
+    if not csv_path.exists():
+        LOGGER.warning("E-code database not found at %s; skipping E-code terms", csv_path)
+        return
+    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
+        for record in csv.DictReader(handle):
+            mapped = ECODE_STATUS_WEIGHTS.get((record.get("halal_status") or "").strip().lower())
+            if mapped is None:
+                continue
+            status, weight = mapped
+            code = (record.get("e_code_number") or "").strip().upper()
+            for name in (record.get("name") or "").split(";"):
+                term = _normalize_term(name, vocab_tokens)
+                if term is None:
+                    continue
+                yield term, RiskEntry(
+                    status=status,
+                    weight=weight,
+                    evidence=f"Matches {code} ({name.strip()}) labeled {status} in the E-code database",
+                )
+
+
+def model_attribution_entries(
+    model_dir: Path, vocab_tokens: set[str], threshold: float, batch_size: int = 512
+) -> Iterable[tuple[str, RiskEntry]]:
+    # Imported lazily: attributions are the only step that needs TensorFlow.
+    import numpy as np
+
+    from ..services.halal_classifier import HalalClassifierService
+
+    service = HalalClassifierService(model_dir=model_dir)
+    service._load_ingredient_model()
+    model = service._ingredient_model
+    if model is None:
+        LOGGER.warning("Ingredient model unavailable; skipping model attributions")
+        return
+    labels = service._ingredient_label_order
+
+    candidates = sorted(token for token in vocab_tokens if len(token) > 2 and not token.isdigit())
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start : start + batch_size]
+        scores = model.predict(np.array(batch, dtype=object), verbose=0)
+        for token, row in zip(batch, np.asarray(scores, dtype=np.float32)):
+            best = int(np.argmax(row))
+            status = labels[best]
+            probability = float(row[best])
+            if status == "Halal" or probability < threshold:
+                continue
+            yield token, RiskEntry(
+                status=status,
+                weight=round(probability, 4),
+                evidence=f"Ingredient model attributes {status} to this term (p={probability:.2f})",
+            )
+
+
+def build_index(
+    model_dir: Path, *, with_model_attributions: bool, attribution_threshold: float
+) -> IngredientRiskIndex:
+    vocab_tokens = load_vocab_tokens(model_dir)
+    entries: dict[str, RiskEntry] = {}
+    sources = [curated_entries(vocab_tokens), ecode_entries(model_dir / "ecode_database.csv", vocab_tokens)]
+    if with_model_attributions:
+        sources.append(model_attribution_entries(model_dir, vocab_tokens, attribution_threshold))
+    for source in sources:
+        for term, entry in source:
+            _merge(entries, term, entry)
+
+    digest = hashlib.sha1(
+        json.dumps({term: entry.__dict__ for term, entry in sorted(entries.items())}).encode("utf-8")
+    ).hexdigest()[:12]
+    max_ngram = max((len(term.split(" ")) for term in entries), default=1)
+    return IngredientRiskIndex(entries, max_ngram=max_ngram, version=digest)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    parser.add_argument("--output", "-o", type=Path, help=f"Defaults to <model-dir>/{RISK_INDEX_FILENAME}")
+    parser.add_argument("--with-model-attributions", action="store_true")
+    parser.add_argument("--attribution-threshold", type=float, default=0.7)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    index = build_index(
+        args.model_dir,
+        with_model_attributions=args.with_model_attributions,
+        attribution_threshold=args.attribution_threshold,
+    )
+    output = args.output or args.model_dir / RISK_INDEX_FILENAME
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(index.to_payload(), handle, indent=2, ensure_ascii=False)
+        handle.write("\n")
+    LOGGER.info("Wrote %s risk terms (version %s) to %s", len(index), index.version, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
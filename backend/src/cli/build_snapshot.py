@@ -0,0 +1,92 @@
+"""Pack the classifier's non-model artifacts into a memory-mappable snapshot.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.build_snapshot
+    python -m src.cli.build_snapshot --model-dir /srv/models/v7
+    python -m src.cli.build_snapshot --verify
+
+Re-run after changing ``ecode_database.csv``, the vocabulary, the label files or
+the risk index; the service ignores snapshots whose sources changed and falls
+back to parsing the originals. At load it only compares file sizes and mtimes;
+``--verify`` checks the existing snapshot against a full content digest instead
+of rebuilding it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+
+from pathlib import Path
+from typing import Optional
+
+from ..core.config import settings
+from ..services.snapshot import (
+    SNAPSHOT_FILENAME,
+    ServiceSnapshot,
+    build_snapshot_sections,
+    compute_source_digest,
+    write_snapshot,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+def verify_snapshot(path: Path, source_digest: str) -> int:
+    if not path.exists():
+        LOGGER.error("No snapshot at %s", path)
+        return 1
+    snapshot = ServiceSnapshot(path)
+    try:
+        if snapshot.source_digest != source_digest:
+            LOGGER.error("Snapshot %s is stale; its sources have changed.", path)
+            return 1
+        if snapshot.source_stamp() is None:
+            LOGGER.warning("Snapshot %s has no source stamp; rebuild it so loads skip hashing.", path)
+    finally:
+        snapshot.close()
+    LOGGER.info("Snapshot %s matches its sources.", path)
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    parser.add_argument("--output", "-o", type=Path, help=f"Defaults to <model-dir>/{SNAPSHOT_FILENAME}")
+    parser.add_argument(
+        "--verify", action="store_true", help="Check the existing snapshot's content digest; do not rebuild"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    source_digest = compute_source_digest(args.model_dir)
+    if source_digest is None:
+        LOGGER.error("No snapshot sources found in %s", args.model_dir)
+        return 1
+
+    output = args.output or args.model_dir / SNAPSHOT_FILENAME
+    if args.verify:
+        return verify_snapshot(output, source_digest)
+
+    sections = build_snapshot_sections(args.model_dir)
+    write_snapshot(output, sections, source_digest=source_digest)
+
+    started = time.perf_counter()
+    snapshot = ServiceSnapshot(output)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    snapshot.close()
+    LOGGER.info(
+        "Wrote %s sections (%s bytes) to %s; mapping it takes %.2f ms",
+        len(sections),
+        output.stat().st_size,
+        output,
+        elapsed_ms,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
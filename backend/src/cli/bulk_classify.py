@@ -0,0 +1,104 @@
+"""Stream NDJSON/CSV product rows through the halal classifier without the HTTP layer.
+
+Usage (from ``backend/``)::
+
+    python -m src.cli.bulk_classify catalog.ndjson --output results.ndjson
+    python -m src.cli.bulk_classify catalog.csv --offset 120000 --output results.ndjson
+
+Each output line is a result, error, progress, or summary record. The summary's
+``next_offset`` can be passed back via ``--offset`` to resume an interrupted import.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from pathlib import Path
+from typing import Optional, TextIO
+
+from ..core.config import settings
+from ..schemas.bulk import BulkInputFormat, BulkProgressRecord
+from ..services.bulk_classifier import DEFAULT_CHUNK_SIZE, run_bulk_classification
+from ..services.halal_classifier import HalalClassifierService
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _infer_format(path: Optional[Path]) -> BulkInputFormat:
+    if path is not None and path.suffix.lower() == ".csv":
+        return "csv"
+    return "ndjson"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", type=Path, help="Input file; reads stdin when omitted")
+    parser.add_argument("--output", "-o", type=Path, help="Output NDJSON file; writes stdout when omitted")
+    parser.add_argument("--format", dest="input_format", choices=["ndjson", "csv"])
+    parser.add_argument("--offset", type=int, default=0, help="Row index to resume from")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    return parser
+
+
+def run(
+    source: TextIO,
+    sink: TextIO,
+    *,
+    input_format: BulkInputFormat,
+    offset: int,
+    chunk_size: int,
+    model_dir: Path,
+) -> BulkProgressRecord:
+    classifier = HalalClassifierService(model_dir=model_dir)
+    classifier.load()
+
+    summary = BulkProgressRecord(processed=0, succeeded=0, failed=0, next_offset=offset)
+    for record in run_bulk_classification(
+        classifier,
+        source,
+        input_format=input_format,
+        offset=offset,
+        chunk_size=chunk_size,
+    ):
+        sink.write(record.model_dump_json() + "\n")
+        if isinstance(record, BulkProgressRecord):
+            sink.flush()
+            summary = record
+            LOGGER.info(
+                "Processed %s rows (%s failed); next offset %s",
+                record.processed,
+                record.failed,
+                record.next_offset,
+            )
+    return summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    input_format: BulkInputFormat = args.input_format or _infer_format(args.input)
+    source = open(args.input, "r", encoding="utf-8", newline="") if args.input else sys.stdin
+    sink = open(args.output, "a" if args.offset else "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run(
+            source,
+            sink,
+            input_format=input_format,
+            offset=args.offset,
+            chunk_size=args.chunk_size,
+            model_dir=args.model_dir,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""Distill the Keras ingredient classifier into the fast linear tier of the cascade.
+
+Usage (from ``backend/``)::
+
+    # Teacher-label captured traffic plus synthetic lists drawn from the vocabulary.
+    python -m src.cli.distill_ingredient_model --traffic-corpus captures/ --synthetic 50000
+
+    # Labelled or unlabelled text files (.txt, .csv, .ndjson); only the text is used.
+    python -m src.cli.distill_ingredient_model --texts data/ingredients.csv --report calibration.json
+
+The student is a multinomial logistic regression over binary bag-of-words features
+of the ingredient vocabulary, fit to the teacher's soft probabilities (each text is
+repeated once per class, weighted by the teacher's probability). A temperature is
+then fit on a held-out split so the student's confidence tracks how often it agrees
+with the teacher, and the calibration report recommends the lowest cascade
+threshold that keeps end-to-end agreement above ``--target-agreement``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import sys
+import time
+
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.traffic_capture import iter_corpus
+from ..services.fast_ingredient_model import FAST_MODEL_FILENAME, FastIngredientClassifier, featurize
+from ..services.risk_index import RISK_INDEX_FILENAME
+
+LOGGER = logging.getLogger(__name__)
+
+TEXT_COLUMNS = ("ingredients_text", "ingredients", "ingredient_text", "text")
+THRESHOLDS = tuple(round(value, 2) for value in np.arange(0.5, 1.0, 0.01))
+CALIBRATION_BINS = 10
+
+
+def iter_text_file(path: Path) -> Iterator[str]:
+    suffix = path.suffix.lower()
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        if suffix == ".csv":
+            reader = csv.DictReader(handle)
+            column = next((name for name in TEXT_COLUMNS if name in (reader.fieldnames or [])), None)
+            if column is None:
+                raise ValueError(f"{path} has none of the columns {', '.join(TEXT_COLUMNS)}")
+            for row in reader:
+                yield row.get(column) or ""
+        elif suffix in {".ndjson", ".jsonl"}:
+            for line in handle:
+                if line.strip():
+                    record = json.loads(line)
+                    yield next((str(record[name]) for name in TEXT_COLUMNS if record.get(name)), "")
+        else:
+            yield from handle
+
+
+def iter_corpus_texts(directory: Path) -> Iterator[str]:
+    for record in iter_corpus(directory):
+        text = (record.get("body") or {}).get("ingredients_text")
+        if text:
+            yield text
+
+
+def synthetic_texts(vocabulary: list[str], risk_terms: list[str], count: int, seed: int) -> Iterator[str]:
+    """Random ingredient lists with Zipf-distributed tokens, since the vocabulary is frequency-ranked."""
+
+    rng = np.random.default_rng(seed)
+    tokens = [token for token in vocabulary if token and token != "[UNK]"]
+    ranks = np.arange(1, len(tokens) + 1, dtype=np.float64)
+    probabilities = 1.0 / ranks
+    probabilities /= probabilities.sum()
+    for _ in range(count):
+        length = int(rng.integers(3, 30))
+        picked = [tokens[index] for index in rng.choice(len(tokens), size=length, p=probabilities)]
+        # Seed a share of the lists with known risky terms so Haram/Doubtful are represented.
+        if risk_terms and rng.random() < 0.25:
+            picked.insert(int(rng.integers(0, len(picked) + 1)), risk_terms[int(rng.integers(len(risk_terms)))])
+        # Space-joined: the teacher and `featurize` split on whitespace only, so "salt," would be out of vocabulary.
+        yield " ".join(picked)
+
+
+def collect_texts(sources: Iterable[Iterable[str]], normalize: Any, limit: Optional[int]) -> list[str]:
+    seen: set[str] = set()
+    texts: list[str] = []
+    for source in sources:
+        for raw in source:
+            text = normalize(raw)
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            texts.append(text)
+            if limit and len(texts) >= limit:
+                return texts
+    return texts
+
+
+def teacher_probabilities(model: Any, texts: list[str], batch_size: int) -> np.ndarray:
+    batches = [
+        np.asarray(model.predict(np.array(texts[start : start + batch_size], dtype=object), verbose=0))
+        for start in range(0, len(texts), batch_size)
+    ]
+    probabilities = np.clip(np.concatenate(batches).astype(np.float64), 1e-7, None)
+    return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+def featurize_all(texts: list[str], token_index: dict[str, int]) -> Any:
+    from scipy import sparse
+
+    rows: list[int] = []
+    columns: list[int] = []
+    for row, text in enumerate(texts):
+        for column in {token_index[token] for token in featurize(text) if token in token_index}:
+            rows.append(row)
+            columns.append(column)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(texts), len(token_index))
+    )
+
+
+def fit_student(features: Any, targets: np.ndarray, regularization: float) -> tuple[np.ndarray, np.ndarray]:
+    """Soft-target cross-entropy via sample weights; returns (weights[V, C], bias[C])."""
+
+    from scipy import sparse
+    from sklearn.linear_model import LogisticRegression
+
+    classes = targets.shape[1]
+    stacked = sparse.vstack([features] * classes).tocsr()
+    labels = np.repeat(np.arange(classes), features.shape[0])
+    sample_weight = targets.T.reshape(-1)
+    model = LogisticRegression(C=regularization, max_iter=500)
+    model.fit(stacked, labels, sample_weight=sample_weight)
+    weights = model.coef_.T.astype(np.float64)
+    bias = model.intercept_.astype(np.float64)
+    # Softmax ignores per-row offsets; centring lets near-constant rows be pruned.
+    return weights - weights.mean(axis=1, keepdims=True), bias - bias.mean()
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exponentials = np.exp(shifted)
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+
+def fit_temperature(logits: np.ndarray, teacher_labels: np.ndarray) -> float:
+    """Temperature minimising NLL of the teacher's top class, i.e. calibrated to agreement."""
+
+    best_temperature, best_loss = 1.0, float("inf")
+    for temperature in np.exp(np.linspace(np.log(0.1), np.log(10.0), 200)):
+        probabilities = softmax(logits / temperature)
+        loss = -float(np.mean(np.log(probabilities[np.arange(len(teacher_labels)), teacher_labels] + 1e-12)))
+        if loss < best_loss:
+            best_temperature, best_loss = float(temperature), loss
+    return best_temperature
+
+
+def expected_calibration_error(confidence: np.ndarray, correct: np.ndarray) -> tuple[float, list[dict[str, Any]]]:
+    edges = np.linspace(0.0, 1.0, CALIBRATION_BINS + 1)
+    bins: list[dict[str, Any]] = []
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        mask = (confidence > low) & (confidence <= high)
+        if not mask.any():
+            continue
+        mean_confidence = float(confidence[mask].mean())
+        accuracy = float(correct[mask].mean())
+        error += mask.mean() * abs(mean_confidence - accuracy)
+        bins.append(
+            {
+                "range": [round(float(low), 2), round(float(high), 2)],
+                "count": int(mask.sum()),
+                "mean_confidence": round(mean_confidence, 4),
+                "agreement": round(accuracy, 4),
+            }
+        )
+    return round(float(error), 4), bins
+
+
+def threshold_sweep(confidence: np.ndarray, correct: np.ndarray) -> list[dict[str, Any]]:
+    sweep = []
+    for threshold in THRESHOLDS:
+        accepted = confidence >= threshold
+        coverage = float(accepted.mean())
+        accepted_agreement = float(correct[accepted].mean()) if accepted.any() else 1.0
+        # Escalated texts get the teacher's answer, so only accepted disagreements count.
+        cascade_agreement = 1.0 - coverage * (1.0 - accepted_agreement)
+        sweep.append(
+            {
+                "threshold": threshold,
+                "fast_coverage": round(coverage, 4),
+                "fast_agreement": round(accepted_agreement, 4),
+                "cascade_agreement": round(cascade_agreement, 4),
+            }
+        )
+    return sweep
+
+
+def measure_latency(student: FastIngredientClassifier, teacher: Any, texts: list[str]) -> dict[str, float]:
+    sample = texts[:200]
+    started = time.perf_counter()
+    for text in sample:
+        student.predict(text)
+    fast_ms = (time.perf_counter() - started) / len(sample) * 1000
+    started = time.perf_counter()
+    for text in sample[:50]:
+        teacher.predict(np.array([text], dtype=object), verbose=0)
+    full_ms = (time.perf_counter() - started) / len(sample[:50]) * 1000
+    return {"fast_ms": round(fast_ms, 4), "full_ms": round(full_ms, 3)}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", type=Path, default=settings.model_registry_path)
+    parser.add_argument("--output", "-o", type=Path, help=f"Defaults to <model-dir>/{FAST_MODEL_FILENAME}")
+    parser.add_argument("--texts", type=Path, action="append", default=[], help="Text, CSV or NDJSON file")
+    parser.add_argument("--traffic-corpus", type=Path, action="append", default=[])
+    parser.add_argument("--synthetic", type=int, default=20000, help="Synthetic lists to add; 0 disables")
+    parser.add_argument("--limit", type=int, help="Cap on distinct training texts")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for calibration")
+    parser.add_argument("--regularization", type=float, default=4.0, help="Inverse L2 strength (sklearn C)")
+    parser.add_argument("--min-weight", type=float, default=1e-3, help="Prune tokens below this weight")
+    parser.add_argument("--target-agreement", type=float, default=0.99)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--report", type=Path, help="Write the calibration report here")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Imported lazily: the teacher is the only step that needs TensorFlow.
+    from ..services.halal_classifier import HalalClassifierService
+
+    service = HalalClassifierService(model_dir=args.model_dir)
+    service._load_ingredient_model()
+    teacher = service._ingredient_model
+    if teacher is None:
+        LOGGER.error("Ingredient model unavailable in %s; nothing to distill.", args.model_dir)
+        return 1
+    labels = service._ingredient_label_order
+    vocabulary = service._load_vocabulary() or []
+
+    risk_terms: list[str] = []
+    risk_path = args.model_dir / RISK_INDEX_FILENAME
+    if risk_path.exists():
+        risk_terms = sorted(json.loads(risk_path.read_text(encoding="utf-8")).get("entries", {}))
+
+    sources: list[Iterable[str]] = [iter_text_file(path) for path in args.texts]
+    sources += [iter_corpus_texts(directory) for directory in args.traffic_corpus]
+    if args.synthetic:
+        sources.append(synthetic_texts(vocabulary, risk_terms, args.synthetic, args.seed))
+    texts = collect_texts(sources, service._normalize_ingredients_text, args.limit)
+    if len(texts) < 100:
+        LOGGER.error("Only %s distinct texts collected; need at least 100.", len(texts))
+        return 1
+    LOGGER.info("Teacher-labelling %s texts", len(texts))
+    targets = teacher_probabilities(teacher, texts, args.batch_size)
+
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    holdout = max(1, int(len(texts) * args.holdout))
+    validation_rows, training_rows = order[:holdout], order[holdout:]
+
+    tokens = [token for token in vocabulary if token and token != "[UNK]"]
+    token_index = {token: index for index, token in enumerate(tokens)}
+    features = featurize_all(texts, token_index)
+
+    LOGGER.info("Fitting student on %s texts over %s tokens", len(training_rows), len(tokens))
+    weights, bias = fit_student(features[training_rows], targets[training_rows], args.regularization)
+
+    keep = np.abs(weights).max(axis=1) >= args.min_weight
+    pruned_weights = np.where(keep[:, None], weights, 0.0)
+    validation_logits = features[validation_rows] @ pruned_weights + bias
+    teacher_labels = targets[validation_rows].argmax(axis=1)
+    temperature = fit_temperature(validation_logits, teacher_labels)
+
+    probabilities = softmax(validation_logits / temperature)
+    confidence = probabilities.max(axis=1)
+    correct = (probabilities.argmax(axis=1) == teacher_labels).astype(np.float64)
+    raw_confidence = softmax(validation_logits).max(axis=1)
+    ece_before, _ = expected_calibration_error(raw_confidence, correct)
+    ece_after, reliability = expected_calibration_error(confidence, correct)
+    sweep = threshold_sweep(confidence, correct)
+    suggested = next(
+        (row for row in sweep if row["cascade_agreement"] >= args.target_agreement),
+        sweep[-1],
+    )
+
+    payload_weights = {token: weights[index] for token, index in token_index.items() if keep[index]}
+    version = hashlib.sha1(
+        json.dumps(
+            {"labels": labels, "bias": bias.round(5).tolist(), "tokens": sorted(payload_weights)}
+        ).encode("utf-8")
+    ).hexdigest()[:12]
+    student = FastIngredientClassifier(
+        labels,
+        {token: row.astype(np.float32) for token, row in payload_weights.items()},
+        bias.astype(np.float32),
+        temperature=temperature,
+        version=version,
+        suggested_threshold=suggested["threshold"],
+    )
+    latency = measure_latency(student, teacher, [texts[row] for row in validation_rows])
+
+    report = {
+        "version": version,
+        "texts": len(texts),
+        "train": int(len(training_rows)),
+        "validation": int(len(validation_rows)),
+        "weighted_tokens": len(payload_weights),
+        "temperature": round(temperature, 4),
+        "agreement": round(float(correct.mean()), 4),
+        "ece_before_temperature": ece_before,
+        "ece_after_temperature": ece_after,
+        "reliability": reliability,
+        "suggested": suggested,
+        "latency": {
+            **latency,
+            "expected_cascade_ms": round(
+                latency["fast_ms"] + (1.0 - suggested["fast_coverage"]) * latency["full_ms"], 3
+            ),
+        },
+        "thresholds": sweep,
+    }
+
+    output = args.output or args.model_dir / FAST_MODEL_FILENAME
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(student.to_payload(), handle, ensure_ascii=False)
+        handle.write("\n")
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    LOGGER.info(
+        "Wrote fast classifier %s (%s tokens) to %s; agreement %.3f, ECE %.3f -> %.3f",
+        version,
+        len(payload_weights),
+        output,
+        report["agreement"],
+        ece_before,
+        ece_after,
+    )
+    LOGGER.info(
+        "Threshold %.2f serves %.1f%% of texts on the fast tier at %.2f%% cascade agreement "
+        "(%.3f ms vs %.1f ms per text)",
+        suggested["threshold"],
+        suggested["fast_coverage"] * 100,
+        suggested["cascade_agreement"] * 100,
+        latency["fast_ms"],
+        latency["full_ms"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Replay a captured traffic corpus against the API and report latency distributions.
+
+Usage (from ``backend/``)::
+
+    # Drive a running build over HTTP.
+    python -m src.cli.replay_traffic captures/ --target http://localhost:8000 --rate 20 --concurrency 8
+
+    # Run the app in-process with the real classifier and a local OpenRouter stub.
+    python -m src.cli.replay_traffic captures/ --in-process --openrouter-stub --report new.json
+
+    # Compare against a report from a previous build; exits 1 on regressions.
+    python -m src.cli.replay_traffic captures/ --in-process --openrouter-stub --baseline old.json
+
+Requests are sent in corpus order on a fixed schedule (``--rate`` per second), so
+two builds replayed against the same corpus see the same arrival pattern. Latency is
+measured from each request's scheduled send time, including any wait for one of the
+``--concurrency`` slots, so a server that falls behind shows it in the percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import socket
+import sys
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.traffic_capture import iter_corpus
+
+LOGGER = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+def _endpoint_name(path: str) -> str:
+    return "chat" if path.endswith("/chat/completions") else "classify"
+
+
+def _percentile(sorted_values: list[float], percentile: int) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = math.ceil(percentile / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def summarize(latencies: dict[str, list[float]], errors: dict[str, int], wall_seconds: float) -> dict[str, Any]:
+    endpoints: dict[str, Any] = {}
+    for name in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(name, []))
+        stats: dict[str, Any] = {
+            "count": len(values) + errors.get(name, 0),
+            "errors": errors.get(name, 0),
+            "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+        for percentile in PERCENTILES:
+            stats[f"p{percentile}_ms"] = round(_percentile(values, percentile), 2)
+        endpoints[name] = stats
+    total = sum(stats["count"] for stats in endpoints.values())
+    return {
+        "generated_at": time.time(),
+        "requests": total,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    """Return human-readable regressions where a percentile grew by more than `threshold`."""
+
+    regressions = []
+    for name, stats in current.get("endpoints", {}).items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        for percentile in PERCENTILES:
+            key = f"p{percentile}_ms"
+            old, new = previous.get(key, 0.0), stats.get(key, 0.0)
+            if old > 0 and (new - old) / old > threshold:
+                regressions.append(f"{name} {key}: {old:.1f} -> {new:.1f} ms (+{(new - old) / old:.0%})")
+        old_error_rate = previous["errors"] / previous["count"] if previous.get("count") else 0.0
+        new_error_rate = stats["errors"] / stats["count"] if stats.get("count") else 0.0
+        if new_error_rate > old_error_rate + 0.01:
+            regressions.append(f"{name} error rate: {old_error_rate:.1%} -> {new_error_rate:.1%}")
+    return regressions
+
+
+class OpenRouterStub:
+    """Minimal local stand-in for the OpenRouter completions API."""
+
+    def __init__(self, delay_seconds: float) -> None:
+        import uvicorn
+        from fastapi import FastAPI
+
+        stub = FastAPI()
+
+        @stub.post("/api/v1/chat/completions")
+        async def completions(payload: dict[str, Any]) -> dict[str, Any]:
+            await asyncio.sleep(delay_seconds)
+            return {
+                "model": payload.get("model") or "stub",
+                "choices": [{"message": {"role": "assistant", "content": "Stubbed reply."}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 2, "total_tokens": 2},
+            }
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(stub, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, name="openrouter-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/v1/chat/completions"
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(5.0)
+
+
+async def replay(
+    records: list[dict[str, Any]],
+    client: httpx.AsyncClient,
+    *,
+    rate: float,
+    concurrency: int,
+) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def send(index: int, record: dict[str, Any]) -> None:
+        # Latency runs from the scheduled send time, so time spent queued for a
+        # concurrency slot while the server falls behind is counted too.
+        scheduled = started + index / rate if rate > 0 else loop.time()
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        name = _endpoint_name(record["path"])
+        url = record["path"] + (f"?{record['query']}" if record.get("query") else "")
+        async with semaphore:
+            try:
+                response = await client.post(url, json=record["body"])
+                failed = response.status_code >= 400
+            except httpx.HTTPError as exc:
+                LOGGER.debug("Request %s failed: %s", index, exc)
+                failed = True
+            elapsed_ms = (loop.time() - scheduled) * 1000
+        if failed:
+            errors[name] = errors.get(name, 0) + 1
+        else:
+            latencies.setdefault(name, []).append(elapsed_ms)
+
+    await asyncio.gather(*(send(index, record) for index, record in enumerate(records)))
+    return summarize(latencies, errors, loop.time() - started)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=Path, help="Directory written by the traffic capture middleware")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--target", help="Base URL of a running API, e.g. http://localhost:8000")
+    target.add_argument("--in-process", action="store_true", help="Serve the app in this process via ASGI")
+    parser.add_argument("--openrouter-stub", action="store_true", help="Route chat calls to a local stub")
+    parser.add_argument("--stub-delay", type=float, default=0.2, help="Seconds the OpenRouter stub waits")
+    parser.add_argument("--rate", type=float, default=10.0, help="Requests per second; 0 sends as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, help="Replay at most this many requests")
+    parser.add_argument("--loops", type=int, default=1, help="Replay the corpus this many times")
+    parser.add_argument("--report", type=Path, help="Write the JSON latency report here")
+    parser.add_argument("--baseline", type=Path, help="Previous report to compare against")
+    parser.add_argument("--regression-threshold", type=float, default=0.10)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    corpus = list(iter_corpus(args.corpus))
+    records = list(itertools.islice(itertools.chain.from_iterable([corpus] * args.loops), args.limit))
+    if not records:
+        LOGGER.error("Corpus at %s is empty.", args.corpus)
+        return 1
+
+    stub: Optional[OpenRouterStub] = None
+    if args.openrouter_stub:
+        stub = OpenRouterStub(args.stub_delay)
+        stub.start()
+        if args.in_process:
+            settings.openrouter_completions_url = stub.url
+            settings.openrouter_api_key = settings.openrouter_api_key or "stub-key"
+        else:
+            LOGGER.warning(
+                "OpenRouter stub is at %s; start the target with OPENROUTER_COMPLETIONS_URL set to it.",
+                stub.url,
+            )
+
+    if args.in_process:
+        from ..api.deps import get_model_registry
+        from ..main import app
+
+        # Load models before the clock starts so cold start is not counted as latency.
+        get_model_registry()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=300.0
+        )
+    else:
+        client = httpx.AsyncClient(base_url=args.target, timeout=300.0)
+
+    async def run() -> dict[str, Any]:
+        async with client:
+            return await replay(records, client, rate=args.rate, concurrency=args.concurrency)
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    report["target"] = "in-process" if args.in_process else args.target
+    report["corpus"] = str(args.corpus)
+    print(json.dumps(report, indent=2))
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_reports(baseline, report, args.regression_threshold)
+        for regression in regressions:
+            LOGGER.warning("Regression: %s", regression)
+        if regressions:
+            return 1
+        LOGGER.info("No regressions beyond %.0f%% against %s", args.regression_threshold * 100, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
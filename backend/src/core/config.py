@@ -12,13 +12,50 @@ class Settings(BaseSettings):
     app_env: str = "development"
     cors_allow_origins: list[str] = ["*"]
     model_registry_path: Path = BASE_DIR / "src" / "models"
+    # Seconds between checks for changed model artifacts; 0 disables hot reload polling.
+    model_reload_poll_seconds: float = 0.0
+    admin_api_key: str | None = None
+    # Near-duplicate image cache for OCR/logo results, shared by every client; size 0 disables it.
+    image_cache_size: int = 0
+    # Maximum Hamming distance between 64-bit perceptual hashes to count as the same image.
+    image_cache_max_distance: int = 4
+    # Hash matches are confirmed by a mean absolute difference (0-255) of 64x64 grayscale thumbnails.
+    image_cache_max_pixel_difference: float = 6.0
+    # Fast-tier confidence needed to skip the full ingredient model; unset uses the
+    # threshold recommended by the distillation calibration report.
+    ingredient_cascade_threshold: float | None = None
+    # Token-set Jaccard similarity at which an earlier ingredient verdict is reused
+    # instead of running the models; unset or 0 disables the verdict index.
+    verdict_reuse_similarity: float | None = None
+    # One append-only file of verdicts per model version; stores submitted ingredient tokens.
+    verdict_index_dir: Path | None = BASE_DIR / "data" / "verdict_index"
+    verdict_index_max_entries: int = 200_000
+    # Verdict files kept, counting the active version's; older ones are deleted at load.
+    verdict_index_keep_versions: int = 2
+    # easyocr worker processes; 0 keeps a single in-process reader.
+    ocr_workers: int = 0
+    ocr_timeout_seconds: float = 30.0
+    # Inference thread pools; unset keeps each library's default of one thread per core.
+    # `python -m src.cli.autotune_threads` writes tuned values to `.env.threads`.
+    tf_intra_op_threads: int | None = None
+    tf_inter_op_threads: int | None = None
+    tflite_num_threads: int | None = None
+    torch_num_threads: int | None = None
+    scan_history_path: Path = BASE_DIR / "data" / "scan_history.sqlite3"
+    # Archive of E-code tables published in device bundles, used to serve deltas.
+    ecode_history_dir: Path = BASE_DIR / "data" / "ecode_versions"
+    # Opt-in capture of sampled classify/chat requests for replay load tests.
+    traffic_capture_dir: Path | None = None
+    traffic_capture_sample_rate: float = 0.05
     openrouter_api_key: str | None = None
+    openrouter_completions_url: str = "https://openrouter.ai/api/v1/chat/completions"
     openrouter_default_model: str = "deepseek/deepseek-chat-v3.1:free"
     openrouter_referer: str | None = None
     openrouter_title: str | None = None
 
     class Config:
-        env_file = ".env"
+        # Later files win, so hand-written `.env` values override autotuned ones.
+        env_file = (".env.threads", ".env")
         env_file_encoding = "utf-8"
 
 
@@ -0,0 +1,268 @@
+"""Opt-in capture of sampled production requests into an on-disk replay corpus.
+
+Corpus layout::
+
+    <dir>/requests.ndjson       one sanitized request per line, in arrival order
+    <dir>/images/<sha256>.bin   re-encoded image pixels, stored once per digest
+
+Sanitizing happens on a background thread: product names and device/auth headers
+are dropped, chat message contents are replaced with filler of the same length,
+and images are re-encoded from their pixels alone (dropping EXIF/XMP such as GPS
+position, device model and timestamps) and referenced by digest. `src.cli.replay_traffic` reads the corpus.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import io
+import json
+import logging
+import queue
+import random
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, MutableMapping, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+LOGGER = logging.getLogger(__name__)
+
+CAPTURED_PATH_SUFFIXES = ("/products/classify", "/chat/completions")
+CORPUS_REQUESTS_FILE = "requests.ndjson"
+CORPUS_IMAGES_DIR = "images"
+IMAGE_REF_PREFIX = "sha256:"
+MAX_CAPTURED_BODY_BYTES = 16 * 1024 * 1024
+_FILLER = "lorem ipsum dolor sit amet "
+CAPTURED_JPEG_QUALITY = 95
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+@dataclass
+class CapturedRequest:
+    captured_at: float
+    path: str
+    query_string: str
+    content_type: str
+    body: bytes
+    status: int
+    latency_ms: float
+
+
+def strip_image_metadata(raw: bytes) -> Optional[bytes]:
+    """Re-encode only the pixels of an uploaded image, or None if it cannot be decoded.
+
+    The EXIF orientation is applied to the pixels first so the stored image still
+    looks the way the classifier saw it.
+    """
+
+    try:
+        with Image.open(io.BytesIO(raw)) as source:
+            source_format = source.format
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            if source_format == "JPEG":
+                image.save(output, format="JPEG", quality=CAPTURED_JPEG_QUALITY)
+            else:
+                image.save(output, format="PNG")
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return output.getvalue()
+
+
+def _filler(length: int) -> str:
+    repeated = _FILLER * (length // len(_FILLER) + 1)
+    return repeated[:length]
+
+
+class TrafficCorpusWriter:
+    def __init__(self, directory: Path, *, queue_size: int = 1000) -> None:
+        self.directory = directory
+        self._queue: "queue.Queue[Optional[CapturedRequest]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        (self.directory / CORPUS_IMAGES_DIR).mkdir(parents=True, exist_ok=True)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._drain, name="traffic-capture-writer", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, captured: CapturedRequest) -> None:
+        try:
+            self._queue.put_nowait(captured)
+        except queue.Full:
+            LOGGER.debug("Traffic capture queue is full; dropping sample for %s", captured.path)
+
+    def _drain(self) -> None:
+        with open(self.directory / CORPUS_REQUESTS_FILE, "a", encoding="utf-8") as handle:
+            while True:
+                captured = self._queue.get()
+                if captured is None:
+                    return
+                try:
+                    record = self._sanitize(captured)
+                except Exception as exc:  # pragma: no cover - runtime safety
+                    LOGGER.warning("Failed to sanitize captured request: %s", exc)
+                    continue
+                if record is None:
+                    continue
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+                handle.flush()
+
+    def _sanitize(self, captured: CapturedRequest) -> Optional[dict[str, Any]]:
+        try:
+            payload = json.loads(captured.body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+
+        if captured.path.endswith("/products/classify"):
+            body = self._sanitize_classify(payload)
+        else:
+            body = self._sanitize_chat(payload)
+
+        return {
+            "captured_at": round(captured.captured_at, 3),
+            "path": captured.path,
+            "query": captured.query_string,
+            "content_type": captured.content_type,
+            "status": captured.status,
+            "latency_ms": round(captured.latency_ms, 2),
+            "body": body,
+        }
+
+    def _sanitize_classify(self, payload: dict[str, Any]) -> dict[str, Any]:
+        body = {key: payload.get(key) for key in ("barcode", "ingredients_text", "capture_mode")}
+        image = payload.get("image_base64")
+        if isinstance(image, str) and image:
+            body["image_ref"] = self._store_image(image)
+        return body
+
+    def _sanitize_chat(self, payload: dict[str, Any]) -> dict[str, Any]:
+        messages = []
+        for message in payload.get("messages") or []:
+            if not isinstance(message, dict):
+                continue
+            content = str(message.get("content") or "")
+            role = message.get("role")
+            messages.append({"role": role, "content": content if role == "system" else _filler(len(content))})
+        return {
+            "messages": messages,
+            "model": payload.get("model"),
+            "temperature": payload.get("temperature"),
+        }
+
+    def _store_image(self, image_base64: str) -> Optional[str]:
+        data = image_base64.split(",", 1)[1] if "," in image_base64 else image_base64
+        try:
+            raw = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        # Never write the upload as-is: its metadata can carry location and device details.
+        sanitized = strip_image_metadata(raw)
+        if sanitized is None:
+            return None
+        digest = hashlib.sha256(sanitized).hexdigest()
+        path = self.directory / CORPUS_IMAGES_DIR / f"{digest}.bin"
+        if not path.exists():
+            path.write_bytes(sanitized)
+        return IMAGE_REF_PREFIX + digest
+
+
+class TrafficCaptureMiddleware:
+    """Pure ASGI middleware that tees sampled request bodies to a corpus writer."""
+
+    def __init__(self, app: ASGIApp, *, writer: TrafficCorpusWriter, sample_rate: float) -> None:
+        self.app = app
+        self.writer = writer
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope.get("method") != "POST"
+            or not scope.get("path", "").endswith(CAPTURED_PATH_SUFFIXES)
+            or random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chunks: list[bytes] = []
+        captured_bytes = 0
+        truncated = False
+        status_code = 0
+
+        async def capturing_receive() -> Message:
+            nonlocal captured_bytes, truncated
+            message = await receive()
+            if message["type"] == "http.request" and not truncated:
+                chunk = message.get("body", b"")
+                captured_bytes += len(chunk)
+                if captured_bytes > MAX_CAPTURED_BODY_BYTES:
+                    truncated = True
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message["status"])
+            await send(message)
+
+        captured_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, capturing_receive, capturing_send)
+        finally:
+            if not truncated and chunks:
+                headers = dict(scope.get("headers") or [])
+                self.writer.submit(
+                    CapturedRequest(
+                        captured_at=captured_at,
+                        path=scope["path"],
+                        query_string=(scope.get("query_string") or b"").decode("latin-1"),
+                        content_type=headers.get(b"content-type", b"").decode("latin-1"),
+                        body=b"".join(chunks),
+                        status=status_code,
+                        latency_ms=(time.perf_counter() - started) * 1000,
+                    )
+                )
+
+
+def iter_corpus(directory: Path) -> Iterator[dict[str, Any]]:
+    """Yield corpus records with `image_ref` resolved back to `image_base64`."""
+
+    with open(directory / CORPUS_REQUESTS_FILE, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record.get("body") or {}
+            image_ref = body.pop("image_ref", None)
+            if image_ref and image_ref.startswith(IMAGE_REF_PREFIX):
+                image_path = directory / CORPUS_IMAGES_DIR / f"{image_ref[len(IMAGE_REF_PREFIX):]}.bin"
+                if image_path.exists():
+                    body["image_base64"] = base64.b64encode(image_path.read_bytes()).decode("ascii")
+            record["body"] = body
+            yield record
@@ -1,7 +1,19 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
+from .api.deps import close_ocr_pool, close_scan_history_store
 from .api.routes import api_router
 from .core.config import settings
+from .core.traffic_capture import TrafficCaptureMiddleware, TrafficCorpusWriter
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    close_ocr_pool()
+    close_scan_history_store()
 
 
 def create_application() -> FastAPI:
@@ -9,9 +21,19 @@ def create_application() -> FastAPI:
         title="Halal Identifier API",
         version="0.1.0",
         description="Backend services for halal certification inference and product lookup.",
+        lifespan=lifespan,
     )
 
     app.include_router(api_router, prefix=settings.api_prefix)
+
+    if settings.traffic_capture_dir is not None:
+        writer = TrafficCorpusWriter(settings.traffic_capture_dir)
+        writer.start()
+        app.add_middleware(
+            TrafficCaptureMiddleware,
+            writer=writer,
+            sample_rate=settings.traffic_capture_sample_rate,
+        )
     return app
 
 
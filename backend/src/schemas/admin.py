@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+
+
+class AllocationSiteReport(BaseModel):
+    service_frame: str = Field(..., description="Innermost src/services line on the allocating stack")
+    allocation_frame: str = Field(..., description="Line that performed the allocation")
+    size_bytes: int = Field(..., description="Net bytes still allocated at the end of the window")
+    count: int = Field(..., ge=0, description="Net number of live allocations from this site")
+
+
+class AllocationReport(BaseModel):
+    seconds: float
+    sites: list[AllocationSiteReport] = Field(default_factory=list)
+
+
+class OcrPoolStatus(BaseModel):
+    enabled: bool = Field(..., description="False when OCR runs in-process (OCR_WORKERS=0)")
+    workers: int = 0
+    alive: int = Field(0, description="Started workers")
+    starting: int = Field(
+        0, description="Workers loading their reader; with alive also 0, OCR requests fail fast"
+    )
+    idle: int = Field(0, description="Warm workers waiting for a job")
+    jobs: int = 0
+    timeouts: int = Field(0, description="Jobs whose worker was killed for exceeding OCR_TIMEOUT_SECONDS")
+    crashes: int = Field(0, description="Jobs whose worker died mid-request")
@@ -0,0 +1,30 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .product import HalalClassificationResponse
+
+
+BulkInputFormat = Literal["ndjson", "csv"]
+
+
+class BulkResultRecord(BaseModel):
+    type: Literal["result"] = "result"
+    index: int = Field(..., ge=0, description="Zero-based position of the row in the input stream")
+    result: HalalClassificationResponse
+
+
+class BulkErrorRecord(BaseModel):
+    type: Literal["error"] = "error"
+    index: int = Field(..., ge=0, description="Zero-based position of the row in the input stream")
+    error: str = Field(..., description="Why the row could not be classified")
+
+
+class BulkProgressRecord(BaseModel):
+    type: Literal["progress", "summary"] = "progress"
+    processed: int = Field(..., ge=0, description="Rows handled so far in this job, after the offset")
+    succeeded: int = Field(..., ge=0)
+    failed: int = Field(..., ge=0)
+    next_offset: int = Field(
+        ..., ge=0, description="Pass this as `offset` to resume the job after the last finished row"
+    )
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DeviceBundleManifest(BaseModel):
+    version: str = Field(..., description="Bundle content version; also the ETag of GET /bundle")
+    model_version: str = Field(..., description="Server model version the bundle was built from")
+    ecode_version: str = Field(..., description="Pass as `since` to /bundle/ecodes for incremental updates")
+    assets_version: str = Field(
+        ..., description="Version of everything except E-codes; unchanged means /bundle/ecodes is enough"
+    )
+    fast_model_version: str | None = Field(
+        None, description="Distilled ingredient classifier in the bundle; None if the bundle has no model"
+    )
+    created_at: float
+    size_bytes: int = Field(..., ge=0)
+    gzip_size_bytes: int = Field(..., ge=0)
+
+    model_config = ConfigDict(protected_namespaces=())
+
+
+class EcodeDeltaResponse(BaseModel):
+    since: str | None = Field(None, description="E-code version the delta starts from")
+    version: str = Field(..., description="E-code version after applying the delta")
+    full: bool = Field(False, description="True when `since` is unknown; `upserts` is then the whole table")
+    upserts: dict[str, tuple[str, str]] = Field(
+        default_factory=dict, description="Added or changed codes as [status, description]"
+    )
+    removed: list[str] = Field(default_factory=list)
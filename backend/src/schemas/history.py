@@ -0,0 +1,50 @@
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ScanHistoryItem(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    id: int
+    scanned_at: float = Field(..., description="Unix timestamp of the scan")
+    product_name: str
+    barcode: str | None = None
+    halal_status: str
+    confidence: float = Field(..., ge=0.0, le=1.0)
+    summary: str = Field(..., description="Condensed evidence for the verdict")
+    model_version: str | None = None
+
+
+class ScanHistoryPage(BaseModel):
+    items: list[ScanHistoryItem] = Field(default_factory=list)
+    next_cursor: str | None = Field(
+        None, description="Opaque cursor for the next (older) page; null when there are no more scans"
+    )
+
+
+class ScanHistoryAggregates(BaseModel):
+    total: int = Field(..., ge=0)
+    counts: dict[str, int] = Field(default_factory=dict, description="Scan count per halal status")
+    last_scanned_at: float | None = None
+
+
+class ScanHistoryUploadItem(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    scanned_at: float = Field(..., description="Unix timestamp of the on-device scan")
+    product_name: str = Field(..., max_length=200)
+    barcode: str | None = Field(None, max_length=32)
+    halal_status: Literal["Halal", "Haram", "Doubtful"]
+    confidence: float = Field(..., ge=0.0, le=1.0)
+    summary: str = Field("", max_length=2000, description="Evidence shown on the device")
+    model_version: str | None = Field(None, max_length=64, description="Bundle model version")
+
+
+class ScanHistoryUpload(BaseModel):
+    items: list[ScanHistoryUploadItem] = Field(..., min_length=1, max_length=100)
+
+
+class ScanHistoryUploadResult(BaseModel):
+    accepted: int = Field(..., ge=0)
+    dropped: int = Field(..., ge=0, description="Scans not queued because the history writer is backed up")
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ModelRegistryStatus(BaseModel):
+    active_version: str | None = Field(None, description="Version currently serving requests")
+    loaded_at: float | None = Field(None, description="Unix timestamp of the last successful swap")
+    reloading: bool = Field(False, description="Whether a new version is loading in the background")
+    last_error: str | None = Field(None, description="Error from the most recent failed reload")
+
+
+class CascadeTierStats(BaseModel):
+    count: int = Field(0, ge=0)
+    hit_rate: float = Field(0.0, ge=0.0, le=1.0, description="Share of ingredient predictions served by this tier")
+    mean_latency_ms: float = Field(0.0, ge=0.0)
+
+
+class IngredientCascadeStatus(BaseModel):
+    model_version: str | None = Field(None, description="Counters reset whenever a new version is swapped in")
+    fast_model_version: str | None = Field(None, description="Distilled classifier version; None disables the cascade")
+    threshold: float = Field(..., description="Fast-tier confidence needed to skip the full model")
+    reuse_similarity: float | None = Field(
+        None, description="Jaccard similarity needed to reuse an earlier verdict; None disables reuse"
+    )
+    reuse_index_size: int = Field(0, ge=0, description="Distinct ingredient lists in the verdict index")
+    requests: int = Field(0, ge=0)
+    mean_latency_ms: float = Field(0.0, ge=0.0)
+    tiers: dict[str, CascadeTierStats] = Field(default_factory=dict)
+
+    model_config = ConfigDict(protected_namespaces=())
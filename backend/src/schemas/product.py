@@ -1,6 +1,6 @@
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 CaptureMode = Literal["barcode", "logo", "ingredients"]
@@ -60,6 +60,8 @@ class ProductClassificationRequest(BaseModel):
 
 
 class HalalClassificationResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
     product_name: str = Field(..., description="Human-readable product label")
     barcode: str | None = Field(None, description="EAN/UPC code when available")
     halal_status: str = Field(..., description="Halal classification: halal, haram, or doubtful")
@@ -75,4 +77,30 @@ class HalalClassificationResponse(BaseModel):
         default_factory=FeatureBreakdown,
         description="Detailed outputs for each enabled model",
     )
+    model_version: str | None = Field(
+        None, description="Version of the model artifacts that produced the decision"
+    )
+
+
+COMPACT_MEDIA_TYPE = "application/vnd.halal.compact+json"
+
+
+class CompactEvidence(BaseModel):
+    id: str = Field(..., description="Stable evidence identifier, e.g. ingredient_model or ecode")
+    status: str | None = Field(None, description="Status suggested by this piece of evidence")
+    confidence: float | None = Field(None, ge=0.0, le=1.0)
+    code: str | None = Field(None, description="E-code or matched ingredient term, when applicable")
 
+
+class CompactClassificationResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    barcode: str | None = None
+    halal_status: str
+    confidence: float = Field(..., ge=0.0, le=1.0)
+    model_confidences: dict[str, float] = Field(
+        default_factory=dict,
+        description="Top-class confidence for each model that ran (ingredients, barcode, logo)",
+    )
+    evidence: list[CompactEvidence] = Field(default_factory=list)
+    model_version: str | None = None
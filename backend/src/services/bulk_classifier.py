@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+
+from ..schemas.bulk import (
+    BulkErrorRecord,
+    BulkInputFormat,
+    BulkProgressRecord,
+    BulkResultRecord,
+)
+from ..schemas.product import ProductClassificationRequest
+from .classification_serializer import build_full_response
+from .halal_classifier import HalalClassifierService
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64
+MAX_LINE_BYTES = 16 * 1024 * 1024
+# Uploads are spooled before classification starts; bodies above this spill to a temp file.
+BODY_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class BulkRow:
+    index: int
+    payload: Optional[dict[str, Any]]
+    error: Optional[str] = None
+
+
+class BulkRowDecoder:
+    """Incrementally turns NDJSON or CSV lines into indexed rows.
+
+    Lines are fed one at a time so the caller never has to hold the whole input
+    in memory. CSV records that span several lines (quoted newlines) are buffered
+    until their quotes balance.
+    """
+
+    def __init__(self, input_format: BulkInputFormat) -> None:
+        self.input_format = input_format
+        self._next_index = 0
+        self._header: Optional[list[str]] = None
+        self._pending = ""
+
+    def feed(self, line: str) -> Optional[BulkRow]:
+        if self.input_format == "csv":
+            return self._feed_csv(line)
+        return self._feed_ndjson(line)
+
+    def finish(self) -> Optional[BulkRow]:
+        if self.input_format != "csv" or not self._pending:
+            return None
+        self._pending = ""
+        return self._emit(None, "Unterminated quoted CSV field at end of input.")
+
+    def skip_oversized(self) -> BulkRow:
+        """Report a line longer than `MAX_LINE_BYTES` as a failed row and resync after it."""
+        self._pending = ""
+        return self._emit(None, f"Input line exceeds {MAX_LINE_BYTES} bytes.")
+
+    def _emit(self, payload: Optional[dict[str, Any]], error: Optional[str] = None) -> BulkRow:
+        row = BulkRow(index=self._next_index, payload=payload, error=error)
+        self._next_index += 1
+        return row
+
+    def _feed_ndjson(self, line: str) -> Optional[BulkRow]:
+        stripped = line.strip()
+        if not stripped:
+            return None
+        try:
+            decoded = json.loads(stripped)
+        except json.JSONDecodeError as exc:
+            return self._emit(None, f"Invalid JSON: {exc.msg} (column {exc.colno})")
+        if not isinstance(decoded, dict):
+            return self._emit(None, "Each NDJSON line must be a JSON object.")
+        return self._emit(decoded)
+
+    def _feed_csv(self, line: str) -> Optional[BulkRow]:
+        self._pending += line if line.endswith("\n") else line + "\n"
+        if self._pending.count('"') % 2:
+            return None
+        record, self._pending = self._pending, ""
+        if not record.strip():
+            return None
+
+        values = next(csv.reader(io.StringIO(record)), [])
+        if self._header is None:
+            self._header = [value.strip() for value in values]
+            return None
+        if len(values) > len(self._header):
+            return self._emit(
+                None, f"Row has {len(values)} columns but the header declares {len(self._header)}."
+            )
+        payload = {
+            column: value if value != "" else None
+            for column, value in zip(self._header, values)
+            if column
+        }
+        return self._emit(payload)
+
+
+def iter_bulk_rows(lines: Iterable[Optional[str]], input_format: BulkInputFormat) -> Iterator[BulkRow]:
+    """Decode rows from text lines; a None line stands for one that was too long to read."""
+    decoder = BulkRowDecoder(input_format)
+    for line in lines:
+        row = decoder.skip_oversized() if line is None else decoder.feed(line)
+        if row is not None:
+            yield row
+    trailing = decoder.finish()
+    if trailing is not None:
+        yield trailing
+
+
+def iter_body_lines(handle: BinaryIO) -> Iterator[Optional[str]]:
+    """Read text lines from a spooled request body, yielding None for lines over `MAX_LINE_BYTES`.
+
+    Oversized lines are consumed up to their newline without being held in memory,
+    so the rows after them still decode.
+    """
+
+    while True:
+        line = handle.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        if len(line) <= MAX_LINE_BYTES:
+            yield line.decode("utf-8", errors="replace")
+            continue
+        while line and not line.endswith(b"\n"):
+            line = handle.readline(MAX_LINE_BYTES + 1)
+        yield None
+
+
+def parse_row(row: BulkRow) -> ProductClassificationRequest | BulkErrorRecord:
+    if row.error is not None or row.payload is None:
+        return BulkErrorRecord(index=row.index, error=row.error or "Empty row.")
+
+    try:
+        request = ProductClassificationRequest.model_validate(row.payload)
+    except ValidationError as exc:
+        messages = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        )
+        return BulkErrorRecord(index=row.index, error=messages)
+
+    if not any([request.ingredients_text, request.image_base64, request.barcode]):
+        return BulkErrorRecord(
+            index=row.index,
+            error="Provide at least one of ingredients_text, image_base64, or barcode for classification.",
+        )
+    return request
+
+
+def classify_row(classifier: HalalClassifierService, row: BulkRow) -> BulkResultRecord | BulkErrorRecord:
+    request = parse_row(row)
+    if isinstance(request, BulkErrorRecord):
+        return request
+
+    try:
+        result = classifier.predict_result(request.model_dump())
+        return BulkResultRecord.model_construct(index=row.index, result=build_full_response(result))
+    except Exception as exc:  # pragma: no cover - runtime safety
+        LOGGER.warning("Bulk classification failed for row %s: %s", row.index, exc)
+        return BulkErrorRecord(index=row.index, error=f"Classification failed: {exc}")
+
+
+def classify_rows(
+    classifier: HalalClassifierService, rows: list[BulkRow]
+) -> list[BulkResultRecord | BulkErrorRecord]:
+    """Classify a chunk with one batched ingredient-model call for the supplied texts.
+
+    If the batch raises, the chunk is retried row by row so a single bad row is
+    reported on its own instead of failing its neighbours.
+    """
+
+    parsed = [parse_row(row) for row in rows]
+    valid = [
+        (row, request)
+        for row, request in zip(rows, parsed)
+        if isinstance(request, ProductClassificationRequest)
+    ]
+    try:
+        results = classifier.predict_batch([request.model_dump() for _, request in valid])
+    except Exception as exc:  # pragma: no cover - runtime safety
+        LOGGER.warning("Batched classification failed; retrying %s rows one by one: %s", len(valid), exc)
+        return [classify_row(classifier, row) for row in rows]
+
+    classified = {
+        row.index: BulkResultRecord.model_construct(index=row.index, result=build_full_response(result))
+        for (row, _), result in zip(valid, results)
+    }
+    return [
+        request if isinstance(request, BulkErrorRecord) else classified[row.index]
+        for row, request in zip(rows, parsed)
+    ]
+
+
+class BulkClassificationJob:
+    """Tracks progress of a bulk job and classifies rows one chunk at a time."""
+
+    def __init__(self, classifier: HalalClassifierService, *, offset: int = 0) -> None:
+        self.classifier = classifier
+        self.offset = offset
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.next_offset = offset
+
+    def should_skip(self, row: BulkRow) -> bool:
+        return row.index < self.offset
+
+    def classify_chunk(self, rows: list[BulkRow]) -> list[BulkResultRecord | BulkErrorRecord]:
+        records = classify_rows(self.classifier, rows)
+        for record in records:
+            self.processed += 1
+            if isinstance(record, BulkResultRecord):
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.next_offset = record.index + 1
+        return records
+
+    def progress(self, *, final: bool = False) -> BulkProgressRecord:
+        return BulkProgressRecord(
+            type="summary" if final else "progress",
+            processed=self.processed,
+            succeeded=self.succeeded,
+            failed=self.failed,
+            next_offset=self.next_offset,
+        )
+
+
+def run_bulk_classification(
+    classifier: HalalClassifierService,
+    lines: Iterable[str],
+    *,
+    input_format: BulkInputFormat,
+    offset: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[BulkResultRecord | BulkErrorRecord | BulkProgressRecord]:
+    """Synchronous driver used by the CLI; yields records as each chunk finishes."""
+
+    job = BulkClassificationJob(classifier, offset=offset)
+    chunk: list[BulkRow] = []
+    for row in iter_bulk_rows(lines, input_format):
+        if job.should_skip(row):
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from job.classify_chunk(chunk)
+            yield job.progress()
+            chunk = []
+    if chunk:
+        yield from job.classify_chunk(chunk)
+    yield job.progress(final=True)
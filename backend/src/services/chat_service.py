@@ -14,9 +14,6 @@ from ..schemas.chat import (
 )
 
 
-OPENROUTER_COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
-
-
 async def create_chat_completion(payload: ChatCompletionRequest) -> ChatCompletionResponse:
     if not settings.openrouter_api_key:
         raise HTTPException(
@@ -45,7 +42,7 @@ async def create_chat_completion(payload: ChatCompletionRequest) -> ChatCompleti
 
     async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
         response = await client.post(
-            OPENROUTER_COMPLETIONS_URL,
+            settings.openrouter_completions_url,
             json=request_body,
             headers=headers,
         )
@@ -0,0 +1,87 @@
+"""Build response models from classifier results without re-validating them.
+
+`HalalClassifierService` already clips confidences and maps statuses, so the
+models here are assembled with `model_construct` and serialized directly.
+"""
+
+from __future__ import annotations
+
+from ..schemas.product import (
+    BarcodeModelInsight,
+    CompactClassificationResponse,
+    CompactEvidence,
+    FeatureBreakdown,
+    HalalClassificationResponse,
+    IngredientModelInsight,
+    LogoModelInsight,
+)
+from .halal_classifier import ClassificationResult
+
+
+def build_full_response(result: ClassificationResult) -> HalalClassificationResponse:
+    ingredients = result.ingredients
+    barcode_model = result.barcode_model
+    logo = result.logo
+    feature_breakdown = FeatureBreakdown.model_construct(
+        ingredients=(
+            IngredientModelInsight.model_construct(
+                status=ingredients.status,
+                confidence=ingredients.confidence,
+                raw_scores=ingredients.raw_scores,
+            )
+            if ingredients is not None
+            else None
+        ),
+        barcode=(
+            BarcodeModelInsight.model_construct(
+                status=barcode_model.status,
+                confidence=barcode_model.confidence,
+                raw_scores=barcode_model.raw_scores,
+            )
+            if barcode_model is not None
+            else None
+        ),
+        logo=(
+            LogoModelInsight.model_construct(detected=logo.detected, confidence=logo.confidence)
+            if logo is not None
+            else None
+        ),
+    )
+    return HalalClassificationResponse.model_construct(
+        product_name=result.product_name,
+        barcode=result.barcode,
+        halal_status=result.halal_status,
+        confidence=result.confidence,
+        evidence=[item.describe() for item in result.evidence],
+        capture_mode=result.capture_mode,
+        recognized_ingredients_text=result.recognized_ingredients_text,
+        feature_breakdown=feature_breakdown,
+        model_version=result.model_version,
+    )
+
+
+def build_compact_response(result: ClassificationResult) -> CompactClassificationResponse:
+    model_confidences: dict[str, float] = {}
+    if result.ingredients is not None:
+        model_confidences["ingredients"] = result.ingredients.confidence
+    if result.barcode_model is not None:
+        model_confidences["barcode"] = result.barcode_model.confidence
+    if result.logo is not None:
+        model_confidences["logo"] = result.logo.confidence
+
+    return CompactClassificationResponse.model_construct(
+        barcode=result.barcode,
+        halal_status=result.halal_status,
+        confidence=result.confidence,
+        model_confidences=model_confidences,
+        evidence=[
+            CompactEvidence.model_construct(
+                id=item.id,
+                status=item.status,
+                confidence=item.confidence,
+                code=item.code,
+            )
+            for item in result.evidence
+        ],
+        model_version=result.model_version,
+    )
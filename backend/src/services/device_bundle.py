@@ -0,0 +1,206 @@
+"""Versioned offline bundle for the mobile app.
+
+The bundle is one JSON document carrying what the app needs to answer simple scans
+without a round trip: the E-code table, the distilled fast ingredient classifier
+and the ingredient risk index. It is rebuilt only when the active model version
+changes, and its gzip encoding is computed once so downloads are a memory copy.
+
+Every E-code table version handed out is kept on disk, so a device holding any
+earlier version can fetch just the changed and removed codes.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .halal_classifier import HalalClassifierService
+    from .model_registry import ModelRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 1
+
+EcodeTable = dict[str, tuple[str, str]]
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def ecode_table_version(table: EcodeTable) -> str:
+    return _digest({code: list(record) for code, record in table.items()})
+
+
+@dataclass
+class DeviceBundle:
+    version: str
+    model_version: str
+    ecode_version: str
+    # Everything except the E-codes; devices only patch E-codes while this is unchanged.
+    assets_version: str
+    fast_model_version: Optional[str]
+    created_at: float
+    ecodes: EcodeTable
+    body: bytes
+    gzip_body: bytes
+
+    @property
+    def etag(self) -> str:
+        # Weak: the identity and gzip bodies differ byte-wise but carry the same bundle.
+        return f'W/"{self.version}"'
+
+
+@dataclass
+class EcodeDelta:
+    since: Optional[str]
+    version: str
+    # True when `since` is unknown or missing; `upserts` then holds the whole table.
+    full: bool
+    upserts: EcodeTable
+    removed: list[str]
+
+
+def build_device_bundle(service: "HalalClassifierService") -> DeviceBundle:
+    ecodes = service.ecode_table()
+    ecode_version = ecode_table_version(ecodes)
+    fast_model = service.fast_ingredient_model
+    risk_index = service.risk_index
+
+    assets = {
+        "ingredient_model": fast_model.to_payload() if fast_model is not None else None,
+        "cascade_threshold": service.cascade_threshold(),
+        "risk_index": risk_index.to_payload() if risk_index is not None else None,
+    }
+    assets_version = _digest(assets)
+    content = {
+        "ecode_version": ecode_version,
+        "assets_version": assets_version,
+        "ecodes": {code: list(record) for code, record in sorted(ecodes.items())},
+        **assets,
+    }
+    # The version covers content only, so a model swap that leaves the bundle
+    # untouched keeps the ETag and devices skip the download.
+    version = _digest(content)
+    created_at = time.time()
+    body = json.dumps(
+        {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "version": version,
+            "model_version": service.version,
+            "created_at": created_at,
+            **content,
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    return DeviceBundle(
+        version=version,
+        model_version=service.version,
+        ecode_version=ecode_version,
+        assets_version=assets_version,
+        fast_model_version=fast_model.version if fast_model is not None else None,
+        created_at=created_at,
+        ecodes=ecodes,
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+    )
+
+
+class EcodeHistory:
+    """On-disk archive of published E-code tables, keyed by table version."""
+
+    def __init__(self, directory: Path, *, max_versions: int = 50) -> None:
+        self.directory = directory
+        self.max_versions = max_versions
+
+    def _path(self, version: str) -> Path:
+        return self.directory / f"{version}.json"
+
+    def record(self, version: str, table: EcodeTable) -> None:
+        path = self._path(version)
+        if path.exists():
+            # Refresh the mtime so the live version is never pruned as the oldest.
+            path.touch()
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps({code: list(record) for code, record in table.items()}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        temporary.replace(path)
+        archived = sorted(self.directory.glob("*.json"), key=lambda item: item.stat().st_mtime)
+        for stale in archived[: max(0, len(archived) - self.max_versions)]:
+            stale.unlink(missing_ok=True)
+
+    def load(self, version: str) -> Optional[EcodeTable]:
+        # Versions are hex digests; anything else cannot name an archived file.
+        if not version.isalnum():
+            return None
+        path = self._path(version)
+        if not path.exists():
+            return None
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to read archived E-code table %s: %s", version, exc)
+            return None
+        return {code: (record[0], record[1]) for code, record in raw.items()}
+
+    def delta(self, since: Optional[str], version: str, table: EcodeTable) -> EcodeDelta:
+        if since == version:
+            return EcodeDelta(since=since, version=version, full=False, upserts={}, removed=[])
+        previous = self.load(since) if since else None
+        if previous is None:
+            return EcodeDelta(since=since, version=version, full=True, upserts=dict(table), removed=[])
+        return EcodeDelta(
+            since=since,
+            version=version,
+            full=False,
+            upserts={code: record for code, record in table.items() if previous.get(code) != record},
+            removed=sorted(code for code in previous if code not in table),
+        )
+
+
+class DeviceBundleCache:
+    """Holds the bundle for the registry's active model version, rebuilding after swaps."""
+
+    def __init__(self, registry: "ModelRegistry", history: EcodeHistory) -> None:
+        self.registry = registry
+        self.history = history
+        self._bundle: Optional[DeviceBundle] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> DeviceBundle:
+        service = self.registry.active
+        bundle = self._bundle
+        if bundle is not None and bundle.model_version == service.version:
+            return bundle
+        with self._lock:
+            if self._bundle is None or self._bundle.model_version != service.version:
+                bundle = build_device_bundle(service)
+                self.history.record(bundle.ecode_version, bundle.ecodes)
+                LOGGER.info(
+                    "Built device bundle %s for model %s (%s bytes, %s gzipped)",
+                    bundle.version,
+                    bundle.model_version,
+                    len(bundle.body),
+                    len(bundle.gzip_body),
+                )
+                self._bundle = bundle
+            return self._bundle
+
+    def ecode_delta(self, since: Optional[str]) -> EcodeDelta:
+        bundle = self.current()
+        return self.history.delta(since, bundle.ecode_version, bundle.ecodes)
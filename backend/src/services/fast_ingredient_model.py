@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+FAST_MODEL_FILENAME = "ingredient_fast_classifier.json"
+FAST_MODEL_FORMAT_VERSION = 1
+
+TIER_FAST = "fast"
+TIER_FULL = "full"
+# Verdict copied from a near-identical list by the verdict index; no model ran.
+TIER_REUSED = "reused"
+
+
+def featurize(text: str) -> list[str]:
+    """Whitespace tokens, matching the ingredient model's `TextVectorization(standardize=None)`."""
+
+    return text.split()
+
+
+@dataclass
+class FastPrediction:
+    status: str
+    confidence: float
+    raw_scores: dict[str, float]
+
+
+class FastIngredientClassifier:
+    """Temperature-calibrated softmax regression over binary bag-of-words features.
+
+    Distilled from `ingredient_text_classifier.h5` by `src.cli.distill_ingredient_model`.
+    Only tokens with non-zero weights are stored, so a prediction is a sum of a few
+    dozen short vectors and costs microseconds instead of a Keras forward pass.
+    """
+
+    def __init__(
+        self,
+        labels: list[str],
+        weights: dict[str, np.ndarray],
+        bias: np.ndarray,
+        *,
+        temperature: float = 1.0,
+        version: str = "",
+        suggested_threshold: Optional[float] = None,
+    ) -> None:
+        self.labels = labels
+        self.weights = weights
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.temperature = temperature
+        self.version = version
+        self.suggested_threshold = suggested_threshold
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "FastIngredientClassifier":
+        if payload.get("format_version") != FAST_MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported fast classifier format: {payload.get('format_version')}")
+        labels = [str(label) for label in payload["labels"]]
+        weights = {
+            token: np.asarray(row, dtype=np.float32) for token, row in payload.get("weights", {}).items()
+        }
+        if any(row.shape != (len(labels),) for row in weights.values()):
+            raise ValueError("Fast classifier weight rows must have one value per label.")
+        return cls(
+            labels,
+            weights,
+            np.asarray(payload["bias"], dtype=np.float32),
+            temperature=float(payload.get("temperature", 1.0)),
+            version=str(payload.get("version", "")),
+            suggested_threshold=payload.get("suggested_threshold"),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "FastIngredientClassifier":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_payload(json.load(handle))
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "format_version": FAST_MODEL_FORMAT_VERSION,
+            "version": self.version,
+            "labels": self.labels,
+            "temperature": round(self.temperature, 4),
+            "suggested_threshold": self.suggested_threshold,
+            "bias": [round(float(value), 5) for value in self.bias],
+            "weights": {
+                token: [round(float(value), 5) for value in row] for token, row in sorted(self.weights.items())
+            },
+        }
+
+    def logits(self, text: str) -> np.ndarray:
+        logits = self.bias.copy()
+        for token in set(featurize(text)):
+            row = self.weights.get(token)
+            if row is not None:
+                logits += row
+        return logits
+
+    def predict(self, text: str) -> FastPrediction:
+        scaled = self.logits(text) / self.temperature
+        scaled -= scaled.max()
+        probabilities = np.exp(scaled)
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return FastPrediction(
+            status=self.labels[best],
+            confidence=float(probabilities[best]),
+            raw_scores={label: float(probabilities[index]) for index, label in enumerate(self.labels)},
+        )
+
+
+class CascadeStats:
+    """Thread-safe per-tier counters for the ingredient cascade."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {TIER_REUSED: 0, TIER_FAST: 0, TIER_FULL: 0}
+        self._seconds = {TIER_REUSED: 0.0, TIER_FAST: 0.0, TIER_FULL: 0.0}
+
+    def record(self, tier: str, seconds: float) -> None:
+        with self._lock:
+            self._counts[tier] += 1
+            self._seconds[tier] += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            seconds = dict(self._seconds)
+        total = sum(counts.values())
+        return {
+            "requests": total,
+            "tiers": {
+                tier: {
+                    "count": counts[tier],
+                    "hit_rate": round(counts[tier] / total, 4) if total else 0.0,
+                    "mean_latency_ms": round(seconds[tier] / counts[tier] * 1000, 3) if counts[tier] else 0.0,
+                }
+                for tier in counts
+            },
+            "mean_latency_ms": round(sum(seconds.values()) / total * 1000, 3) if total else 0.0,
+        }
@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 import base64
+import contextlib
 import io
 import json
 import logging
 import re
 import unicodedata
 import threading
+import time
 
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional, cast
+from typing import Any, Iterator, Mapping, Optional, cast
 
 import numpy as np
-import pandas as pd
 from PIL import Image
 
 try:
@@ -35,6 +36,45 @@ try:
 except ImportError:  # pragma: no cover - optional dependency handled at runtime
     joblib = None
 
+try:
+    from pyzbar import pyzbar  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency (needs the zbar shared library)
+    pyzbar = None
+
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency handled at runtime
+    cv2 = None
+
+from .fast_ingredient_model import (
+    FAST_MODEL_FILENAME,
+    TIER_FAST,
+    TIER_FULL,
+    TIER_REUSED,
+    CascadeStats,
+    FastIngredientClassifier,
+)
+from .image_cache import (
+    CachedImageResult,
+    PerceptualHashCache,
+    perceptual_hash,
+    verification_thumbnail,
+)
+from .image_preprocessing import ImagePreprocessor
+from .ocr_pool import OcrWorkerPool
+from .risk_index import RISK_INDEX_FILENAME, IngredientRiskIndex, tokenize
+from .snapshot import (
+    LABEL_SECTIONS,
+    SECTION_RISK_INDEX,
+    SECTION_VOCABULARY,
+    SNAPSHOT_FILENAME,
+    ServiceSnapshot,
+    compute_source_digest,
+    compute_source_stamp,
+)
+from .thread_topology import ThreadTopology, apply_thread_topology
+from .verdict_index import VERDICT_FILE_SUFFIX, IngredientVerdictIndex, VerdictMatch, prune_verdict_files
+
 LOGGER = logging.getLogger(__name__)
 
 # We collapse Mushbooh into Doubtful throughout the service for consistency with the UI.
@@ -42,12 +82,57 @@ STATUS_HIERARCHY = {"Haram": 3, "Doubtful": 2, "Halal": 1}
 DEFAULT_INGREDIENT_CLASSES = ["Halal", "Haram", "Doubtful"]
 DEFAULT_BARCODE_CLASSES = ["Halal", "Doubtful"]
 
+# Stable identifiers for each kind of evidence so clients can skip the prose.
+EVIDENCE_INGREDIENT_MODEL = "ingredient_model"
+EVIDENCE_FAST_INGREDIENT_MODEL = "ingredient_fast_model"
+EVIDENCE_BARCODE_MODEL = "barcode_model"
+EVIDENCE_OCR_TEXT = "ocr_text"
+EVIDENCE_ECODE = "ecode"
+EVIDENCE_LOGO_DETECTED = "logo_detected"
+EVIDENCE_LOGO_MISSING = "logo_missing"
+EVIDENCE_NO_SIGNALS = "no_signals"
+EVIDENCE_RISK_INDEX = "ingredient_risk_index"
+EVIDENCE_RISK_TERM = "risk_term"
+EVIDENCE_NEAR_DUPLICATE_IMAGE = "near_duplicate_image"
+EVIDENCE_BARCODE_DECODED = "barcode_decoded"
+EVIDENCE_SIMILAR_INGREDIENTS = "similar_ingredients"
+OCR_PREVIEW_LENGTH = 200
+# Retail symbologies worth decoding; QR and internal codes never map to a product.
+RETAIL_BARCODE_TYPES = {"EAN13", "EAN8", "UPCA", "UPCE", "EAN_13", "EAN_8", "UPC_A", "UPC_E"}
+UPCE_BARCODE_TYPES = {"UPCE", "UPC_E"}
+# Longest image side handed to the barcode decoder; retail codes stay legible at this size.
+BARCODE_SCAN_MAX_SIDE = 1280
+
+
+def expand_upce(value: str) -> Optional[str]:
+    """Expand an 8-digit zero-suppressed UPC-E code to its 12-digit UPC-A form."""
+
+    if len(value) != 8 or not value.isdigit() or value[0] not in "01":
+        return None
+    system, body, check = value[0], value[1:7], value[7]
+    last = body[5]
+    if last in "012":
+        expanded = body[0:2] + last + "0000" + body[2:5]
+    elif last == "3":
+        expanded = body[0:3] + "00000" + body[3:5]
+    elif last == "4":
+        expanded = body[0:4] + "00000" + body[4]
+    else:
+        expanded = body[0:5] + "0000" + last
+    return system + expanded + check
+
+
+class ClassifierClosedError(RuntimeError):
+    """Raised for calls on a service version that the registry has already retired."""
+
 
 @dataclass
 class IngredientPrediction:
     status: str
     confidence: float
     raw_scores: dict[str, float]
+    # Evidence id of the tier that produced the verdict.
+    source: str = EVIDENCE_INGREDIENT_MODEL
 
 
 @dataclass
@@ -63,6 +148,100 @@ class BarcodePrediction:
     raw_scores: dict[str, float]
 
 
+@dataclass
+class EvidenceItem:
+    id: str
+    status: Optional[str] = None
+    confidence: Optional[float] = None
+    code: Optional[str] = None
+    detail: Optional[str] = None
+
+    def describe(self) -> str:
+        """Render the human-readable sentence shown in the app."""
+        if self.id == EVIDENCE_INGREDIENT_MODEL:
+            return f"Ingredient classifier suggests {self.status} (confidence {self.confidence:.2f})"
+        if self.id == EVIDENCE_FAST_INGREDIENT_MODEL:
+            return f"Fast ingredient classifier suggests {self.status} (confidence {self.confidence:.2f})"
+        if self.id == EVIDENCE_RISK_INDEX:
+            return f"Ingredient risk index suggests {self.status} (confidence {self.confidence:.2f})"
+        if self.id == EVIDENCE_RISK_TERM:
+            return f"'{self.code}' flagged {self.status} – {self.detail}"
+        if self.id == EVIDENCE_BARCODE_MODEL:
+            return f"Barcode classifier suggests {self.status} (confidence {self.confidence:.2f})"
+        if self.id == EVIDENCE_OCR_TEXT:
+            preview = (self.detail or "").strip().replace("\n", " ")
+            if len(preview) > OCR_PREVIEW_LENGTH:
+                preview = preview[:OCR_PREVIEW_LENGTH].rstrip() + "..."
+            return f"OCR extracted ingredient text: {preview}"
+        if self.id == EVIDENCE_ECODE:
+            return f"{self.code} labeled {self.status} – {self.detail or 'No description provided'}"
+        if self.id == EVIDENCE_LOGO_DETECTED:
+            return f"Halal logo detected with confidence {self.confidence:.2f}"
+        if self.id == EVIDENCE_BARCODE_DECODED:
+            return f"Barcode {self.code} decoded from product image"
+        if self.id == EVIDENCE_NEAR_DUPLICATE_IMAGE:
+            return (
+                "Reused OCR and logo results from a near-identical image scanned earlier "
+                f"(hash distance {self.code})"
+            )
+        if self.id == EVIDENCE_SIMILAR_INGREDIENTS:
+            return (
+                "Reused the ingredient verdict of a near-identical list classified earlier "
+                f"(similarity {self.code})"
+            )
+        if self.id == EVIDENCE_LOGO_MISSING:
+            return "Halal logo not detected on provided image – manual review recommended"
+        return "No model signals available; returning neutral assessment."
+
+
+@dataclass
+class ClassificationResult:
+    product_name: str
+    barcode: Optional[str]
+    halal_status: str
+    confidence: float
+    evidence: list[EvidenceItem] = field(default_factory=list)
+    capture_mode: Optional[str] = None
+    recognized_ingredients_text: Optional[str] = None
+    ingredients: Optional[IngredientPrediction] = None
+    barcode_model: Optional[BarcodePrediction] = None
+    logo: Optional[LogoPrediction] = None
+    model_version: Optional[str] = None
+
+    def as_payload(self) -> dict[str, Any]:
+        """Plain-dict form matching the `HalalClassificationResponse` contract."""
+        feature_breakdown: dict[str, Any] = {}
+        if self.ingredients is not None:
+            feature_breakdown["ingredients"] = {
+                "status": self.ingredients.status,
+                "confidence": self.ingredients.confidence,
+                "raw_scores": dict(self.ingredients.raw_scores),
+            }
+        if self.barcode_model is not None:
+            feature_breakdown["barcode"] = {
+                "status": self.barcode_model.status,
+                "confidence": self.barcode_model.confidence,
+                "raw_scores": dict(self.barcode_model.raw_scores),
+            }
+        if self.logo is not None:
+            feature_breakdown["logo"] = {
+                "detected": self.logo.detected,
+                "confidence": self.logo.confidence,
+            }
+
+        return {
+            "product_name": self.product_name,
+            "barcode": self.barcode,
+            "halal_status": self.halal_status,
+            "confidence": self.confidence,
+            "evidence": [item.describe() for item in self.evidence],
+            "capture_mode": self.capture_mode,
+            "recognized_ingredients_text": self.recognized_ingredients_text,
+            "feature_breakdown": feature_breakdown,
+            "model_version": self.model_version,
+        }
+
+
 def true_divide(x: Any, y: Any = 1.0, **_: Any) -> tf.Tensor:
     """Compatibility shim for Lambda layers serialized as `TrueDivide`."""
 
@@ -91,9 +270,40 @@ def true_divide(x: Any, y: Any = 1.0, **_: Any) -> tf.Tensor:
 class HalalClassifierService:
     """Facade for orchestrating CV+NLP inference pipelines."""
 
-    def __init__(self, model_dir: Path) -> None:
+    def __init__(
+        self,
+        model_dir: Path,
+        version: str = "unversioned",
+        *,
+        image_cache_size: int = 0,
+        image_cache_max_distance: int = 4,
+        image_cache_max_pixel_difference: float = 6.0,
+        ingredient_cascade_threshold: Optional[float] = None,
+        threads: Optional[ThreadTopology] = None,
+        ocr_pool: Optional[OcrWorkerPool] = None,
+        verdict_reuse_similarity: Optional[float] = None,
+        verdict_index_dir: Optional[Path] = None,
+        verdict_index_max_entries: int = 200_000,
+        verdict_index_keep_versions: int = 2,
+    ) -> None:
         self.model_dir = model_dir
+        self.version = version
+        self.threads = threads or ThreadTopology()
+        # None defers to the threshold recommended by the distillation calibration report.
+        self.ingredient_cascade_threshold = ingredient_cascade_threshold
+        self.cascade_stats = CascadeStats()
+        # None or 0 disables verdict reuse; without a directory the index lives in memory only.
+        self.verdict_reuse_similarity = verdict_reuse_similarity
+        self.verdict_index_dir = verdict_index_dir
+        self.verdict_index_max_entries = verdict_index_max_entries
+        self.verdict_index_keep_versions = verdict_index_keep_versions
+        self._verdict_index: Optional[IngredientVerdictIndex] = None
+        # Calls currently running, so the registry can close a replaced version once drained.
+        self._calls = 0
+        self._calls_lock = threading.Lock()
+        self._closed = False
         self._ingredient_model: Optional["keras.Model"] = None
+        self._fast_ingredient_model: Optional[FastIngredientClassifier] = None
         self._logo_model: Optional["keras.Model"] = None
         self._barcode_model: Optional["keras.Model"] = None
         self._logo_interpreter: Optional["tf.lite.Interpreter"] = None
@@ -104,32 +314,213 @@ class HalalClassifierService:
         self._logo_input_quant: Optional[tuple[float, float]] = None
         self._logo_output_quant: Optional[tuple[float, float]] = None
         self._logo_input_dtype: Optional[np.dtype[Any]] = None
-        self._ecode_lookup: Optional[pd.DataFrame] = None
+        self._logo_preprocessor: Optional[ImagePreprocessor] = None
+        # E-code -> (raw halal status, description); backed by the snapshot when available.
+        self._ecode_lookup: Optional[Mapping[str, tuple[str, str]]] = None
+        self._snapshot: Optional[ServiceSnapshot] = None
         self._ocr_reader: Optional[Any] = None
+        # Shared across model versions and owned by the caller; replaces the in-process reader.
+        self._ocr_pool = ocr_pool
         self._ingredient_label_order: list[str] = DEFAULT_INGREDIENT_CLASSES.copy()
         self._barcode_label_order: list[str] = DEFAULT_BARCODE_CLASSES.copy()
         self._logo_label_encoder: Optional[Any] = None
+        self._risk_index: Optional[IngredientRiskIndex] = None
+        self._image_cache: Optional[PerceptualHashCache] = (
+            PerceptualHashCache(
+                max_entries=image_cache_size,
+                max_distance=image_cache_max_distance,
+                max_pixel_difference=image_cache_max_pixel_difference,
+            )
+            if image_cache_size > 0
+            else None
+        )
 
     def load(self) -> None:
         """Load ML model artifacts lazily."""
         LOGGER.info("Loading halal classifier assets from %s", self.model_dir)
+        apply_thread_topology(self.threads)
+        self._load_snapshot()
         self._load_ingredient_model()
+        self._load_fast_ingredient_model()
         self._load_logo_model()
         self._load_barcode_model()
         self._load_ecode_lookup()
         self._load_logo_label_encoder()
+        self._load_risk_index()
+        self._load_verdict_index()
         self._load_ocr_reader()
 
+    def warm_up(self) -> None:
+        """Run a throwaway prediction so graph tracing happens before real traffic."""
+        self.predict_result(
+            {"ingredients_text": "sugar, salt, flour", "barcode": "0000000000"}, reuse_verdicts=False
+        )
+
+    @property
+    def fast_ingredient_model(self) -> Optional[FastIngredientClassifier]:
+        return self._fast_ingredient_model
+
+    @property
+    def risk_index(self) -> Optional[IngredientRiskIndex]:
+        return self._risk_index
+
+    def ecode_table(self) -> dict[str, tuple[str, str]]:
+        """E-code -> (normalized status, description), as published to devices."""
+        if self._ecode_lookup is None:
+            return {}
+        return {
+            code: (self._map_status(raw_status), description)
+            for code, (raw_status, description) in self._ecode_lookup.items()
+        }
+
+    def cascade_status(self) -> dict[str, Any]:
+        fast_model = self._fast_ingredient_model
+        return {
+            "model_version": self.version,
+            "fast_model_version": fast_model.version if fast_model is not None else None,
+            "threshold": self.cascade_threshold(),
+            "reuse_similarity": self.verdict_reuse_similarity if self._verdict_index is not None else None,
+            "reuse_index_size": len(self._verdict_index) if self._verdict_index is not None else 0,
+            **self.cascade_stats.snapshot(),
+        }
+
+    @property
+    def offloads_ocr(self) -> bool:
+        """True when OCR runs in the worker pool and only blocks the calling thread on a pipe."""
+        return self._ocr_pool is not None
+
+    @property
+    def in_flight(self) -> int:
+        with self._calls_lock:
+            return self._calls
+
+    def close(self) -> None:
+        """Stop accepting calls and release the models once the running ones return.
+
+        Taken under the same lock as `_tracked_call`, so no call can start between the
+        check and the teardown; the last call to finish performs the release. The OCR
+        worker pool is shared across versions and left to its owner.
+        """
+        with self._calls_lock:
+            if self._closed:
+                return
+            self._closed = True
+            release = self._calls == 0
+        if release:
+            self._release()
+
+    def _release(self) -> None:
+        self._ingredient_model = None
+        self._fast_ingredient_model = None
+        self._logo_model = None
+        self._barcode_model = None
+        self._logo_interpreter = None
+        self._logo_preprocessor = None
+        self._ocr_reader = None
+        self._image_cache = None
+        # The lookup tables are views into the mapping; release them before unmapping.
+        self._ecode_lookup = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        LOGGER.info("Closed classifier version %s", self.version)
+
+    @contextlib.contextmanager
+    def _tracked_call(self) -> Iterator[None]:
+        with self._calls_lock:
+            if self._closed:
+                raise ClassifierClosedError(f"Classifier version {self.version} has been closed.")
+            self._calls += 1
+        try:
+            yield
+        finally:
+            with self._calls_lock:
+                self._calls -= 1
+                release = self._closed and self._calls == 0
+            if release:
+                self._release()
+
     def predict(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self.predict_result(payload).as_payload()
+
+    def predict_batch(self, payloads: list[dict[str, Any]]) -> list[ClassificationResult]:
+        """Classify several payloads, running the ingredient cascade once for all supplied texts.
+
+        Texts recognized by OCR are only known per image, so those still go through
+        the models one at a time.
+        """
+        with self._tracked_call():
+            texts = [self._normalize_ingredients_text(payload.get("ingredients_text")) for payload in payloads]
+            outcomes = self._predict_with_verdict_index_batch(texts)
+            return [
+                self._predict_result(payload, ingredient_outcome=outcome if text else None)
+                for payload, text, outcome in zip(payloads, texts, outcomes)
+            ]
+
+    def predict_result(
+        self,
+        payload: dict[str, Any],
+        *,
+        reuse_verdicts: bool = True,
+        ingredient_outcome: Optional[tuple[Optional[IngredientPrediction], Optional[VerdictMatch]]] = None,
+    ) -> ClassificationResult:
+        """Run every enabled model and return the verdict with structured evidence.
+
+        `ingredient_outcome` carries a prediction already made for the payload's own
+        `ingredients_text` by `predict_batch`.
+        """
+        with self._tracked_call():
+            return self._predict_result(
+                payload, reuse_verdicts=reuse_verdicts, ingredient_outcome=ingredient_outcome
+            )
+
+    def _predict_result(
+        self,
+        payload: dict[str, Any],
+        *,
+        reuse_verdicts: bool = True,
+        ingredient_outcome: Optional[tuple[Optional[IngredientPrediction], Optional[VerdictMatch]]] = None,
+    ) -> ClassificationResult:
         product_name = payload.get("product_name")
         barcode = payload.get("barcode")
         ingredients_text = self._normalize_ingredients_text(payload.get("ingredients_text"))
         image_base64 = payload.get("image_base64")
         capture_mode = payload.get("capture_mode")
 
+        image = self._decode_image(image_base64) if image_base64 else None
+        image_hash: Optional[int] = None
+        cached_image: Optional[CachedImageResult] = None
+        cache_distance: Optional[int] = None
+        reused_cached_image = False
+        fresh_image = CachedImageResult()
+        if image is not None and self._image_cache is not None:
+            image_hash = perceptual_hash(image)
+            fresh_image.thumbnail = verification_thumbnail(image)
+            hit = self._image_cache.lookup(image_hash, fresh_image.thumbnail)
+            if hit is not None:
+                cached_image = hit.entry
+                cache_distance = hit.distance
+
+        # Decoded codes feed the barcode classifier just like a client-supplied barcode.
+        decoded_barcode: Optional[str] = None
+        if not barcode and image is not None:
+            decoded_barcode = self._decode_barcode_from_image(image)
+            if decoded_barcode:
+                LOGGER.info("Decoded barcode %s from product image", decoded_barcode)
+                barcode = decoded_barcode
+        barcode_prediction = self._predict_from_barcode(barcode)
+
+        # OCR runs even when the barcode classifier is confident: it only reports Halal or
+        # Doubtful, and the ingredient panel is the only signal that can surface Haram.
         extracted_ingredients_text: Optional[str] = None
-        if not ingredients_text and image_base64:
-            extracted_ingredients_text = self._extract_text_from_image(image_base64)
+        if not ingredients_text and image is not None:
+            if cached_image is not None and cached_image.ocr_ran:
+                extracted_ingredients_text = cached_image.ocr_text
+                reused_cached_image = True
+            else:
+                extracted_ingredients_text = self._extract_text_from_image(image)
+                fresh_image.ocr_ran = True
+                fresh_image.ocr_text = extracted_ingredients_text
             normalized = self._normalize_ingredients_text(extracted_ingredients_text)
             if normalized:
                 LOGGER.info("OCR extracted ingredient text of length %s", len(normalized))
@@ -138,41 +529,97 @@ class HalalClassifierService:
             else:
                 LOGGER.info("OCR did not extract any usable ingredient text from provided image.")
 
-        ingredient_prediction = self._predict_from_ingredients(ingredients_text)
-        logo_prediction = self._predict_from_logo(image_base64)
-        barcode_prediction = self._predict_from_barcode(barcode)
+        if ingredient_outcome is not None:
+            ingredient_prediction, verdict_match = ingredient_outcome
+        else:
+            ingredient_prediction, verdict_match = self._predict_with_verdict_index(
+                ingredients_text, reuse=reuse_verdicts
+            )
+        if cached_image is not None and cached_image.logo is not None:
+            logo_prediction = cached_image.logo
+            reused_cached_image = True
+        else:
+            logo_prediction = self._predict_from_logo(image)
+            fresh_image.logo = logo_prediction
+
+        if image_hash is not None and self._image_cache is not None:
+            if cached_image is not None:
+                # Fill in whichever stage the earlier scan skipped.
+                cached_image.ocr_ran = cached_image.ocr_ran or fresh_image.ocr_ran
+                if fresh_image.ocr_ran:
+                    cached_image.ocr_text = fresh_image.ocr_text
+                cached_image.logo = cached_image.logo or fresh_image.logo
+            else:
+                self._image_cache.store(image_hash, fresh_image)
+
         ecode_evidence = self._extract_ecode_evidence(ingredients_text)
+        risk_contributions = (
+            self._risk_index.contributions(ingredients_text) if self._risk_index is not None else []
+        )
+
+        if ingredient_prediction is None and ingredients_text and self._risk_index is not None:
+            # Without the Keras model, the precomputed risk index still gives a coarse verdict.
+            status, confidence, raw_scores = self._risk_index.assess(risk_contributions)
+            ingredient_prediction = IngredientPrediction(
+                status=status, confidence=confidence, raw_scores=raw_scores, source=EVIDENCE_RISK_INDEX
+            )
 
         final_status = "Doubtful"
         final_confidence = 0.5
-        evidence: list[str] = []
+        evidence: list[EvidenceItem] = []
 
         if ingredient_prediction:
             final_status = ingredient_prediction.status
             final_confidence = ingredient_prediction.confidence
             evidence.append(
-                f"Ingredient classifier suggests {ingredient_prediction.status} "
-                f"(confidence {ingredient_prediction.confidence:.2f})"
+                EvidenceItem(
+                    id=ingredient_prediction.source,
+                    status=ingredient_prediction.status,
+                    confidence=ingredient_prediction.confidence,
+                )
+            )
+        if verdict_match is not None:
+            evidence.append(
+                EvidenceItem(id=EVIDENCE_SIMILAR_INGREDIENTS, code=f"{verdict_match.similarity:.2f}")
             )
 
+        evidence.extend(
+            EvidenceItem(
+                id=EVIDENCE_RISK_TERM,
+                status=contribution.status,
+                confidence=contribution.weight,
+                code=contribution.term,
+                detail=contribution.evidence,
+            )
+            for contribution in risk_contributions
+        )
+
+        if decoded_barcode:
+            evidence.append(EvidenceItem(id=EVIDENCE_BARCODE_DECODED, code=decoded_barcode))
+
         if barcode_prediction:
             evidence.append(
-                f"Barcode classifier suggests {barcode_prediction.status} "
-                f"(confidence {barcode_prediction.confidence:.2f})"
+                EvidenceItem(
+                    id=EVIDENCE_BARCODE_MODEL,
+                    status=barcode_prediction.status,
+                    confidence=barcode_prediction.confidence,
+                )
             )
             if STATUS_HIERARCHY[barcode_prediction.status] > STATUS_HIERARCHY[final_status]:
                 final_status = barcode_prediction.status
                 final_confidence = max(final_confidence, barcode_prediction.confidence)
 
         if extracted_ingredients_text:
-            preview = extracted_ingredients_text.strip().replace("\n", " ")
-            if len(preview) > 200:
-                preview = preview[:200].rstrip() + "..."
-            evidence.append(f"OCR extracted ingredient text: {preview}")
+            evidence.append(EvidenceItem(id=EVIDENCE_OCR_TEXT, detail=extracted_ingredients_text))
 
         if ecode_evidence:
             evidence.extend(
-                f"{item['code']} labeled {item['halal_status']} – {item['description'] or 'No description provided'}"
+                EvidenceItem(
+                    id=EVIDENCE_ECODE,
+                    status=item["halal_status"],
+                    code=item["code"],
+                    detail=item["description"],
+                )
                 for item in ecode_evidence
             )
             max_status = max(
@@ -186,39 +633,43 @@ class HalalClassifierService:
         if logo_prediction:
             if logo_prediction.detected:
                 evidence.append(
-                    f"Halal logo detected with confidence {logo_prediction.confidence:.2f}"
+                    EvidenceItem(
+                        id=EVIDENCE_LOGO_DETECTED,
+                        status="Halal",
+                        confidence=logo_prediction.confidence,
+                    )
                 )
                 if STATUS_HIERARCHY["Halal"] > STATUS_HIERARCHY[final_status]:
                     final_status = "Halal"
                     final_confidence = max(final_confidence, logo_prediction.confidence)
             else:
                 evidence.append(
-                    "Halal logo not detected on provided image – manual review recommended"
+                    EvidenceItem(id=EVIDENCE_LOGO_MISSING, confidence=logo_prediction.confidence)
                 )
                 final_confidence = min(final_confidence, 0.6)
                 if final_status == "Halal":
                     final_status = "Doubtful"
 
+        if reused_cached_image:
+            evidence.append(EvidenceItem(id=EVIDENCE_NEAR_DUPLICATE_IMAGE, code=str(cache_distance)))
+
         # If no signals were produced, provide default evidence.
         if not evidence:
-            evidence.append("No model signals available; returning neutral assessment.")
-
-        feature_breakdown = {
-            "ingredients": self._serialize_dataclass(ingredient_prediction),
-            "barcode": self._serialize_dataclass(barcode_prediction),
-            "logo": self._serialize_dataclass(logo_prediction),
-        }
-
-        return {
-            "product_name": product_name or "Unnamed product",
-            "barcode": barcode,
-            "halal_status": final_status,
-            "confidence": float(np.clip(final_confidence, 0.0, 1.0)),
-            "evidence": evidence,
-            "capture_mode": capture_mode,
-            "recognized_ingredients_text": extracted_ingredients_text,
-            "feature_breakdown": {k: v for k, v in feature_breakdown.items() if v is not None},
-        }
+            evidence.append(EvidenceItem(id=EVIDENCE_NO_SIGNALS))
+
+        return ClassificationResult(
+            product_name=product_name or "Unnamed product",
+            barcode=barcode,
+            halal_status=final_status,
+            confidence=float(np.clip(final_confidence, 0.0, 1.0)),
+            evidence=evidence,
+            capture_mode=capture_mode,
+            recognized_ingredients_text=extracted_ingredients_text,
+            ingredients=ingredient_prediction,
+            barcode_model=barcode_prediction,
+            logo=logo_prediction,
+            model_version=self.version,
+        )
 
     # --------------------------------------------------------------------- #
     # Internal helpers
@@ -246,7 +697,9 @@ class HalalClassifierService:
         tflite_path = self.model_dir / "halal_logo_detector.tflite"
         if tflite_path.exists():
             try:
-                interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
+                interpreter = tf.lite.Interpreter(
+                    model_path=str(tflite_path), num_threads=self.threads.tflite
+                )
                 interpreter.allocate_tensors()
                 self._logo_interpreter = interpreter
                 self._logo_input_details = interpreter.get_input_details()
@@ -256,7 +709,16 @@ class HalalClassifierService:
                 self._logo_input_shape = cast(tuple[int, int, int], shape_slice)
                 self._logo_input_quant = self._extract_quant_params(self._logo_input_details[0])
                 self._logo_output_quant = self._extract_quant_params(self._logo_output_details[0])
-                LOGGER.info("Loaded halal logo detector TFLite model from %s", tflite_path)
+                height, width, channels = self._logo_input_shape
+                self._logo_preprocessor = ImagePreprocessor(
+                    height, width, self._logo_input_dtype, self._logo_input_quant, channels
+                )
+                LOGGER.info(
+                    "Loaded halal logo detector TFLite model from %s (%s input%s)",
+                    tflite_path,
+                    np.dtype(self._logo_input_dtype).name,
+                    ", raw pixels" if self._logo_preprocessor.raw_input else "",
+                )
                 return
             except Exception as exc:  # pragma: no cover - runtime safety
                 LOGGER.warning("Failed to load TFLite logo model at %s: %s", tflite_path, exc)
@@ -268,6 +730,7 @@ class HalalClassifierService:
             try:
                 LOGGER.info("Loading halal logo detector model from %s", keras_path)
                 self._logo_model = keras.models.load_model(keras_path, compile=False)
+                self._logo_preprocessor = self._build_keras_preprocessor(self._logo_model)
                 return
             except Exception as exc:  # pragma: no cover
                 LOGGER.warning("Failed to load %s: %s", keras_path, exc)
@@ -281,6 +744,21 @@ class HalalClassifierService:
         self._logo_model = keras.models.load_model(
             h5_path, custom_objects=self._get_custom_objects()
         )
+        self._logo_preprocessor = self._build_keras_preprocessor(self._logo_model)
+
+    @staticmethod
+    def _build_keras_preprocessor(model: "keras.Model") -> Optional[ImagePreprocessor]:
+        input_shape = model.input_shape
+        if isinstance(input_shape, list):
+            input_shape = input_shape[0]
+        try:
+            if len(input_shape) != 4:
+                raise ValueError(f"Unexpected model input shape: {input_shape}")
+            height, width, channels = (int(dim) for dim in input_shape[1:4])
+            return ImagePreprocessor(height, width, np.float32, None, channels)
+        except (TypeError, ValueError) as exc:
+            LOGGER.warning("Cannot preprocess images for the logo model: %s", exc)
+            return None
 
     def _load_barcode_model(self) -> None:
         if self._barcode_model is not None:
@@ -297,17 +775,59 @@ class HalalClassifierService:
             "barcode_status_labels.json", DEFAULT_BARCODE_CLASSES
         )
 
+    def _load_snapshot(self) -> None:
+        if self._snapshot is not None:
+            return
+        snapshot_path = self.model_dir / SNAPSHOT_FILENAME
+        if not snapshot_path.exists():
+            LOGGER.info("No service snapshot at %s; parsing source artifacts.", snapshot_path)
+            return
+        try:
+            snapshot = ServiceSnapshot(snapshot_path)
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to open service snapshot %s: %s", snapshot_path, exc)
+            return
+
+        # Matching size/mtime stamps are trusted; only a mismatch (an edit, or a copy
+        # that reset mtimes) pays for hashing the sources.
+        stamp = compute_source_stamp(self.model_dir)
+        stale = stamp is not None and stamp != snapshot.source_stamp()
+        if stale:
+            stale = compute_source_digest(self.model_dir) != snapshot.source_digest
+        if stale:
+            LOGGER.warning(
+                "Service snapshot %s is stale; rebuild it with `python -m src.cli.build_snapshot`.",
+                snapshot_path,
+            )
+            snapshot.close()
+            return
+        self._snapshot = snapshot
+        LOGGER.info("Mapped service snapshot from %s", snapshot_path)
+
     def _load_ecode_lookup(self) -> None:
         if self._ecode_lookup is not None:
             return
+        if self._snapshot is not None:
+            self._ecode_lookup = self._snapshot.ecodes()
+            if self._ecode_lookup is not None:
+                return
         csv_path = self.model_dir / "ecode_database.csv"
         if not csv_path.exists():
             LOGGER.warning("E-code lookup database not found at %s", csv_path)
             return
         LOGGER.info("Loading E-code lookup table from %s", csv_path)
-        self._ecode_lookup = pd.read_csv(csv_path)
-        # Normalize data for faster lookups
-        self._ecode_lookup["e_code_number"] = self._ecode_lookup["e_code_number"].str.upper()
+        # pandas is only needed on this cold path, so keep it out of snapshot-backed startups.
+        import pandas as pd
+
+        frame = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        lookup: dict[str, tuple[str, str]] = {}
+        for row in frame.itertuples(index=False):
+            code = str(getattr(row, "e_code_number", "")).strip().upper()
+            if not code or code in lookup:
+                continue
+            description = str(getattr(row, "description", "")).strip() or str(getattr(row, "name", "")).strip()
+            lookup[code] = (str(getattr(row, "halal_status", "")).strip(), description)
+        self._ecode_lookup = lookup
 
     def _load_logo_label_encoder(self) -> None:
         if self._logo_label_encoder is not None or joblib is None:
@@ -322,7 +842,83 @@ class HalalClassifierService:
             LOGGER.warning("Failed to load logo label encoder: %s", exc)
             self._logo_label_encoder = None
 
+    def _load_fast_ingredient_model(self) -> None:
+        if self._fast_ingredient_model is not None:
+            return
+        model_path = self.model_dir / FAST_MODEL_FILENAME
+        if not model_path.exists():
+            LOGGER.info("Fast ingredient classifier not found at %s; cascade disabled.", model_path)
+            return
+        try:
+            fast_model = FastIngredientClassifier.load(model_path)
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to load fast ingredient classifier: %s", exc)
+            return
+        fast_model.labels = [self._map_status(label) for label in fast_model.labels]
+        self._fast_ingredient_model = fast_model
+        LOGGER.info(
+            "Loaded fast ingredient classifier %s with %s weighted tokens (cascade threshold %.2f).",
+            fast_model.version,
+            len(fast_model),
+            self.cascade_threshold(),
+        )
+
+    def cascade_threshold(self) -> float:
+        if self.ingredient_cascade_threshold is not None:
+            return self.ingredient_cascade_threshold
+        if self._fast_ingredient_model is not None and self._fast_ingredient_model.suggested_threshold:
+            return float(self._fast_ingredient_model.suggested_threshold)
+        return 0.9
+
+    def _load_risk_index(self) -> None:
+        if self._risk_index is not None:
+            return
+        if self._snapshot is not None and self._snapshot.has(SECTION_RISK_INDEX):
+            try:
+                self._risk_index = IngredientRiskIndex.from_payload(self._snapshot.json(SECTION_RISK_INDEX))
+                return
+            except Exception as exc:  # pragma: no cover - runtime safety
+                LOGGER.warning("Failed to read risk index from snapshot: %s", exc)
+        index_path = self.model_dir / RISK_INDEX_FILENAME
+        if not index_path.exists():
+            LOGGER.warning("Ingredient risk index not found at %s", index_path)
+            return
+        try:
+            self._risk_index = IngredientRiskIndex.load(index_path)
+            LOGGER.info("Loaded ingredient risk index with %s terms.", len(self._risk_index))
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to load ingredient risk index: %s", exc)
+            self._risk_index = None
+
+    def _load_verdict_index(self) -> None:
+        if self._verdict_index is not None or not self.verdict_reuse_similarity:
+            return
+        # Lists that differ in a risk term or E-code never share a verdict.
+        sensitive = {code.lower() for code in self._ecode_lookup or {}}
+        if self._risk_index is not None:
+            sensitive.update(token for term in self._risk_index.entries for token in tokenize(term))
+        path = None
+        if self.verdict_index_dir is not None:
+            filename = re.sub(r"[^A-Za-z0-9._-]", "_", self.version) + VERDICT_FILE_SUFFIX
+            path = self.verdict_index_dir / filename
+            # The files hold user-submitted ingredient lists; keep only recent versions.
+            for removed in prune_verdict_files(self.verdict_index_dir, self.verdict_index_keep_versions, path):
+                LOGGER.info("Removed verdict index %s of an older model version.", removed)
+        index = IngredientVerdictIndex(
+            path,
+            min_similarity=self.verdict_reuse_similarity,
+            max_entries=self.verdict_index_max_entries,
+            sensitive_tokens=sensitive,
+        )
+        try:
+            index.load()
+        except OSError as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to read ingredient verdict index %s: %s", path, exc)
+        self._verdict_index = index
+
     def _load_ocr_reader(self) -> None:
+        if self._ocr_pool is not None:
+            return
         if self._ocr_reader is not None or easyocr is None:
             if easyocr is None:
                 LOGGER.warning("easyocr is not installed; OCR ingredient extraction will be unavailable.")
@@ -334,58 +930,161 @@ class HalalClassifierService:
             LOGGER.warning("Failed to initialize easyocr reader: %s", exc)
             self._ocr_reader = None
 
-    def _predict_from_ingredients(self, text: Optional[str]) -> Optional[IngredientPrediction]:
-        if not text or self._ingredient_model is None:
-            return None
-
-        processed = self._normalize_ingredients_text(text)
-        if not processed:
-            return None
+    def _predict_with_verdict_index(
+        self, text: Optional[str], *, reuse: bool = True
+    ) -> tuple[Optional[IngredientPrediction], Optional[VerdictMatch]]:
+        return self._predict_with_verdict_index_batch([text], reuse=reuse)[0]
+
+    def _predict_with_verdict_index_batch(
+        self, texts: list[Optional[str]], *, reuse: bool = True
+    ) -> list[tuple[Optional[IngredientPrediction], Optional[VerdictMatch]]]:
+        """Reuse verdicts of near-identical earlier lists, run the cascade on the rest and index them."""
+        index = self._verdict_index
+        if index is None:
+            return [(prediction, None) for prediction in self._predict_ingredients_batch(texts)]
+
+        outcomes: list[tuple[Optional[IngredientPrediction], Optional[VerdictMatch]]] = [
+            (None, None) for _ in texts
+        ]
+        pending: list[int] = []
+        for position, text in enumerate(texts):
+            if not text:
+                continue
+            if reuse:
+                started = time.perf_counter()
+                match = index.lookup(text)
+                if match is not None:
+                    self.cascade_stats.record(TIER_REUSED, time.perf_counter() - started)
+                    verdict = match.verdict
+                    prediction = IngredientPrediction(
+                        status=verdict.status,
+                        confidence=verdict.confidence,
+                        raw_scores=dict(verdict.raw_scores),
+                        source=verdict.source,
+                    )
+                    outcomes[position] = (prediction, match)
+                    continue
+            pending.append(position)
+
+        predictions = self._predict_ingredients_batch([texts[position] for position in pending])
+        for position, prediction in zip(pending, predictions):
+            outcomes[position] = (prediction, None)
+            # A low-confidence fast verdict standing in for a failed Keras run is not worth keeping.
+            escalation_failed = (
+                prediction is not None
+                and prediction.source == EVIDENCE_FAST_INGREDIENT_MODEL
+                and self._ingredient_model is not None
+                and prediction.confidence < self.cascade_threshold()
+            )
+            if prediction is not None and not escalation_failed:
+                index.insert(
+                    cast(str, texts[position]),
+                    prediction.status,
+                    prediction.confidence,
+                    prediction.raw_scores,
+                    prediction.source,
+                )
+        return outcomes
+
+    def _predict_ingredients_batch(self, texts: list[Optional[str]]) -> list[Optional[IngredientPrediction]]:
+        """Confidence-gated cascade: the distilled linear model answers easy lists, the rest
+        escalate to the full Keras model in a single batched call."""
+        results: list[Optional[IngredientPrediction]] = [None] * len(texts)
+        if self._ingredient_model is None and self._fast_ingredient_model is None:
+            return results
+
+        started = time.perf_counter()
+        threshold = self.cascade_threshold()
+        answered_fast: list[int] = []
+        escalated: list[tuple[int, str]] = []
+        for position, text in enumerate(texts):
+            processed = self._normalize_ingredients_text(text)
+            if not processed:
+                continue
+            if self._fast_ingredient_model is not None:
+                fast = self._fast_ingredient_model.predict(processed)
+                results[position] = IngredientPrediction(
+                    status=fast.status,
+                    confidence=fast.confidence,
+                    raw_scores=fast.raw_scores,
+                    source=EVIDENCE_FAST_INGREDIENT_MODEL,
+                )
+                if fast.confidence >= threshold or self._ingredient_model is None:
+                    answered_fast.append(position)
+                    continue
+            escalated.append((position, processed))
+
+        # Latency is shared evenly across the texts of a batch.
+        attempted = len(answered_fast) + len(escalated)
+        fast_seconds = (time.perf_counter() - started) / attempted if attempted else 0.0
+        for _ in answered_fast:
+            self.cascade_stats.record(TIER_FAST, fast_seconds)
+        if not escalated:
+            return results
+
+        full_started = time.perf_counter()
+        predictions = self._run_ingredient_model([processed for _, processed in escalated])
+        full_seconds = (time.perf_counter() - full_started) / len(escalated)
+        for (position, _), prediction in zip(escalated, predictions):
+            self.cascade_stats.record(TIER_FULL, fast_seconds + full_seconds)
+            # A failed full-model run still leaves the low-confidence fast verdict.
+            if prediction is not None:
+                results[position] = prediction
+        return results
+
+    def _run_ingredient_model(self, processed: list[str]) -> list[Optional[IngredientPrediction]]:
+        if self._ingredient_model is None or not processed:
+            return [None] * len(processed)
 
         try:
-            input_payload = np.array([processed], dtype=object)
-            predictions = self._ingredient_model.predict(input_payload, verbose=0)[0]
+            input_payload = np.array(processed, dtype=object)
+            predictions = self._ingredient_model.predict(input_payload, verbose=0, batch_size=len(processed))
         except Exception as exc:  # pragma: no cover - runtime safety
             LOGGER.warning("Ingredient model inference failed: %s", exc)
-            return None
+            return [None] * len(processed)
 
-        if predictions.ndim == 0:
-            LOGGER.warning("Unexpected ingredient model output shape: %s", predictions.shape)
-            return None
+        scores = np.asarray(predictions, dtype=np.float32)
+        if scores.ndim == 0 or scores.shape[0] != len(processed):
+            LOGGER.warning("Unexpected ingredient model output shape: %s", scores.shape)
+            return [None] * len(processed)
 
-        scores = np.asarray(predictions, dtype=np.float32).flatten()
+        scores = scores.reshape(len(processed), -1)
         label_order = self._ingredient_label_order or DEFAULT_INGREDIENT_CLASSES
-        if scores.size != len(label_order):
+        if scores.shape[1] != len(label_order):
             LOGGER.warning(
                 "Ingredient model returned %s classes, expected %s",
-                scores.size,
+                scores.shape[1],
                 len(label_order),
             )
-            return None
-
-        raw_scores = {
-            label_order[idx]: float(np.clip(scores[idx], 0.0, 1.0))
-            for idx in range(len(label_order))
-        }
-        best_index = int(np.argmax(scores))
-        best_class = label_order[best_index]
-        confidence = float(np.clip(scores[best_index], 0.0, 1.0))
-
-        return IngredientPrediction(status=best_class, confidence=confidence, raw_scores=raw_scores)
+            return [None] * len(processed)
+
+        results: list[Optional[IngredientPrediction]] = []
+        for row in scores:
+            raw_scores = {
+                label_order[idx]: float(np.clip(row[idx], 0.0, 1.0))
+                for idx in range(len(label_order))
+            }
+            best_index = int(np.argmax(row))
+            results.append(
+                IngredientPrediction(
+                    status=label_order[best_index],
+                    confidence=float(np.clip(row[best_index], 0.0, 1.0)),
+                    raw_scores=raw_scores,
+                )
+            )
+        return results
 
-    def _predict_from_logo(self, image_base64: Optional[str]) -> Optional[LogoPrediction]:
-        if not image_base64:
+    def _predict_from_logo(self, image: Optional[Image.Image]) -> Optional[LogoPrediction]:
+        if image is None:
             return None
 
-        image_bytes = self._decode_base64_image(image_base64)
-
         if self._logo_interpreter is not None:
-            scores = self._run_logo_interpreter(image_bytes)
+            scores = self._run_logo_interpreter(image)
             if scores is None:
                 return None
-        elif self._logo_model is not None:
+        elif self._logo_model is not None and self._logo_preprocessor is not None:
             try:
-                prepared = self._prepare_image(image_bytes, model=self._logo_model)
+                prepared = self._logo_preprocessor(image)
                 predictions = self._logo_model.predict(prepared, verbose=0)[0]
             except Exception as exc:  # pragma: no cover - runtime safety
                 LOGGER.warning("Logo detection model inference failed: %s", exc)
@@ -419,28 +1118,26 @@ class HalalClassifierService:
 
         return LogoPrediction(detected=detected, confidence=confidence)
 
-    def _run_logo_interpreter(self, image_bytes: bytes) -> Optional[np.ndarray]:
+    def _run_logo_interpreter(self, image: Image.Image) -> Optional[np.ndarray]:
         interpreter = self._logo_interpreter
+        preprocessor = self._logo_preprocessor
         if (
             interpreter is None
+            or preprocessor is None
             or self._logo_input_details is None
             or self._logo_output_details is None
-            or self._logo_input_dtype is None
         ):
             return None
 
         try:
-            if self._logo_input_shape is None:
-                height = int(self._logo_input_details[0]["shape"][1])
-                width = int(self._logo_input_details[0]["shape"][2])
-            else:
-                height, width, _ = self._logo_input_shape
-
-            float_input = self._prepare_image(image_bytes, height=height, width=width)
-            input_data = self._apply_input_quantization(float_input)
-
+            # Resize outside the lock; only the table lookup touches the shared tensor.
+            pixels = preprocessor.pixels(image)
             with self._logo_interpreter_lock:
-                interpreter.set_tensor(self._logo_input_details[0]["index"], input_data)
+                # Fill the interpreter's own input tensor in place; the view must be
+                # released before invoke() or TFLite refuses to run.
+                input_view = interpreter.tensor(self._logo_input_details[0]["index"])()
+                preprocessor.fill(pixels, input_view)
+                del input_view
                 interpreter.invoke()
                 output_data = interpreter.get_tensor(self._logo_output_details[0]["index"])
         except Exception as exc:  # pragma: no cover - runtime safety
@@ -483,6 +1180,53 @@ class HalalClassifierService:
 
         return BarcodePrediction(status=best_class, confidence=confidence, raw_scores=raw_scores)
 
+    def _decode_barcode_from_image(self, image: Image.Image) -> Optional[str]:
+        if pyzbar is None and cv2 is None:
+            return None
+
+        grayscale = image.convert("L")
+        if max(grayscale.size) > BARCODE_SCAN_MAX_SIDE:
+            grayscale.thumbnail((BARCODE_SCAN_MAX_SIDE, BARCODE_SCAN_MAX_SIDE), Image.Resampling.BILINEAR)
+
+        candidates: list[tuple[str, str]] = []
+        try:
+            if pyzbar is not None:
+                candidates = [
+                    (result.type, result.data.decode("ascii", errors="ignore"))
+                    for result in pyzbar.decode(grayscale)
+                ]
+            elif hasattr(cv2, "barcode"):
+                detector = cv2.barcode.BarcodeDetector()
+                ok, decoded_info, decoded_types, _ = detector.detectAndDecodeWithType(
+                    np.asarray(grayscale)
+                )
+                if ok:
+                    candidates = list(zip(decoded_types, decoded_info))
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Barcode decoding failed: %s", exc)
+            return None
+
+        for symbology, value in candidates:
+            symbology = symbology.upper()
+            if symbology not in RETAIL_BARCODE_TYPES:
+                continue
+            # A UPC-E check digit is computed over the expanded UPC-A, not the 8 printed digits.
+            gtin = expand_upce(value) if symbology in UPCE_BARCODE_TYPES else value
+            if gtin is not None and self._is_valid_gtin(gtin):
+                return value
+        return None
+
+    @staticmethod
+    def _is_valid_gtin(value: str) -> bool:
+        if not value.isdigit() or len(value) not in (8, 12, 13, 14):
+            return False
+        digits = [int(char) for char in value]
+        check = digits.pop()
+        total = sum(
+            digit * (3 if index % 2 == 0 else 1) for index, digit in enumerate(reversed(digits))
+        )
+        return (10 - total % 10) % 10 == check
+
     def _extract_ecode_evidence(self, text: Optional[str]) -> list[dict[str, str]]:
         if not text or self._ecode_lookup is None:
             return []
@@ -491,18 +1235,17 @@ class HalalClassifierService:
         if not codes:
             return []
 
-        lookup = self._ecode_lookup[self._ecode_lookup["e_code_number"].isin(list(codes))]
-        if lookup.empty:
-            return []
-
         evidence = []
-        for _, row in lookup.iterrows():
-            status = self._map_status(row.get("halal_status"))
+        for code in sorted(codes):
+            record = self._ecode_lookup.get(code)
+            if record is None:
+                continue
+            raw_status, description = record
             evidence.append(
                 {
-                    "code": row.get("e_code_number", ""),
-                    "halal_status": status,
-                    "description": row.get("description") or row.get("name") or "",
+                    "code": code,
+                    "halal_status": self._map_status(raw_status),
+                    "description": description,
                 }
             )
         return evidence
@@ -528,18 +1271,8 @@ class HalalClassifierService:
         if self._ingredient_model is None:
             return
 
-        vocab_path = self.model_dir / "ingredient_text_vocab.json"
-        if not vocab_path.exists():
-            LOGGER.warning("Ingredient vocabulary not found at %s", vocab_path)
-            return
-
-        try:
-            with open(vocab_path, "r", encoding="utf-8") as handle:
-                vocabulary = json.load(handle)
-            if not isinstance(vocabulary, list):
-                raise ValueError("Vocabulary file must contain a JSON list.")
-        except Exception as exc:  # pragma: no cover - runtime safety
-            LOGGER.warning("Failed to load ingredient vocabulary: %s", exc)
+        vocabulary = self._load_vocabulary()
+        if vocabulary is None:
             return
 
         try:
@@ -557,19 +1290,24 @@ class HalalClassifierService:
         except Exception as exc:  # pragma: no cover - runtime safety
             LOGGER.warning("Failed to hydrate ingredient vectorizer: %s", exc)
 
-    def _apply_input_quantization(self, array: np.ndarray) -> np.ndarray:
-        dtype = self._logo_input_dtype or np.float32
-        quant = self._logo_input_quant
-        if quant is None:
-            return array.astype(dtype, copy=False)
+    def _load_vocabulary(self) -> Optional[list[str]]:
+        if self._snapshot is not None and self._snapshot.has(SECTION_VOCABULARY):
+            return list(self._snapshot.strings(SECTION_VOCABULARY))
 
-        scale, zero_point = quant
-        converted = array / scale + zero_point
+        vocab_path = self.model_dir / "ingredient_text_vocab.json"
+        if not vocab_path.exists():
+            LOGGER.warning("Ingredient vocabulary not found at %s", vocab_path)
+            return None
 
-        if np.issubdtype(dtype, np.integer):
-            info = np.iinfo(dtype)
-            converted = np.clip(np.round(converted), info.min, info.max)
-        return converted.astype(dtype)
+        try:
+            with open(vocab_path, "r", encoding="utf-8") as handle:
+                vocabulary = json.load(handle)
+            if not isinstance(vocabulary, list):
+                raise ValueError("Vocabulary file must contain a JSON list.")
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to load ingredient vocabulary: %s", exc)
+            return None
+        return vocabulary
 
     def _apply_output_dequantization(self, output: np.ndarray) -> np.ndarray:
         quant = self._logo_output_quant
@@ -581,6 +1319,11 @@ class HalalClassifierService:
         return dequant.flatten()
 
     def _load_label_order(self, filename: str, default: list[str]) -> list[str]:
+        section = LABEL_SECTIONS.get(filename)
+        if self._snapshot is not None and section is not None and self._snapshot.has(section):
+            normalized = [self._map_status(item) for item in self._snapshot.strings(section)]
+            return normalized or default.copy()
+
         label_path = self.model_dir / filename
         if not label_path.exists():
             LOGGER.warning("Label file not found at %s; using defaults.", label_path)
@@ -608,40 +1351,27 @@ class HalalClassifierService:
             data = data.split(",", 1)[1]
         return base64.b64decode(data, validate=True)
 
-    @staticmethod
-    def _prepare_image(
-        image_bytes: bytes,
-        *,
-        model: Optional["keras.Model"] = None,
-        height: Optional[int] = None,
-        width: Optional[int] = None,
-    ) -> np.ndarray:
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        if model is not None:
-            input_shape = model.input_shape
-            if isinstance(input_shape, list):
-                input_shape = input_shape[0]
-            if len(input_shape) != 4:
-                raise ValueError(f"Unexpected model input shape: {input_shape}")
-            height = int(input_shape[1])
-            width = int(input_shape[2])
-        if height is None or width is None:
-            raise ValueError("Either a model or explicit height/width must be provided.")
-
-        resized = image.resize((width, height))
-        array = np.asarray(resized, dtype=np.float32) / 255.0
-        return np.expand_dims(array, axis=0)
+    def _decode_image(self, image_base64: str) -> Optional[Image.Image]:
+        """Decode the request image once so OCR, hashing and logo detection share it."""
+        image_bytes = self._decode_base64_image(image_base64)
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            return image.convert("RGB")
+        except Exception as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to decode product image: %s", exc)
+            return None
 
-    def _extract_text_from_image(self, image_base64: str) -> Optional[str]:
+    def _extract_text_from_image(self, image: Image.Image) -> Optional[str]:
         self._load_ocr_reader()
-        if self._ocr_reader is None:
+        if self._ocr_pool is None and self._ocr_reader is None:
             return None
 
         try:
-            image_bytes = self._decode_base64_image(image_base64)
-            pil_image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            image_array = np.asarray(pil_image)
-            results = self._ocr_reader.readtext(image_array, detail=0, paragraph=True)
+            if self._ocr_pool is not None:
+                results = self._ocr_pool.readtext(image)
+            else:
+                image_array = np.asarray(image)
+                results = self._ocr_reader.readtext(image_array, detail=0, paragraph=True)
             if not results:
                 return None
             text = "\n".join(result.strip() for result in results if result.strip())
@@ -664,15 +1394,6 @@ class HalalClassifierService:
             normalized = normalized[:1000].rstrip()
         return normalized or None
 
-    @staticmethod
-    def _serialize_dataclass(obj: Any) -> Optional[dict[str, Any]]:
-        if obj is None:
-            return None
-        try:
-            return asdict(obj)
-        except TypeError:
-            return None
-
     @staticmethod
     def _extract_quant_params(detail: dict[str, Any]) -> Optional[tuple[float, float]]:
         quant = detail.get("quantization")
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from PIL import Image, ImageChops, ImageStat
+
+HASH_SIZE = 8
+# Side of the grayscale thumbnail that confirms a hash match before results are reused.
+VERIFY_SIZE = 64
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """64-bit difference hash of a tiny grayscale thumbnail.
+
+    Downscaling with a box filter before the grayscale conversion keeps the cost to
+    one cheap reduction of the decoded image, and small crops, exposure changes and
+    re-encoding move only a few bits.
+    """
+
+    thumbnail = image.resize((hash_size + 1, hash_size), Image.Resampling.BOX).convert("L")
+    pixels = list(thumbnail.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def verification_thumbnail(image: Image.Image) -> Image.Image:
+    """64x64 grayscale thumbnail; at this size lines of label text still differ between products."""
+
+    return image.resize((VERIFY_SIZE, VERIFY_SIZE), Image.Resampling.BOX).convert("L")
+
+
+def thumbnail_difference(left: Image.Image, right: Image.Image) -> float:
+    """Mean absolute pixel difference (0-255) between two verification thumbnails."""
+
+    return ImageStat.Stat(ImageChops.difference(left, right)).mean[0]
+
+
+@dataclass
+class CachedImageResult:
+    thumbnail: Optional[Image.Image] = None
+    ocr_ran: bool = False
+    ocr_text: Optional[str] = None
+    logo: Optional[Any] = None
+
+
+@dataclass
+class CacheHit:
+    entry: CachedImageResult
+    distance: int
+
+
+class PerceptualHashCache:
+    """Bounded LRU of image hashes to OCR/logo results with Hamming-distance lookup.
+
+    The index is small (a few thousand entries), so a linear XOR/popcount pass over
+    the keys costs microseconds, far below a single OCR or logo model run. A 64-bit
+    dHash alone cannot tell two white ingredient panels apart, so the closest key
+    only counts as a hit when its verification thumbnail is within
+    `max_pixel_difference` of the new image's.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_distance: int = 4, max_pixel_difference: float = 6.0
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.max_pixel_difference = max_pixel_difference
+        self._entries: "OrderedDict[int, CachedImageResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, image_hash: int, thumbnail: Image.Image) -> Optional[CacheHit]:
+        with self._lock:
+            entry = self._entries.get(image_hash)
+            best_key, best_distance = (image_hash, 0) if entry is not None else (None, self.max_distance + 1)
+            if entry is None and self.max_distance > 0:
+                for key in self._entries:
+                    distance = (key ^ image_hash).bit_count()
+                    if distance < best_distance:
+                        best_key, best_distance = key, distance
+                        if distance == 1:
+                            break
+            if best_key is None:
+                self.misses += 1
+                return None
+            cached_thumbnail = self._entries[best_key].thumbnail
+            if (
+                cached_thumbnail is None
+                or thumbnail_difference(cached_thumbnail, thumbnail) > self.max_pixel_difference
+            ):
+                self.rejected += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return CacheHit(entry=self._entries[best_key], distance=best_distance)
+
+    def store(self, image_hash: int, entry: CachedImageResult) -> None:
+        with self._lock:
+            self._entries[image_hash] = entry
+            self._entries.move_to_end(image_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .halal_classifier import HalalClassifierService
+
+LOGGER = logging.getLogger(__name__)
+
+# Files whose changes should trigger a new model version.
+MODEL_ARTIFACTS = (
+    "ingredient_text_classifier.h5",
+    "ingredient_text_vocab.json",
+    "ingredient_text_labels.json",
+    "halal_logo_detector.tflite",
+    "halal_logo_detector.keras",
+    "halal_logo_detector.h5",
+    "logo_label_encoder.joblib",
+    "barcode_status_classifier.h5",
+    "barcode_status_labels.json",
+    "ecode_database.csv",
+    "ingredient_risk_index.json",
+    "ingredient_fast_classifier.json",
+    "service_snapshot.bin",
+)
+VERSION_FILE = "VERSION"
+# Requests resolve the active service just before calling it; a replaced service is
+# closed after this grace period and releases its models once its in-flight calls return.
+RETIRE_GRACE_SECONDS = 30.0
+
+
+def compute_model_version(model_dir: Path) -> str:
+    """Return the explicit VERSION tag, or a fingerprint of the artifact files."""
+
+    version_path = model_dir / VERSION_FILE
+    if version_path.exists():
+        tag = version_path.read_text(encoding="utf-8").strip()
+        if tag:
+            return tag
+
+    digest = hashlib.sha1()
+    for name in MODEL_ARTIFACTS:
+        path = model_dir / name
+        if not path.exists():
+            continue
+        stat = path.stat()
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """Holds the active `HalalClassifierService` and swaps in new versions atomically.
+
+    New versions are loaded and warmed on a background thread while the current
+    service keeps answering requests. Requests that already hold a reference to
+    the old service finish on it; the swap only changes which service new
+    requests receive, and the old one is closed once those requests drain.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        *,
+        poll_interval: float = 0.0,
+        service_factory: Callable[..., HalalClassifierService] = HalalClassifierService,
+        service_options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self._service_factory = service_factory
+        self._service_options = dict(service_options or {})
+        self._active: Optional[HalalClassifierService] = None
+        self._loaded_at: Optional[float] = None
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_error: Optional[str] = None
+        # Fingerprint that last failed to load; not retried until the artifacts change.
+        self._failed_version: Optional[str] = None
+
+    def start(self) -> None:
+        self.reload(force=True)
+        if self.poll_interval > 0 and self._watcher is None:
+            self._watcher = threading.Thread(
+                target=self._watch, name="model-registry-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def active(self) -> HalalClassifierService:
+        service = self._active
+        if service is None:
+            raise RuntimeError("Model registry has not loaded a classifier yet.")
+        return service
+
+    @property
+    def active_version(self) -> Optional[str]:
+        service = self._active
+        return service.version if service is not None else None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def reload(self, *, force: bool = False) -> bool:
+        """Load, warm and activate the current artifacts. Returns True when a swap happened."""
+
+        with self._reload_lock:
+            version = compute_model_version(self.model_dir)
+            if not force and version in (self.active_version, self._failed_version):
+                return False
+
+            LOGGER.info("Loading model version %s from %s", version, self.model_dir)
+            started = time.perf_counter()
+            candidate: Optional[HalalClassifierService] = None
+            try:
+                candidate = self._service_factory(
+                    model_dir=self.model_dir, version=version, **self._service_options
+                )
+                candidate.load()
+                candidate.warm_up()
+            except Exception as exc:
+                self.last_error = f"Failed to load model version {version}: {exc}"
+                self._failed_version = version
+                LOGGER.exception(
+                    "Failed to load model version %s; keeping %s until the artifacts change",
+                    version,
+                    self.active_version,
+                )
+                if candidate is not None:
+                    candidate.close()
+                if self._active is None:
+                    raise
+                return False
+
+            previous_service = self._active
+            previous = self.active_version
+            # A single reference assignment is atomic, so readers see either version.
+            self._active = candidate
+            self._loaded_at = time.time()
+            self.last_error = None
+            self._failed_version = None
+            if previous_service is not None:
+                self._retire(previous_service)
+            LOGGER.info(
+                "Activated model version %s (previous %s) in %.2fs",
+                version,
+                previous,
+                time.perf_counter() - started,
+            )
+            return True
+
+    def reload_in_background(self, *, force: bool = False) -> bool:
+        """Start a reload thread unless one is already running."""
+
+        if self._reload_thread is not None and self._reload_thread.is_alive():
+            return False
+        self._reload_thread = threading.Thread(
+            target=self._safe_reload, kwargs={"force": force}, name="model-registry-reload", daemon=True
+        )
+        self._reload_thread.start()
+        return True
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "active_version": self.active_version,
+            "loaded_at": self._loaded_at,
+            "reloading": self.reloading,
+            "last_error": self.last_error,
+        }
+
+    def _retire(self, service: HalalClassifierService) -> None:
+        timer = threading.Timer(RETIRE_GRACE_SECONDS, service.close)
+        timer.name = "model-registry-retire"
+        timer.daemon = True
+        timer.start()
+
+    def _safe_reload(self, *, force: bool = False) -> None:
+        try:
+            self.reload(force=force)
+        except Exception:  # pragma: no cover - logged in reload
+            pass
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if compute_model_version(self.model_dir) != self.active_version:
+                    self._safe_reload()
+            except OSError as exc:  # pragma: no cover - runtime safety
+                LOGGER.warning("Failed to check model artifacts for changes: %s", exc)
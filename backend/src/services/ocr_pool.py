@@ -0,0 +1,257 @@
+"""Pool of easyocr readers in worker processes.
+
+A single `easyocr.Reader` cannot run requests in parallel, so OCR throughput in one
+process is one image at a time. Each worker here owns a warmed reader; callers
+borrow an idle worker, send it the image over a pipe and wait up to `timeout`
+seconds. A worker that crashes or times out is killed and replaced in the
+background, so one bad image costs one job rather than the pool. Workers that
+fail to start are retried with exponential backoff. Requests wait for a worker
+that is still starting up (e.g. while the readers load at boot), and fail
+immediately only when no worker is alive and none is starting.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+import numpy as np
+from PIL import Image
+
+LOGGER = logging.getLogger(__name__)
+
+# easyocr's default canvas_size; larger frames are downscaled by the reader anyway,
+# so shrinking first only saves pickling and pipe bandwidth.
+OCR_MAX_SIDE = 2560
+READY = "ready"
+SPAWN_RETRY_DELAY = 5.0
+SPAWN_RETRY_MAX_DELAY = 300.0
+# How often a request waiting for a free worker re-checks that one is alive or starting.
+IDLE_POLL_SECONDS = 0.5
+
+
+class OcrUnavailableError(RuntimeError):
+    pass
+
+
+def _worker_main(connection: Connection, languages: list[str], torch_threads: int) -> None:
+    """Worker entry point: load a reader, warm it, then serve jobs until the pipe closes."""
+
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:  # pragma: no cover - torch ships with easyocr
+        pass
+    import easyocr
+
+    reader = easyocr.Reader(languages, gpu=False)
+    reader.readtext(np.full((64, 256, 3), 255, dtype=np.uint8), detail=0)
+    connection.send(READY)
+    while True:
+        try:
+            shape, data = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            image = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+            connection.send(("ok", reader.readtext(image, detail=0, paragraph=True)))
+        except Exception as exc:  # pragma: no cover - reported to the caller
+            connection.send(("error", str(exc)))
+
+
+@dataclass
+class _Worker:
+    process: Any
+    connection: Connection
+
+
+class OcrWorkerPool:
+    def __init__(
+        self,
+        workers: int,
+        *,
+        timeout: float = 30.0,
+        languages: tuple[str, ...] = ("en",),
+        torch_threads: Optional[int] = None,
+        startup_timeout: float = 300.0,
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self.languages = list(languages)
+        # Split the cores between workers so their torch pools do not oversubscribe.
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self.startup_timeout = startup_timeout
+        # Spawn rather than fork: torch is not fork-safe.
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        # Every live worker, idle or busy, so `close` can terminate all of them.
+        self._live: list[_Worker] = []
+        # Workers launched but not yet warm; requests wait for these rather than failing.
+        self._starting = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    def start(self) -> None:
+        """Spawn the workers; each joins the idle queue once its reader is warm."""
+        for _ in range(self.workers):
+            self._spawn_in_background()
+
+    @property
+    def available(self) -> bool:
+        """True while a worker is alive or starting, i.e. while waiting for one can succeed."""
+        with self._lock:
+            return not self._closed and bool(self._live or self._starting)
+
+    def close(self) -> None:
+        """Terminate every worker, including ones busy with a job."""
+        with self._lock:
+            self._closed = True
+            workers, self._live = self._live, []
+        for worker in workers:
+            self._terminate(worker)
+
+    def readtext(self, image: Image.Image) -> list[str]:
+        if self._closed:
+            raise OcrUnavailableError("OCR pool is closed.")
+        if max(image.size) > OCR_MAX_SIDE:
+            image = image.copy()
+            image.thumbnail((OCR_MAX_SIDE, OCR_MAX_SIDE))
+        array = np.asarray(image, dtype=np.uint8)
+
+        started = time.perf_counter()
+        worker = self._acquire(started)
+
+        healthy = False
+        try:
+            worker.connection.send((array.shape, array.tobytes()))
+            # The queue wait counts against the job's budget.
+            remaining = max(0.1, self.timeout - (time.perf_counter() - started))
+            if not worker.connection.poll(remaining):
+                with self._lock:
+                    self.timeouts += 1
+                raise OcrUnavailableError(f"OCR job exceeded {self.timeout:.0f}s; restarting worker.")
+            status, payload = worker.connection.recv()
+            healthy = True
+        except (EOFError, OSError, BrokenPipeError) as exc:
+            with self._lock:
+                self.crashes += 1
+            raise OcrUnavailableError(f"OCR worker crashed: {exc}") from exc
+        finally:
+            if healthy and not self._closed:
+                self._idle.put(worker)
+            else:
+                self._retire(worker)
+
+        with self._lock:
+            self.jobs += 1
+        if status != "ok":
+            raise OcrUnavailableError(f"OCR worker failed: {payload}")
+        return list(payload)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "alive": len(self._live),
+                "starting": self._starting,
+                "idle": self._idle.qsize(),
+                "jobs": self.jobs,
+                "timeouts": self.timeouts,
+                "crashes": self.crashes,
+            }
+
+    def _acquire(self, started: float) -> _Worker:
+        while True:
+            if not self.available:
+                raise OcrUnavailableError("No OCR worker is running or starting.")
+            remaining = self.timeout - (time.perf_counter() - started)
+            if remaining <= 0:
+                raise OcrUnavailableError(f"No OCR worker became free within {self.timeout:.0f}s.")
+            try:
+                return self._idle.get(timeout=min(IDLE_POLL_SECONDS, remaining))
+            except queue.Empty:
+                continue
+
+    def _retire(self, worker: _Worker) -> None:
+        """Terminate a failed worker and start a replacement."""
+        with self._lock:
+            if worker in self._live:
+                self._live.remove(worker)
+        self._terminate(worker)
+        if not self._closed:
+            self._spawn_in_background()
+
+    def _spawn_in_background(self) -> None:
+        # Counted before the thread runs, so a request arriving right after `start` waits.
+        with self._lock:
+            self._starting += 1
+        threading.Thread(target=self._spawn_with_retry, name="ocr-pool-spawn", daemon=True).start()
+
+    def _spawn_with_retry(self) -> None:
+        """Start one worker, backing off between failed attempts.
+
+        The worker only counts as starting while an attempt is running, not during the
+        back-off, so requests fail fast while every start keeps failing.
+        """
+        delay = SPAWN_RETRY_DELAY
+        try:
+            while not self._closed and not self._spawn():
+                with self._lock:
+                    self._starting -= 1
+                LOGGER.warning("Retrying OCR worker start in %.0fs.", delay)
+                time.sleep(delay)
+                with self._lock:
+                    self._starting += 1
+                delay = min(delay * 2, SPAWN_RETRY_MAX_DELAY)
+        finally:
+            with self._lock:
+                self._starting -= 1
+
+    def _spawn(self) -> bool:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child, self.languages, self.torch_threads),
+            name="ocr-worker",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        worker = _Worker(process=process, connection=parent)
+        try:
+            ready = parent.poll(self.startup_timeout) and parent.recv() == READY
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            LOGGER.warning("OCR worker %s failed to start (exit code %s).", process.pid, process.exitcode)
+            self._terminate(worker)
+            return False
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._live.append(worker)
+        if closed:
+            self._terminate(worker)
+            return True
+        LOGGER.info("OCR worker %s ready with %s torch threads.", process.pid, self.torch_threads)
+        self._idle.put(worker)
+        return True
+
+    @staticmethod
+    def _terminate(worker: _Worker) -> None:
+        worker.connection.close()
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+from typing import Optional
+
+SERVICES_DIR = Path(__file__).resolve().parent
+MAX_STACK_DEPTH = 128
+
+# Only one diagnostic may run at a time; concurrent runs would skew each other.
+_DIAGNOSTIC_LOCK = threading.Lock()
+
+
+class DiagnosticBusyError(RuntimeError):
+    pass
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    labels: list[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler producing flamegraph-compatible collapsed stacks.
+
+    A daemon thread reads `sys._current_frames()` every `interval` seconds, so the
+    profiled threads are never instrumented; overhead is one frame walk per thread
+    per sample. Native work (TF kernels, PIL, easyocr's torch ops) is attributed to
+    the Python frame that called into it.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not _DIAGNOSTIC_LOCK.acquire(blocking=False):
+            raise DiagnosticBusyError("Another profiling session is already running.")
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            _DIAGNOSTIC_LOCK.release()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                thread_name = names.get(thread_id, str(thread_id)).replace(" ", "_")
+                self._stacks[f"{thread_name};{_collapse(frame)}"] += 1
+            self.samples += 1
+
+
+@dataclass
+class AllocationSite:
+    service_frame: str
+    allocation_frame: str
+    size_bytes: int
+    count: int
+
+
+def capture_allocations(seconds: float, *, limit: int = 25, frames: int = 25) -> list[AllocationSite]:
+    """Trace allocations for `seconds` and rank net memory growth by the service line behind it.
+
+    Each allocation is attributed to the innermost frame under `src/services`, so
+    memory allocated inside numpy, PIL or TensorFlow is charged to the service call
+    that triggered it. `allocation_frame` is the line that actually allocated.
+    """
+
+    if not _DIAGNOSTIC_LOCK.acquire(blocking=False):
+        raise DiagnosticBusyError("Another profiling session is already running.")
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(frames)
+        baseline = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _DIAGNOSTIC_LOCK.release()
+
+    service_filter = [tracemalloc.Filter(True, os.path.join(str(SERVICES_DIR), "*"), all_frames=True)]
+    snapshot = snapshot.filter_traces(service_filter)
+    baseline = baseline.filter_traces(service_filter)
+
+    sites: dict[tuple[str, str], AllocationSite] = {}
+    for stat in snapshot.compare_to(baseline, "traceback"):
+        if stat.size_diff <= 0:
+            continue
+        frames_list = list(stat.traceback)
+        service_frame = next(
+            (frame for frame in reversed(frames_list) if frame.filename.startswith(str(SERVICES_DIR))),
+            None,
+        )
+        if service_frame is None:
+            continue
+        allocating = frames_list[-1]
+        key = (
+            f"{Path(service_frame.filename).name}:{service_frame.lineno}",
+            f"{allocating.filename}:{allocating.lineno}",
+        )
+        site = sites.get(key)
+        if site is None:
+            site = sites[key] = AllocationSite(key[0], key[1], 0, 0)
+        site.size_bytes += stat.size_diff
+        site.count += max(stat.count_diff, 0)
+
+    ranked = sorted(sites.values(), key=lambda site: site.size_bytes, reverse=True)
+    return ranked[:limit]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+RISK_INDEX_FILENAME = "ingredient_risk_index.json"
+RISK_INDEX_FORMAT_VERSION = 1
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Weights at or above this mark a Haram entry as decisive for the fallback verdict.
+HARAM_DECISIVE_WEIGHT = 0.8
+# Finding no risky terms is not evidence of Halal, so the fallback stays at the neutral verdict.
+NO_RISK_STATUS = "Doubtful"
+NO_RISK_CONFIDENCE = 0.5
+# A match directly preceded by a prefix or followed by a suffix is negated ("without gelatin",
+# "alcohol-free"). "free" only counts after the term: in "gluten free, lard" it belongs to gluten.
+NEGATION_PREFIXES = frozenset({"no", "non", "without"})
+NEGATION_SUFFIXES = frozenset({"free"})
+
+
+@dataclass(frozen=True)
+class RiskEntry:
+    status: str
+    weight: float
+    evidence: str
+
+
+@dataclass
+class RiskContribution:
+    term: str
+    status: str
+    weight: float
+    evidence: str
+
+
+def tokenize(text: str) -> list[str]:
+    """Split normalized ingredient text into the alphanumeric tokens used as index keys."""
+
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class IngredientRiskIndex:
+    """Token/n-gram to halal-risk lookup built offline by `src.cli.build_risk_index`.
+
+    Lookups walk the text once, probing each position for the longest n-gram the
+    index contains, so triage costs a handful of dict lookups per token.
+    """
+
+    def __init__(self, entries: dict[str, RiskEntry], *, max_ngram: int = 1, version: str = "") -> None:
+        self.entries = entries
+        self.max_ngram = max(1, max_ngram)
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "IngredientRiskIndex":
+        if payload.get("format_version") != RISK_INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported risk index format: {payload.get('format_version')}")
+        entries = {
+            term: RiskEntry(
+                status=str(raw["status"]),
+                weight=float(raw["weight"]),
+                evidence=str(raw.get("evidence", "")),
+            )
+            for term, raw in payload.get("entries", {}).items()
+        }
+        max_ngram = max((len(term.split(" ")) for term in entries), default=1)
+        return cls(entries, max_ngram=max_ngram, version=str(payload.get("version", "")))
+
+    @classmethod
+    def load(cls, path: Path) -> "IngredientRiskIndex":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_payload(json.load(handle))
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "format_version": RISK_INDEX_FORMAT_VERSION,
+            "version": self.version,
+            "entries": {
+                term: {"status": entry.status, "weight": entry.weight, "evidence": entry.evidence}
+                for term, entry in sorted(self.entries.items())
+            },
+        }
+
+    def contributions(self, text: Optional[str], *, limit: int = 5) -> list[RiskContribution]:
+        """Return the highest-weighted index matches in `text`, one per distinct term.
+
+        Negated matches (see `NEGATION_PREFIXES` and `NEGATION_SUFFIXES`) are skipped.
+        """
+
+        if not text or not self.entries:
+            return []
+
+        tokens = tokenize(text)
+        found: dict[str, RiskContribution] = {}
+        position = 0
+        while position < len(tokens):
+            matched = 1
+            for size in range(min(self.max_ngram, len(tokens) - position), 0, -1):
+                term = " ".join(tokens[position : position + size])
+                entry = self.entries.get(term)
+                if entry is None:
+                    continue
+                matched = size
+                negated = (position > 0 and tokens[position - 1] in NEGATION_PREFIXES) or (
+                    position + size < len(tokens) and tokens[position + size] in NEGATION_SUFFIXES
+                )
+                if not negated and term not in found:
+                    found[term] = RiskContribution(
+                        term=term, status=entry.status, weight=entry.weight, evidence=entry.evidence
+                    )
+                break
+            position += matched
+
+        ranked = sorted(found.values(), key=lambda item: item.weight, reverse=True)
+        return ranked[:limit]
+
+    @staticmethod
+    def assess(contributions: list[RiskContribution]) -> tuple[str, float, dict[str, float]]:
+        """Derive a coarse verdict from contributions when the ingredient model is unavailable."""
+
+        haram = max((c.weight for c in contributions if c.status == "Haram"), default=0.0)
+        doubtful = max((c.weight for c in contributions if c.status == "Doubtful"), default=0.0)
+        raw_scores = {
+            "Halal": round(1.0 - max(haram, doubtful), 4),
+            "Haram": round(haram, 4),
+            "Doubtful": round(doubtful, 4),
+        }
+        if haram >= HARAM_DECISIVE_WEIGHT:
+            return "Haram", haram, raw_scores
+        if haram or doubtful:
+            return "Doubtful", max(haram, doubtful), raw_scores
+        raw_scores["Halal"] = round(1.0 - NO_RISK_CONFIDENCE, 4)
+        raw_scores[NO_RISK_STATUS] = NO_RISK_CONFIDENCE
+        return NO_RISK_STATUS, NO_RISK_CONFIDENCE, raw_scores
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import base64
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .halal_classifier import STATUS_HIERARCHY, ClassificationResult
+
+LOGGER = logging.getLogger(__name__)
+
+SUMMARY_LENGTH = 240
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    product_name TEXT NOT NULL,
+    barcode TEXT,
+    halal_status TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    summary TEXT NOT NULL,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scans_device_time ON scans (device_id, scanned_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS scan_status_counts (
+    device_id TEXT NOT NULL,
+    halal_status TEXT NOT NULL,
+    scan_count INTEGER NOT NULL,
+    last_scanned_at REAL NOT NULL,
+    PRIMARY KEY (device_id, halal_status)
+);
+"""
+
+
+@dataclass
+class ScanEntry:
+    id: int
+    device_id: str
+    scanned_at: float
+    product_name: str
+    barcode: Optional[str]
+    halal_status: str
+    confidence: float
+    summary: str
+    model_version: Optional[str]
+
+
+@dataclass
+class UploadedScan:
+    """A scan the app classified on the device and uploads afterwards, already summarized."""
+
+    product_name: str
+    barcode: Optional[str]
+    halal_status: str
+    confidence: float
+    summary: str
+    model_version: Optional[str]
+
+
+@dataclass
+class _PendingScan:
+    device_id: str
+    scanned_at: float
+    result: ClassificationResult | UploadedScan
+
+
+def encode_cursor(scanned_at: float, scan_id: int) -> str:
+    raw = f"{scanned_at!r}:{scan_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        scanned_at, scan_id = base64.urlsafe_b64decode(padded).decode("ascii").split(":", 1)
+        return float(scanned_at), int(scan_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Malformed history cursor.") from exc
+
+
+class ScanHistoryStore:
+    """Append-only scan log in SQLite with per-device status counters.
+
+    `record` only enqueues; a single writer thread drains the queue in batches, so
+    classification latency never includes a disk write. Each batch inserts the scan
+    rows and bumps `scan_status_counts` in the same transaction, which keeps the
+    aggregates exact without ever scanning a device's full history.
+    """
+
+    def __init__(self, path: Path, *, queue_size: int = 10_000, batch_size: int = 256) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[_PendingScan]]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._local = threading.local()
+        self.dropped = 0
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        with connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._drain, name="scan-history-writer", daemon=True)
+            self._writer.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join(timeout)
+        if self._writer.is_alive():
+            LOGGER.warning("Scan history writer did not finish within %.1fs; queued scans may be lost.", timeout)
+        self._writer = None
+
+    def flush(self) -> None:
+        """Block until every queued scan has been written."""
+        self._queue.join()
+
+    def record(
+        self,
+        device_id: str,
+        result: ClassificationResult | UploadedScan,
+        *,
+        scanned_at: Optional[float] = None,
+    ) -> bool:
+        pending = _PendingScan(device_id=device_id, scanned_at=scanned_at or time.time(), result=result)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self.dropped += 1
+            LOGGER.warning("Scan history queue is full; dropped scan for device %s", device_id)
+            return False
+        return True
+
+    def list_scans(
+        self, device_id: str, *, limit: int = 20, cursor: Optional[str] = None
+    ) -> tuple[list[ScanEntry], Optional[str]]:
+        query = (
+            "SELECT id, device_id, scanned_at, product_name, barcode, halal_status, confidence, "
+            "summary, model_version FROM scans WHERE device_id = ?"
+        )
+        params: list[object] = [device_id]
+        if cursor:
+            scanned_at, scan_id = decode_cursor(cursor)
+            query += " AND (scanned_at < ? OR (scanned_at = ? AND id < ?))"
+            params.extend([scanned_at, scanned_at, scan_id])
+        query += " ORDER BY scanned_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._reader().execute(query, params).fetchall()
+        entries = [ScanEntry(*row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and entries:
+            last = entries[-1]
+            next_cursor = encode_cursor(last.scanned_at, last.id)
+        return entries, next_cursor
+
+    def aggregates(self, device_id: str) -> tuple[dict[str, int], Optional[float]]:
+        rows = self._reader().execute(
+            "SELECT halal_status, scan_count, last_scanned_at FROM scan_status_counts WHERE device_id = ?",
+            (device_id,),
+        ).fetchall()
+        counts = {status: 0 for status in STATUS_HIERARCHY}
+        last_scanned_at: Optional[float] = None
+        for status, count, scanned_at in rows:
+            counts[status] = count
+            last_scanned_at = max(last_scanned_at or scanned_at, scanned_at)
+        return counts, last_scanned_at
+
+    # --------------------------------------------------------------------- #
+    # Internal helpers
+    # --------------------------------------------------------------------- #
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+        return connection
+
+    def _drain(self) -> None:
+        connection = self._connect()
+        stopping = False
+        while not stopping:
+            batch: list[_PendingScan] = []
+            item = self._queue.get()
+            received = 1
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                received += 1
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._write_batch(connection, batch)
+            except sqlite3.Error as exc:  # pragma: no cover - runtime safety
+                LOGGER.warning("Failed to persist %s scans to history: %s", len(batch), exc)
+            finally:
+                for _ in range(received):
+                    self._queue.task_done()
+        connection.close()
+
+    @staticmethod
+    def _write_batch(connection: sqlite3.Connection, batch: list[_PendingScan]) -> None:
+        rows = []
+        for pending in batch:
+            result = pending.result
+            if isinstance(result, UploadedScan):
+                summary = result.summary
+            else:
+                summary = "; ".join(item.describe() for item in result.evidence)
+            if len(summary) > SUMMARY_LENGTH:
+                summary = summary[:SUMMARY_LENGTH].rstrip() + "..."
+            rows.append(
+                (
+                    pending.device_id,
+                    pending.scanned_at,
+                    result.product_name,
+                    result.barcode,
+                    result.halal_status,
+                    result.confidence,
+                    summary,
+                    result.model_version,
+                )
+            )
+        with connection:
+            connection.executemany(
+                "INSERT INTO scans (device_id, scanned_at, product_name, barcode, halal_status, "
+                "confidence, summary, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.executemany(
+                "INSERT INTO scan_status_counts (device_id, halal_status, scan_count, last_scanned_at) "
+                "VALUES (?, ?, 1, ?) ON CONFLICT (device_id, halal_status) DO UPDATE SET "
+                "scan_count = scan_count + 1, "
+                "last_scanned_at = MAX(last_scanned_at, excluded.last_scanned_at)",
+                [(row[0], row[4], row[1]) for row in rows],
+            )
@@ -0,0 +1,277 @@
+"""Memory-mapped snapshot of the classifier's non-model artifacts.
+
+`src.cli.build_snapshot` packs the E-code table, vocabulary, label orders and the
+ingredient risk index into one binary file. `HalalClassifierService.load` maps it
+read-only instead of parsing CSV/JSON, so several workers share the same pages
+and strings are only decoded when they are actually looked up.
+
+Layout (little-endian)::
+
+    header   "<8sII64s"  magic, format version, section count, source digest
+    table    "<32sQQ"    per section: name, absolute offset, length
+    sections 8-byte aligned payloads
+
+String sections are tables of ``count`` (u32), ``count + 1`` offsets (u32) and a
+UTF-8 blob. The E-code keys are stored sorted so lookups are a binary search.
+The ``sources.stamp`` section records each source's size and mtime, so checking
+for a stale snapshot at load is a few `stat` calls; the content digest in the
+header is only recomputed when the stamps disagree.
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import hashlib
+import json
+import mmap
+import struct
+
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Iterable, Optional, overload
+
+SNAPSHOT_FILENAME = "service_snapshot.bin"
+SNAPSHOT_MAGIC = b"HALSNAP\x00"
+SNAPSHOT_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sII64s")
+_SECTION = struct.Struct("<32sQQ")
+_ALIGNMENT = 8
+
+# Source files folded into the snapshot; their digest detects stale snapshots.
+SNAPSHOT_SOURCES = (
+    "ecode_database.csv",
+    "ingredient_text_vocab.json",
+    "ingredient_text_labels.json",
+    "barcode_status_labels.json",
+    "ingredient_risk_index.json",
+)
+SECTION_VOCABULARY = "vocab"
+SECTION_ECODE_CODES = "ecode.codes"
+SECTION_ECODE_STATUSES = "ecode.statuses"
+SECTION_ECODE_DESCRIPTIONS = "ecode.descriptions"
+SECTION_RISK_INDEX = "risk_index"
+SECTION_SOURCE_STAMP = "sources.stamp"
+LABEL_SECTIONS = {
+    "ingredient_text_labels.json": "labels.ingredient",
+    "barcode_status_labels.json": "labels.barcode",
+}
+
+
+def compute_source_digest(model_dir: Path) -> Optional[str]:
+    """Content digest of the snapshot sources, or None when none of them are present."""
+
+    digest = hashlib.blake2b(digest_size=32)
+    found = False
+    for name in SNAPSHOT_SOURCES:
+        path = model_dir / name
+        if not path.exists():
+            continue
+        found = True
+        digest.update(name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest() if found else None
+
+
+class StringTable(Sequence[str]):
+    """Read-only string list backed by a buffer; items are decoded on access."""
+
+    def __init__(self, buffer: memoryview) -> None:
+        self._buffer = buffer
+        (self._count,) = struct.unpack_from("<I", buffer, 0)
+        self._blob_at = 4 + 4 * (self._count + 1)
+
+    @staticmethod
+    def encode(values: Iterable[str]) -> bytes:
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = [0]
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        return struct.pack(f"<I{len(offsets)}I", len(encoded), *offsets) + b"".join(encoded)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("string table index out of range")
+        start, end = struct.unpack_from("<II", self._buffer, 4 + 4 * index)
+        return str(self._buffer[self._blob_at + start : self._blob_at + end], "utf-8")
+
+
+class SortedStringMap(Mapping[str, tuple[str, str]]):
+    """E-code -> (raw halal status, description) lookup over sorted string tables."""
+
+    def __init__(self, keys: StringTable, statuses: StringTable, descriptions: StringTable) -> None:
+        self._keys = keys
+        self._statuses = statuses
+        self._descriptions = descriptions
+
+    def __getitem__(self, key: str) -> tuple[str, str]:
+        position = bisect.bisect_left(self._keys, key)
+        if position >= len(self._keys) or self._keys[position] != key:
+            raise KeyError(key)
+        return self._statuses[position], self._descriptions[position]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        position = bisect.bisect_left(self._keys, key)
+        return position < len(self._keys) and self._keys[position] == key
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class ServiceSnapshot:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._handle.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+        magic, format_version, section_count, digest = _HEADER.unpack_from(self._view, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a service snapshot.")
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot format version {format_version}.")
+        self.source_digest = digest.rstrip(b"\x00").decode("ascii")
+
+        self._sections: dict[str, tuple[int, int]] = {}
+        for index in range(section_count):
+            name, offset, length = _SECTION.unpack_from(self._view, _HEADER.size + index * _SECTION.size)
+            self._sections[name.rstrip(b"\x00").decode("ascii")] = (offset, length)
+
+    def close(self) -> None:
+        self._sections = {}
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:  # pragma: no cover - tables still reference the mapping
+            pass
+        self._handle.close()
+
+    def has(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        return self._view[offset : offset + length]
+
+    def strings(self, name: str) -> StringTable:
+        return StringTable(self.section(name))
+
+    def json(self, name: str) -> Any:
+        return json.loads(bytes(self.section(name)))
+
+    def source_stamp(self) -> Optional[list[list[Any]]]:
+        return self.json(SECTION_SOURCE_STAMP) if self.has(SECTION_SOURCE_STAMP) else None
+
+    def ecodes(self) -> Optional[SortedStringMap]:
+        if not self.has(SECTION_ECODE_CODES):
+            return None
+        return SortedStringMap(
+            self.strings(SECTION_ECODE_CODES),
+            self.strings(SECTION_ECODE_STATUSES),
+            self.strings(SECTION_ECODE_DESCRIPTIONS),
+        )
+
+
+def compute_source_stamp(model_dir: Path) -> Optional[list[list[Any]]]:
+    """[name, size, mtime_ns] of each present snapshot source, or None when none are present."""
+
+    stamp: list[list[Any]] = []
+    for name in SNAPSHOT_SOURCES:
+        path = model_dir / name
+        if not path.exists():
+            continue
+        stat = path.stat()
+        stamp.append([name, stat.st_size, stat.st_mtime_ns])
+    return stamp or None
+
+
+def write_snapshot(path: Path, sections: dict[str, bytes], *, source_digest: str) -> None:
+    table_end = _HEADER.size + _SECTION.size * len(sections)
+    layout: list[tuple[str, int, bytes]] = []
+    offset = table_end
+    for name, payload in sections.items():
+        offset += -offset % _ALIGNMENT
+        layout.append((name, offset, payload))
+        offset += len(payload)
+
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    with open(temporary, "wb") as handle:
+        handle.write(
+            _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(layout), source_digest.encode("ascii"))
+        )
+        for name, section_offset, payload in layout:
+            handle.write(_SECTION.pack(name.encode("ascii"), section_offset, len(payload)))
+        for _, section_offset, payload in layout:
+            handle.write(b"\x00" * (section_offset - handle.tell()))
+            handle.write(payload)
+    # Atomic replace so workers never map a half-written file.
+    temporary.replace(path)
+
+
+def build_snapshot_sections(model_dir: Path) -> dict[str, bytes]:
+    sections: dict[str, bytes] = {}
+
+    stamp = compute_source_stamp(model_dir)
+    if stamp is not None:
+        sections[SECTION_SOURCE_STAMP] = json.dumps(stamp, separators=(",", ":")).encode("utf-8")
+
+    vocab_path = model_dir / "ingredient_text_vocab.json"
+    if vocab_path.exists():
+        with open(vocab_path, "r", encoding="utf-8") as handle:
+            vocabulary = json.load(handle)
+        sections[SECTION_VOCABULARY] = StringTable.encode(str(token) for token in vocabulary)
+
+    for filename, section in LABEL_SECTIONS.items():
+        label_path = model_dir / filename
+        if label_path.exists():
+            with open(label_path, "r", encoding="utf-8") as handle:
+                sections[section] = StringTable.encode(str(label) for label in json.load(handle))
+
+    csv_path = model_dir / "ecode_database.csv"
+    if csv_path.exists():
+        records: dict[str, tuple[str, str]] = {}
+        with open(csv_path, "r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                code = (row.get("e_code_number") or "").strip().upper()
+                if not code or code in records:
+                    continue
+                description = (row.get("description") or "").strip() or (row.get("name") or "").strip()
+                records[code] = ((row.get("halal_status") or "").strip(), description)
+        codes = sorted(records)
+        sections[SECTION_ECODE_CODES] = StringTable.encode(codes)
+        sections[SECTION_ECODE_STATUSES] = StringTable.encode(records[code][0] for code in codes)
+        sections[SECTION_ECODE_DESCRIPTIONS] = StringTable.encode(records[code][1] for code in codes)
+
+    risk_path = model_dir / "ingredient_risk_index.json"
+    if risk_path.exists():
+        # The risk index is small and needs dict lookups per token, so it stays JSON.
+        sections[SECTION_RISK_INDEX] = json.dumps(
+            json.loads(risk_path.read_text(encoding="utf-8")), separators=(",", ":")
+        ).encode("utf-8")
+
+    return sections
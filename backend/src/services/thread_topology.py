@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# Settings field backing each knob; also the env var names `autotune_threads` writes.
+SETTINGS_FIELDS = {
+    "tf_intra_op": "tf_intra_op_threads",
+    "tf_inter_op": "tf_inter_op_threads",
+    "tflite": "tflite_num_threads",
+    "torch": "torch_num_threads",
+}
+
+
+@dataclass(frozen=True)
+class ThreadTopology:
+    """Thread counts for each inference runtime; None keeps the library default."""
+
+    tf_intra_op: Optional[int] = None
+    tf_inter_op: Optional[int] = None
+    tflite: Optional[int] = None
+    torch: Optional[int] = None
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ThreadTopology":
+        return cls(**{knob: getattr(settings, field) for knob, field in SETTINGS_FIELDS.items()})
+
+    def replace(self, **changes: Optional[int]) -> "ThreadTopology":
+        return ThreadTopology(**{**asdict(self), **changes})
+
+    def as_dict(self) -> dict[str, Optional[int]]:
+        return asdict(self)
+
+    def as_env(self) -> dict[str, str]:
+        return {
+            SETTINGS_FIELDS[knob].upper(): str(value)
+            for knob, value in asdict(self).items()
+            if value is not None
+        }
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"{knob}={value if value is not None else 'default'}" for knob, value in asdict(self).items()
+        )
+
+
+def apply_thread_topology(topology: ThreadTopology) -> None:
+    """Configure the process-wide TensorFlow and torch pools.
+
+    TensorFlow only accepts pool sizes before its runtime starts, so this must run
+    before the first model is loaded; later calls (e.g. on hot reload) keep the
+    pools already in place and log the mismatch. The TFLite count is per
+    interpreter and is passed when the logo model is loaded.
+    """
+
+    if topology.tf_intra_op is not None or topology.tf_inter_op is not None:
+        import tensorflow as tf
+
+        for value, setter, getter in (
+            (
+                topology.tf_intra_op,
+                tf.config.threading.set_intra_op_parallelism_threads,
+                tf.config.threading.get_intra_op_parallelism_threads,
+            ),
+            (
+                topology.tf_inter_op,
+                tf.config.threading.set_inter_op_parallelism_threads,
+                tf.config.threading.get_inter_op_parallelism_threads,
+            ),
+        ):
+            if value is None or getter() == value:
+                continue
+            try:
+                setter(value)
+            except RuntimeError:
+                LOGGER.warning(
+                    "TensorFlow is already initialized; %s stays at %s instead of %s.",
+                    setter.__name__,
+                    getter(),
+                    value,
+                )
+
+    if topology.torch is not None:
+        try:
+            import torch
+        except ImportError:  # pragma: no cover - torch only ships with easyocr
+            return
+        torch.set_num_threads(topology.torch)
+        LOGGER.info("Set torch intra-op threads to %s.", topology.torch)
@@ -0,0 +1,260 @@
+"""Approximate nearest-neighbour lookup of earlier ingredient verdicts.
+
+Ingredient lists from the same product line (or the same label OCR'd twice) differ
+by a token or two. Each classified list is reduced to a MinHash signature over its
+token set and bucketed with LSH, so a lookup touches a handful of candidates and
+the best exact Jaccard similarity among them decides whether the stored verdict can
+be reused instead of running the ingredient models.
+
+Verdicts are appended to one NDJSON file per model version and replayed on start,
+so a retrained model never reuses answers from its predecessor. The files hold the
+token sets of user-submitted ingredient lists; `prune_verdict_files` keeps only the
+newest few.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import zlib
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from .risk_index import tokenize
+
+LOGGER = logging.getLogger(__name__)
+
+NUM_PERM = 64
+# 16 bands of 4 rows: lists with Jaccard >= 0.8 collide in some band with
+# probability above 0.999, while lists below 0.3 rarely become candidates.
+LSH_BANDS = 16
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+HASH_SEED = 1
+ECODE_TOKEN = re.compile(r"^e\d{3,4}[a-z]?$")
+VERDICT_FILE_SUFFIX = ".ndjson"
+# Negations, qualifiers and sources that flip a verdict on their own, e.g.
+# "flavouring (alcohol free)" vs "flavouring (alcohol)" or "vegetable glycerin" vs "glycerin".
+QUALIFIER_TOKENS = frozenset(
+    """
+    no non not free without contains may trace traces
+    halal haram kosher zabiha certified vegan vegetarian
+    plant vegetable animal synthetic microbial fish beef bovine chicken poultry pork porcine
+    alcohol ethanol wine
+    """.split()
+)
+
+
+def prune_verdict_files(directory: Path, keep: int, current: Optional[Path] = None) -> list[Path]:
+    """Delete all but the `keep` most recently written verdict files; `current` always counts as kept."""
+
+    if not directory.is_dir():
+        return []
+    others = sorted(
+        (path for path in directory.glob(f"*{VERDICT_FILE_SUFFIX}") if path != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    keep_others = max(0, keep - 1) if current is not None else keep
+    removed = []
+    for path in others[keep_others:]:
+        try:
+            path.unlink()
+            removed.append(path)
+        except OSError as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to remove old verdict file %s: %s", path, exc)
+    return removed
+
+
+def token_set(text: str) -> frozenset[str]:
+    return frozenset(tokenize(text))
+
+
+def jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+@dataclass
+class IndexedVerdict:
+    status: str
+    confidence: float
+    raw_scores: dict[str, float]
+    # Evidence id of the model tier that originally produced the verdict.
+    source: str
+    tokens: frozenset[str]
+
+
+@dataclass
+class VerdictMatch:
+    verdict: IndexedVerdict
+    similarity: float
+
+
+class MinHasher:
+    """MinHash over 32-bit token hashes with `num_perm` universal hash functions."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = HASH_SEED) -> None:
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2**32 keep a * h + b inside uint64 for 32-bit h.
+        self.a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(token.encode()) for token in tokens), dtype=np.uint64)
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+class IngredientVerdictIndex:
+    """Thread-safe MinHash/LSH index of ingredient verdicts with append-only persistence.
+
+    `sensitive_tokens` (risk-index terms) together with E-codes and
+    `QUALIFIER_TOKENS` guard reuse: a neighbour only counts when the tokens the two
+    lists do not share contain none of them, so "..., gelatin (beef)" never answers
+    for "..., gelatin (pork)", nor "(alcohol free)" for "(alcohol)", however long
+    the common part is.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        min_similarity: float = 0.9,
+        max_entries: int = 200_000,
+        sensitive_tokens: Iterable[str] = (),
+    ) -> None:
+        self.path = path
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self.sensitive_tokens = frozenset(sensitive_tokens) | QUALIFIER_TOKENS
+        self._hasher = MinHasher()
+        self._rows = NUM_PERM // LSH_BANDS
+        self._entries: list[IndexedVerdict] = []
+        self._exact: dict[frozenset[str], int] = {}
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._lock = threading.Lock()
+        self._full_logged = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Replay the persisted verdicts; malformed lines are skipped."""
+        if self.path is None or not self.path.exists():
+            return
+        skipped = 0
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    verdict = IndexedVerdict(
+                        status=str(record["status"]),
+                        confidence=float(record["confidence"]),
+                        raw_scores={str(k): float(v) for k, v in record["raw_scores"].items()},
+                        source=str(record["source"]),
+                        tokens=frozenset(record["tokens"]),
+                    )
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    skipped += 1
+                    continue
+                self._add(verdict)
+        LOGGER.info(
+            "Loaded %s ingredient verdicts from %s (%s malformed lines skipped).",
+            len(self._entries),
+            self.path,
+            skipped,
+        )
+
+    def lookup(self, text: str) -> Optional[VerdictMatch]:
+        """Most similar stored verdict at or above `min_similarity`, or None."""
+        tokens = token_set(text)
+        if not tokens:
+            return None
+        with self._lock:
+            exact = self._exact.get(tokens)
+            if exact is not None:
+                return VerdictMatch(verdict=self._entries[exact], similarity=1.0)
+            if not self._entries:
+                return None
+            candidates: set[int] = set()
+            for band, key in enumerate(self._band_keys(tokens)):
+                candidates.update(self._buckets[band].get(key, ()))
+            best: Optional[VerdictMatch] = None
+            for entry_id in candidates:
+                verdict = self._entries[entry_id]
+                similarity = jaccard(tokens, verdict.tokens)
+                if similarity < self.min_similarity or (best is not None and similarity <= best.similarity):
+                    continue
+                if self._is_sensitive(tokens ^ verdict.tokens):
+                    continue
+                best = VerdictMatch(verdict=verdict, similarity=similarity)
+            return best
+
+    def insert(
+        self, text: str, status: str, confidence: float, raw_scores: dict[str, float], source: str
+    ) -> bool:
+        """Index a fresh verdict and append it to disk. Returns False if it was not stored."""
+        tokens = token_set(text)
+        if not tokens:
+            return False
+        verdict = IndexedVerdict(
+            status=status,
+            confidence=float(confidence),
+            raw_scores={label: float(score) for label, score in raw_scores.items()},
+            source=source,
+            tokens=tokens,
+        )
+        with self._lock:
+            if tokens in self._exact:
+                return False
+            if len(self._entries) >= self.max_entries:
+                if not self._full_logged:
+                    LOGGER.warning("Ingredient verdict index is full (%s entries); not adding more.", self.max_entries)
+                    self._full_logged = True
+                return False
+            self._add(verdict)
+            self._append(verdict)
+        return True
+
+    def _add(self, verdict: IndexedVerdict) -> None:
+        if verdict.tokens in self._exact:
+            return
+        entry_id = len(self._entries)
+        self._entries.append(verdict)
+        self._exact[verdict.tokens] = entry_id
+        for band, key in enumerate(self._band_keys(verdict.tokens)):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+
+    def _append(self, verdict: IndexedVerdict) -> None:
+        if self.path is None:
+            return
+        record = {
+            "status": verdict.status,
+            "confidence": verdict.confidence,
+            "raw_scores": verdict.raw_scores,
+            "source": verdict.source,
+            "tokens": sorted(verdict.tokens),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # One short write per line in append mode, so concurrent workers do not interleave.
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as exc:  # pragma: no cover - runtime safety
+            LOGGER.warning("Failed to persist ingredient verdict to %s: %s", self.path, exc)
+
+    def _band_keys(self, tokens: frozenset[str]) -> list[bytes]:
+        signature = self._hasher.signature(tokens)
+        return [
+            signature[band * self._rows : (band + 1) * self._rows].tobytes() for band in range(LSH_BANDS)
+        ]
+
+    def _is_sensitive(self, tokens: frozenset[str]) -> bool:
+        return any(token in self.sensitive_tokens or ECODE_TOKEN.match(token) for token in tokens)